@@ -0,0 +1,8 @@
+# proyecto/benchmarks/__init__.py
+"""
+Benchmarks del scraper sobre fixtures HTML servidos en local
+
+Uso (desde proyecto/):
+    python -m benchmarks.run
+    python -m benchmarks.run --fixtures ruta/a/paginas --save-baseline
+"""
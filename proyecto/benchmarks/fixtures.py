@@ -0,0 +1,138 @@
+# proyecto/benchmarks/fixtures.py
+"""
+Páginas HTML de prueba para los benchmarks
+
+Un directorio de fixtures contiene:
+    categories.html      Página de categorías
+    listing_<N>.html     Páginas de listado (N = 1, 2, ...)
+    video_<N>.html       Páginas de video con flashvars
+
+Se pueden usar páginas guardadas del sitio real con esos nombres; si el
+directorio no tiene fixtures se generan páginas sintéticas con la misma
+estructura que el sitio (incluidos anuncios y paginación).
+"""
+import json
+import os
+from pathlib import Path
+
+
+def _video_item(page, index):
+    vkey = f"ph{page:02d}{index:04d}"
+    title = f"Video {page}-{index} título ñ"
+    return f'''<li class="pcVideoListItem js-pop videoblock videoBox" data-video-vkey="{vkey}">
+<div class="wrap"><div class="phimage">
+<a href="/view_video.php?viewkey={vkey}" class="linkVideoThumb js-linkVideoThumb img" data-title="{title}" title="{title}">
+<img src="https://ei.phncdn.com/videos/{vkey}/thumb.jpg" data-mediumthumb="https://ei.phncdn.com/videos/{vkey}/medium.jpg" class="thumb js-videoThumb" alt="{title}"/></a>
+<div class="marker-overlays js-noFade"><var class="duration">{index % 60}:{index % 50:02d}</var></div></div>
+<div class="thumbnail-info-wrapper clearfix"><span class="title"><a href="/view_video.php?viewkey={vkey}" title="{title}">{title}</a></span>
+<div class="videoUploaderBlock clearfix"><div class="usernameWrap"><a href="/model/user{index}">Uploader {index}</a></div></div>
+<div class="videoDetailsBlock"><span class="views"><var>{index}.{index % 10}K</var> vistas</span>
+<div class="rating-container neutral"><i class="ph-icon-thumb-up"></i><div class="value">{60 + index % 40}%</div></div></div></div></div></li>'''
+
+
+# Variantes de anuncios que el clasificador debe descartar
+_AD_ITEMS = (
+    '<li class="pcVideoListItem"><div class="tj-inban-container"><a href="https://ads.example">ad</a></div></li>',
+    '<li class="pcVideoListItem"><cbcac><span>x</span></cbcac><span class="title"><a href="/v">t</a></span></li>',
+    '<li class="pcVideoListItem"><span class="title"><a href="/v">Publicidad</a></span></li>',
+    '<li class="emptyBlock"><div>sin contenido</div></li>',
+    '<li class="pcVideoListItem abc123def4567"><span class="title"><a href="/v">t</a></span></li>',
+    '<li class="pcVideoListItem"><div data-url="https://ads.trafficjunky.net/x"></div><span class="title"><a href="/v">t</a></span></li>',
+)
+
+
+def listing_page(page, items_per_page, total_pages):
+    """HTML de una página de listado con anuncios intercalados"""
+    items = []
+    for index in range(items_per_page):
+        items.append(_video_item(page, index))
+        if index % 8 == 3:
+            items.append(_AD_ITEMS[(index // 8) % len(_AD_ITEMS)])
+
+    next_link = ''
+    if page < total_pages:
+        next_link = f'<li class="page_next"><a href="?page={page + 1}" class="orangeButton">Siguiente</a></li>'
+
+    return f'''<!DOCTYPE html><html><head><title>Categoría</title>
+<script>var pageData = "<li class=\\"fake\\">";</script></head><body>
+<div class="wrapper"><ul id="videoCategory" class="videos search-video-thumbs">{"".join(items)}</ul>
+<div class="pagination3"><ul><li class="page_current"><span>{page}</span></li>{next_link}</ul></div></div>
+</body></html>'''
+
+
+def categories_page(count):
+    """HTML de la página de categorías"""
+    categories = ''.join(
+        f'''<li class="catPic" data-category="{index}"><div class="category-wrapper"><a href="/video?c={index}"><img src="https://ei.phncdn.com/c/{index}.jpg"/></a>
+<div class="categoryTitleWrapper"><a href="/video?c={index}" class="js-mxp"><strong>Categoría {index}</strong><span class="videoCount">(<var>{index * 1234:,}</var>)</span></a></div></div></li>'''
+        for index in range(1, count + 1)
+    )
+    return f'<html><body><ul id="categoriesListingWrapper" class="categoriesListing">{categories}</ul></body></html>'
+
+
+def video_page(index, related_items=60):
+    """HTML de una página de video con flashvars y videos relacionados"""
+    vkey = f"ph99{index:04d}"
+    flashvars = {
+        'video_title': f'Video {index}',
+        'video_duration': str(300 + index * 7),
+        'mediaDefinitions': [
+            {'format': 'hls', 'quality': ['1080'], 'videoUrl': f'https://cv.phncdn.com/hls/videos/{vkey}/1080P_4000K.mp4/master.m3u8'},
+            {'format': 'hls', 'quality': '720', 'videoUrl': f'https://cv.phncdn.com/hls/videos/{vkey}/720P_4000K.mp4/master.m3u8'},
+            {'format': 'mp4', 'quality': '480', 'videoUrl': f'https://cv.phncdn.com/videos/{vkey}/480P_2000K_{vkey}.mp4?validfrom=1&hash=x'},
+            {'format': 'mp4', 'quality': ['240'], 'videoUrl': f'https://cv.phncdn.com/videos/{vkey}/240P_1000K_{vkey}.mp4?validfrom=1&hash=x'},
+        ],
+    }
+    related = ''.join(_video_item(99, i) for i in range(related_items))
+    return f'''<!DOCTYPE html><html><head><title>Video {index}</title>
+<meta name="twitter:image" content="https://ei.phncdn.com/videos/{vkey}/original.jpg"/></head><body>
+<div id="player"><script type="text/javascript">
+var flashvars_{index} = {json.dumps(flashvars)};
+</script></div>
+<ul id="relatedVideosCenter">{related}</ul></body></html>'''
+
+
+def generate_fixtures(directory, pages=5, items_per_page=44, categories=120, videos=10):
+    """
+    Escribe un juego de fixtures sintéticos en directory
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    (directory / 'categories.html').write_text(categories_page(categories), encoding='utf-8')
+    for page in range(1, pages + 1):
+        (directory / f'listing_{page}.html').write_text(listing_page(page, items_per_page, pages), encoding='utf-8')
+    for index in range(1, videos + 1):
+        (directory / f'video_{index}.html').write_text(video_page(index), encoding='utf-8')
+
+    return directory
+
+
+def _numbered(directory, prefix):
+    files = []
+    for path in Path(directory).glob(f'{prefix}_*.html'):
+        suffix = path.stem[len(prefix) + 1:]
+        if suffix.isdigit():
+            files.append((int(suffix), path))
+    return [path for _, path in sorted(files)]
+
+
+def load_fixtures(directory):
+    """
+    Lee un directorio de fixtures
+
+    Returns:
+        dict: {'categories': html, 'listings': [html...], 'videos': [html...]}
+    """
+    directory = Path(directory)
+    categories_file = directory / 'categories.html'
+    return {
+        'categories': categories_file.read_text(encoding='utf-8') if categories_file.exists() else None,
+        'listings': [path.read_text(encoding='utf-8') for path in _numbered(directory, 'listing')],
+        'videos': [path.read_text(encoding='utf-8') for path in _numbered(directory, 'video')],
+    }
+
+
+def has_fixtures(directory):
+    """Indica si el directorio ya contiene fixtures utilizables"""
+    return os.path.isdir(directory) and bool(_numbered(directory, 'listing'))
@@ -0,0 +1,238 @@
+# proyecto/benchmarks/run.py
+"""
+Ejecuta los benchmarks del scraper y los compara con una línea base
+
+Las cachés (HTTP, parseo y resultados) se desactivan para medir el trabajo
+real. El servidor local no está en los límites del limitador de ritmo, así
+que las peticiones no se frenan.
+"""
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.fixtures import generate_fixtures, has_fixtures, load_fixtures
+from benchmarks.server import FixtureServer
+
+DEFAULT_BASELINE = Path.home() / ".pornhub_downloader" / "benchmark_baseline.json"
+MICRO_ITERATIONS_FACTOR = 20  # Repeticiones extra para benchmarks sin red
+
+
+def _percentile(sorted_samples, percent):
+    """Percentil por rango más cercano"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, int(round(percent / 100.0 * len(sorted_samples))))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def measure(work, units, iterations, pages_per_unit=1):
+    """
+    Mide work(unit) sobre cada unidad
+
+    work devuelve el número de elementos procesados. Cada unidad cuenta como
+    pages_per_unit páginas; la latencia se expresa por página.
+    """
+    # Calentamiento (imports perezosos, compilación de selectores...)
+    for unit in units:
+        work(unit)
+
+    samples = []
+    items = 0
+    gc.collect()
+    gc.disable()  # Como timeit: las pausas del GC no dependen del código medido
+    try:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for unit in units:
+                t0 = time.perf_counter()
+                items += work(unit)
+                samples.append((time.perf_counter() - t0) / pages_per_unit)
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+
+    # Memoria pico en una pasada aparte (tracemalloc ralentiza la medición)
+    tracemalloc.start()
+    for unit in units:
+        work(unit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    pages = len(samples) * pages_per_unit
+    return {
+        'pages': pages,
+        'items': items,
+        'seconds': round(elapsed, 4),
+        'pages_per_sec': round(pages / elapsed, 2) if elapsed else 0.0,
+        'items_per_sec': round(items / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(_percentile(samples, 50) * 1000, 3),
+        'p99_ms': round(_percentile(samples, 99) * 1000, 3),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(fixtures, iterations=5, only=None):
+    """
+    Ejecuta todos los benchmarks contra los fixtures
+
+    Returns:
+        dict: nombre -> métricas
+    """
+    from opciones.opcion1.scraper import Opcion1Scraper
+
+    results = {}
+    listings = fixtures['listings']
+
+    def selected(name):
+        return not only or name in only
+
+    with FixtureServer(fixtures) as server:
+        scraper = Opcion1Scraper()
+        scraper.base_url = server.base_url
+        scraper.http_cache = None  # Sin caché HTTP ni memo de parseo
+
+        if fixtures['categories'] and selected('get_categories'):
+            results['get_categories'] = measure(
+                lambda _: len(scraper.get_categories(use_cache=False)), [None], iterations)
+
+        if selected('get_videos'):
+            results['get_videos'] = measure(
+                lambda page: len(list(scraper.get_videos(
+                    f"/video?c=1&page={page}", max_pages=1, use_cache=False))),
+                list(range(1, len(listings) + 1)), iterations)
+
+        if len(listings) > 1 and selected('get_videos_paginated'):
+            results['get_videos_paginated'] = measure(
+                lambda _: len(list(scraper.get_videos(
+                    "/video?c=1", max_pages=len(listings), use_cache=False))),
+                [None], iterations, pages_per_unit=len(listings))
+
+        # Elementos ya parseados: se mide solo el filtro y la extracción.
+        # Son operaciones de microsegundos, se repiten más para estabilizar
+        micro_iterations = iterations * MICRO_ITERATIONS_FACTOR
+        parsed_pages = [scraper.parser.parse_listing(html)[0] for html in listings]
+
+        if selected('_is_advertisement'):
+            def classify_page(items):
+                for item in items:
+                    scraper._is_advertisement(item)
+                return len(items)
+
+            results['_is_advertisement'] = measure(classify_page, parsed_pages, micro_iterations)
+
+        if selected('_extract_video_data_from_real_html'):
+            video_pages = [[item for item in items if not scraper.ad_classifier.classify(item).is_ad]
+                           for items in parsed_pages]
+            results['_extract_video_data_from_real_html'] = measure(
+                lambda items: sum(1 for item in items if scraper._extract_video_data_from_real_html(item)),
+                video_pages, micro_iterations)
+
+    if fixtures['videos'] and selected('_extract_video_urls'):
+        from opciones.opcion1.downloader import VideoDownloader
+        downloader = VideoDownloader()
+        results['_extract_video_urls'] = measure(
+            lambda html: len(downloader._extract_video_urls(html)), fixtures['videos'],
+            iterations * MICRO_ITERATIONS_FACTOR)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compara con la línea base
+
+    Returns:
+        list: nombres de benchmarks con regresión (p50 peor que la tolerancia)
+    """
+    regressions = []
+    print(f"\n📊 Comparación con línea base ({baseline.get('created_at', '?')}):")
+    for name, metrics in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            print(f"   {name:<38} (sin línea base)")
+            continue
+
+        p50_delta = (metrics['p50_ms'] - base['p50_ms']) / base['p50_ms'] * 100 if base['p50_ms'] else 0.0
+        ips_delta = ((metrics['items_per_sec'] - base['items_per_sec']) / base['items_per_sec'] * 100
+                     if base['items_per_sec'] else 0.0)
+        regressed = base['p50_ms'] and metrics['p50_ms'] > base['p50_ms'] * (1 + tolerance)
+        if regressed:
+            regressions.append(name)
+
+        icon = '❌' if regressed else '✅'
+        print(f"   {icon} {name:<36} p50 {p50_delta:+7.1f}%   items/s {ips_delta:+7.1f}%")
+    return regressions
+
+
+def print_results(results):
+    print(f"\n{'benchmark':<38}{'págs/s':>10}{'items/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'pico KB':>10}")
+    print('-' * 90)
+    for name, m in results.items():
+        print(f"{name:<38}{m['pages_per_sec']:>10.1f}{m['items_per_sec']:>12.1f}"
+              f"{m['p50_ms']:>10.3f}{m['p99_ms']:>10.3f}{m['peak_kb']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del scraper sobre fixtures locales")
+    parser.add_argument('--fixtures', help="Directorio de fixtures (se generan sintéticos si está vacío)")
+    parser.add_argument('--iterations', type=int, default=5, help="Repeticiones por benchmark")
+    parser.add_argument('--only', nargs='*', help="Ejecutar solo estos benchmarks")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Archivo JSON de línea base")
+    parser.add_argument('--save-baseline', action='store_true', help="Guardar los resultados como línea base")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Empeoramiento de p50 tolerado (0.25 = 25%%)")
+    parser.add_argument('--json', help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    # Los logs por página distorsionan los tiempos
+    logging.disable(logging.INFO)
+
+    fixtures_dir = args.fixtures or tempfile.mkdtemp(prefix='scraper-fixtures-')
+    if not has_fixtures(fixtures_dir):
+        print(f"🧪 Generando fixtures sintéticos en {fixtures_dir}")
+        generate_fixtures(fixtures_dir)
+    fixtures = load_fixtures(fixtures_dir)
+    print(f"📂 Fixtures: {len(fixtures['listings'])} listados, {len(fixtures['videos'])} páginas de video")
+
+    from opciones.opcion1.parsers import get_parser
+    results = run_benchmarks(fixtures, iterations=args.iterations, only=args.only)
+    print_results(results)
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'parser_backend': get_parser().name,
+        'iterations': args.iterations,
+        'results': results,
+    }
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    exit_code = 0
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n⚠️ Regresiones: {', '.join(regressions)}")
+            exit_code = 1
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"\n💾 Línea base guardada en {baseline_path}")
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# proyecto/benchmarks/server.py
+"""
+Servidor HTTP local que sirve los fixtures en lugar del sitio real
+
+    /categories            -> categories.html
+    /video?...&page=N      -> listing_N.html (página 1 si no hay parámetro)
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, como el sitio real
+    disable_nagle_algorithm = True  # Cabeceras y cuerpo van en escrituras separadas
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        fixtures = self.server.fixtures
+        body = None
+
+        if url.path == '/categories':
+            body = fixtures['categories']
+        elif url.path == '/video':
+            page = parse_qs(url.query).get('page', ['1'])[0]
+            listings = fixtures['listings']
+            if page.isdigit() and 1 <= int(page) <= len(listings):
+                body = listings[int(page) - 1]
+
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FixtureServer:
+    """
+    Servidor de fixtures en 127.0.0.1 (puerto libre) en un hilo aparte
+
+    Uso:
+        with FixtureServer(fixtures) as server:
+            scraper.base_url = server.base_url
+    """
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _FixtureHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.fixtures = self.fixtures
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
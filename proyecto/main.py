@@ -1,9 +1,11 @@
 import sys
 from PyQt5.QtWidgets import QApplication
 from ui.main_window import MainWindow
+from utils.ffmpeg import warm_ffmpeg_capabilities
 
 def main():
     app = QApplication(sys.argv)
+    warm_ffmpeg_capabilities()  # Primera descarga HLS sin esperar al sondeo de ffmpeg
     window = MainWindow()
     window.show()
     sys.exit(app.exec_())
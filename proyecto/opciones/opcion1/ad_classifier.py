@@ -0,0 +1,107 @@
+import logging
+import re
+import threading
+from collections import Counter, namedtuple
+
+logger = logging.getLogger('AdClassifier')
+
+# Resultado de la clasificación: regla que decidió y el valor que la disparó
+AdVerdict = namedtuple('AdVerdict', ['is_ad', 'rule', 'detail'])
+
+
+class AdClassifier:
+    """
+    Clasificador compilado de publicidad para elementos del listado
+
+    Trabaja sobre el ListingItem que el parser ya recorrió una vez: las
+    comprobaciones son intersecciones con conjuntos precalculados y una sola
+    expresión regular para los textos. Cuenta qué regla decide cada elemento
+    para poder ajustar los criterios.
+    """
+
+    # Reglas en orden de evaluación
+    RULE_AD_CLASS = 'ad_class'
+    RULE_AD_TAG = 'ad_tag'
+    RULE_AD_DATA_URL = 'ad_data_url'
+    RULE_AD_TEXT = 'ad_text'
+    RULE_NO_VIDEO_STRUCTURE = 'no_video_structure'
+    RULE_DYNAMIC_CLASS = 'dynamic_class'
+    RULE_VIDEO = 'video'
+
+    # Clases de contenedores de anuncios (en descendientes)
+    AD_CLASSES = frozenset([
+        'tj-inban-container',  # TrafficJunky ads
+        'tj-inban-icon',
+        'mcacdmgrhc',          # Contenedor de anuncios
+        'mbbdfhgfle',          # Otro contenedor de anuncios
+    ])
+
+    # Tags propios de anuncios (en descendientes)
+    AD_TAGS = frozenset(['cbcac', 'bdhdd'])
+
+    # Marcador en atributos data-url
+    AD_DATA_URL_MARKER = 'trafficjunky'
+
+    # Textos que indican publicidad, combinados en una sola regex
+    AD_TEXTS = ('ad by traff', 'traffic junky', 'advertising', 'publicidad')
+    AD_TEXT_RE = re.compile('|'.join(re.escape(text) for text in AD_TEXTS), re.IGNORECASE)
+
+    # Clases generadas dinámicamente: más de 10 caracteres y al menos un dígito
+    DYNAMIC_CLASS_RE = re.compile(r'(?=.{11})\D*\d')
+    SAFE_ROOT_CLASSES = frozenset(['pcVideoListItem'])
+
+    def __init__(self):
+        self.rule_hits = Counter()
+        self._lock = threading.Lock()
+
+    def classify(self, item):
+        """
+        Decide si un ListingItem es publicidad
+
+        Returns:
+            AdVerdict: (is_ad, regla que decidió, valor que la disparó)
+        """
+        verdict = self._evaluate(item)
+        with self._lock:
+            self.rule_hits[verdict.rule] += 1
+        return verdict
+
+    def _evaluate(self, item):
+        classes = item.classes
+
+        # Contenedores y tags de anuncios
+        if not self.AD_CLASSES.isdisjoint(classes):
+            return AdVerdict(True, self.RULE_AD_CLASS, ', '.join(sorted(self.AD_CLASSES & classes)))
+
+        if not self.AD_TAGS.isdisjoint(item.tags):
+            return AdVerdict(True, self.RULE_AD_TAG, ', '.join(sorted(self.AD_TAGS & item.tags)))
+
+        for data_url in item.data_urls:
+            if self.AD_DATA_URL_MARKER in data_url:
+                return AdVerdict(True, self.RULE_AD_DATA_URL, data_url)
+
+        # Textos de publicidad
+        match = self.AD_TEXT_RE.search(item.text)
+        if match:
+            return AdVerdict(True, self.RULE_AD_TEXT, match.group(0).lower())
+
+        # Un video válido debe tener título y enlace
+        if not item.has_title_link and not item.has_thumb_link:
+            return AdVerdict(True, self.RULE_NO_VIDEO_STRUCTURE, None)
+
+        # Clases dinámicas en el propio elemento (anuncios suelen tener clases generadas)
+        for class_name in item.root_classes:
+            if class_name not in self.SAFE_ROOT_CLASSES and self.DYNAMIC_CLASS_RE.match(class_name):
+                return AdVerdict(True, self.RULE_DYNAMIC_CLASS, class_name)
+
+        return AdVerdict(False, self.RULE_VIDEO, None)
+
+    def get_stats(self):
+        """Devuelve cuántas veces ha decidido cada regla"""
+        with self._lock:
+            return dict(self.rule_hits)
+
+    def reset_stats(self):
+        """Reinicia los contadores de reglas"""
+        with self._lock:
+            self.rule_hits.clear()
@@ -0,0 +1,332 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+from utils.http_cache import CachedPage
+from utils.http_client import HttpClientConfig
+from utils.rate_limiter import get_rate_limiter
+from .config import ScraperConfig
+from .scraper import Opcion1Scraper
+from .models import VideoRecord
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+logger = logging.getLogger('AsyncOpcion1Scraper')
+
+
+class AsyncOpcion1Scraper:
+    """
+    Versión asyncio de Opcion1Scraper para que varias tareas recorran categorías a la vez
+
+    Reutiliza el parser, el clasificador de publicidad y las cachés del
+    scraper síncrono; solo cambia cómo se descargan las páginas. Con aiohttp
+    las peticiones son no bloqueantes; sin aiohttp se usan unos pocos hilos
+    con la sesión compartida. En ambos casos hay un máximo de peticiones
+    simultáneas por host y se respeta el limitador de ritmo.
+    """
+
+    def __init__(self, scraper=None, max_per_host=None):
+        self.scraper = scraper or Opcion1Scraper()
+        self.max_per_host = max_per_host or ScraperConfig.ASYNC_MAX_PER_HOST
+        self.rate_limiter = get_rate_limiter()
+
+        self._host_semaphores = {}
+        self._http = None
+        self._executor = None
+
+    @property
+    def base_url(self):
+        return self.scraper.base_url
+
+    @staticmethod
+    async def _off_loop(fn, *args):
+        """Ejecuta fn en el pool por defecto (las cachés leen y escriben en disco)"""
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    @property
+    def headers(self):
+        return self.scraper.headers
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Cierra la sesión aiohttp y los hilos auxiliares"""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        # Los semáforos quedan ligados al bucle de eventos que los usó
+        self._host_semaphores = {}
+
+    def _semaphore_for(self, url):
+        host = (urlparse(url).hostname or '').lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return semaphore
+
+    async def _get_http(self):
+        if self._http is None:
+            connect_timeout, read_timeout = HttpClientConfig.DEFAULT_TIMEOUT
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=ScraperConfig.ASYNC_MAX_CONNECTIONS,
+                    limit_per_host=self.max_per_host,
+                ),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+            )
+        return self._http
+
+    async def fetch_page(self, url):
+        """
+        Descarga una página (pasando por la caché HTTP del scraper)
+
+        Returns:
+            CachedPage
+        """
+        async with self._semaphore_for(url):
+            if AIOHTTP_AVAILABLE:
+                return await self._fetch_with_aiohttp(url)
+
+            # Sin aiohttp: la sesión compartida ya aplica el limitador y los reintentos
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=ScraperConfig.ASYNC_MAX_CONNECTIONS, thread_name_prefix='async-scraper')
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.scraper._fetch_page, url)
+
+    async def _fetch_with_aiohttp(self, url):
+        http_cache = self.scraper.http_cache
+        if http_cache is not None:
+            cached, validators = await self._off_loop(http_cache.lookup, url)
+            if cached is not None:
+                return cached
+        else:
+            validators = {}
+
+        session = await self._get_http()
+        attempts = HttpClientConfig.RETRY_TOTAL + 1
+
+        for attempt in range(attempts):
+            wait = self.rate_limiter.reserve(url)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                async with session.get(url, headers={**self.headers, **validators}) as response:
+                    status = response.status
+                    response_headers = response.headers
+                    text = await response.text(errors='replace')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt + 1 >= attempts:
+                    stale = await self._off_loop(http_cache.get_stale, url) if http_cache is not None else None
+                    if stale is not None:
+                        logger.warning(f"⚠️ Error de red, sirviendo copia en caché de {url}: {str(e)}")
+                        return stale
+                    raise
+                await asyncio.sleep(HttpClientConfig.RETRY_BACKOFF_FACTOR * (2 ** attempt))
+                continue
+
+            if status in HttpClientConfig.RETRY_STATUS_FORCELIST and attempt + 1 < attempts:
+                await asyncio.sleep(HttpClientConfig.RETRY_BACKOFF_FACTOR * (2 ** attempt))
+                continue
+            break
+
+        if http_cache is None:
+            return CachedPage(url, status, text)
+
+        page = await self._off_loop(http_cache.record, url, status, response_headers, text)
+        if page is None:
+            # 304 pero el cuerpo ya no está en disco: pedir la página completa
+            await self._off_loop(http_cache.invalidate, url)
+            return await self._fetch_with_aiohttp(url)
+        return page
+
+    async def get_categories(self, use_cache=True):
+        """Obtiene todas las categorías disponibles"""
+        result_cache = self.scraper.result_cache
+        cache_key = self.scraper._categories_cache_key()
+
+        if use_cache:
+            cached, age = await self._off_loop(result_cache.peek, cache_key)
+            if cached is not None and age < ScraperConfig.CATEGORIES_CACHE_TTL:
+                return [dict(category) for category in cached]
+
+        url = urljoin(self.base_url, "/categories")
+        try:
+            page = await self.fetch_page(url)
+            if page.status_code != 200:
+                logger.error(f"Error al obtener categorías: {page.status_code}")
+                return []
+
+            categories = self.scraper._memoized_parse(
+                ('categories', url), page.fingerprint,
+                lambda: self.scraper.parser.parse_categories(page.text))
+        except Exception as e:
+            logger.error(f"Error al obtener categorías: {str(e)}")
+            return []
+
+        await self._off_loop(result_cache.set, cache_key, categories)
+        logger.info(f"Se encontraron {len(categories)} categorías")
+        return [dict(category) for category in categories]
+
+    async def get_videos(self, category_url, max_pages=None, max_videos=None, use_cache=True, watermark=None):
+        """
+        Obtiene los videos de una categoría siguiendo la paginación
+
+        watermark funciona como en Opcion1Scraper.get_videos (y desactiva la caché).
+
+        Returns:
+            list: videos encontrados, o None si el recorrido falló sin obtener
+            ninguno (el equivalente al None que produce Opcion1Scraper.get_videos)
+        """
+        max_pages = max_pages or ScraperConfig.DEFAULT_MAX_PAGES
+        result_cache = self.scraper.result_cache
+        cache_key = self.scraper._videos_cache_key(category_url, max_pages, max_videos)
+
+        if watermark is not None:
+            videos, complete = await self._crawl_listing(category_url, max_pages, max_videos, watermark)
+            return videos if complete or videos else None
+
+        if use_cache:
+            cached, age = await self._off_loop(result_cache.peek, cache_key)
+            if cached is not None and age < ScraperConfig.VIDEOS_CACHE_TTL:
+                return [VideoRecord.from_dict(video_data) for video_data in cached]
+
+        videos, complete = await self._crawl_listing(category_url, max_pages, max_videos)
+        if complete:
+            await self._off_loop(result_cache.set, cache_key, [video_data.to_dict() for video_data in videos])
+        elif not videos:
+            return None
+        return videos
+
+    async def _crawl_listing(self, category_url, max_pages, max_videos, watermark=None):
+        """
+        Recorre las páginas de un listado
+
+        Returns:
+            tuple: (videos, True si el recorrido terminó sin errores)
+        """
+        page_url = urljoin(self.base_url, category_url)
+        videos = []
+        seen_urls = set()
+
+        for page_number in range(1, max_pages + 1):
+            try:
+                page = await self.fetch_page(page_url)
+            except Exception as e:
+                logger.error(f"Error descargando {page_url}: {str(e)}")
+                return videos, False
+
+            if page.status_code != 200:
+                logger.error(f"Error al obtener videos: {page.status_code} ({page_url})")
+                return videos, False
+
+            current_url = page_url
+            page_videos, next_url = self.scraper._memoized_parse(
+                ('listing', current_url), page.fingerprint,
+                lambda: self.scraper._parse_listing_page(page.text, current_url))
+
+            reached_seen = False
+            new_on_page = 0
+            for video_data in page_videos:
+                if video_data['url'] in seen_urls:
+                    continue
+                if watermark is not None and watermark.is_seen(video_data.video_id):
+                    reached_seen = True
+                    continue
+                seen_urls.add(video_data['url'])
+                videos.append(video_data.copy())
+                new_on_page += 1
+
+                if max_videos and len(videos) >= max_videos:
+                    return videos, True
+
+            if not next_url or new_on_page == 0 or reached_seen:
+                break
+            page_url = next_url
+
+        logger.info(f"Se procesaron {len(videos)} videos en {page_number} página(s) para {category_url}")
+        return videos, True
+
+
+class AsyncScraperAdapter:
+    """
+    Interfaz síncrona (la de Opcion1Scraper) sobre AsyncOpcion1Scraper
+
+    Ejecuta las corrutinas en un único bucle de eventos en segundo plano,
+    así VideoLoader, CategoryLoader o AutoScraper pueden usarlo sin cambios.
+    Es el scraper de AutoScraper: las tareas programadas que coinciden
+    (cada una en su hilo) comparten el bucle y el límite por host.
+    """
+
+    def __init__(self, async_scraper=None):
+        self.async_scraper = async_scraper or AsyncOpcion1Scraper()
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return self.async_scraper.scraper.base_url
+
+    @property
+    def headers(self):
+        return self.async_scraper.scraper.headers
+
+    @property
+    def session(self):
+        return self.async_scraper.scraper.session
+
+    def _run(self, coroutine):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='async-scraper-loop', daemon=True)
+                self._thread.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def get_categories(self, use_cache=True):
+        """Obtiene todas las categorías disponibles"""
+        return self._run(self.async_scraper.get_categories(use_cache=use_cache))
+
+    def get_videos(self, category_url, max_pages=None, max_videos=None, use_cache=True, watermark=None):
+        """Generador de videos de una categoría (como Opcion1Scraper.get_videos: None si falla)"""
+        try:
+            videos = self._run(self.async_scraper.get_videos(
+                category_url, max_pages=max_pages, max_videos=max_videos,
+                use_cache=use_cache, watermark=watermark))
+        except Exception as e:
+            logger.error(f"Error al obtener videos: {str(e)}")
+            videos = None
+
+        if videos is None:
+            yield None
+            return
+        yield from videos
+
+    def close(self):
+        """Cierra el scraper y detiene el bucle de eventos"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self.async_scraper.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
@@ -0,0 +1,372 @@
+"""
+Upload masivo a StreamWish de una carpeta de videos ya descargados
+
+Uso (desde proyecto/):
+    python -m opciones.opcion1.bulk_upload CARPETA [--order largest] [--results archivo.json]
+
+Los archivos ya subidos se saltan según un registro local (ruta, tamaño y
+SHA-256 -> filecode), así que se puede relanzar tras una caída sin repetir
+uploads. El resto se ordena y pasa por el pool de uploads.
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import wait
+from datetime import datetime
+from pathlib import Path
+
+from .config import DownloadConfig
+from .config_streamwish import StreamWishConfig
+from .upload_pool import UploadPool, get_upload_pool
+from .video_store import file_sha256, get_video_store
+
+logger = logging.getLogger('BulkUpload')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    sha256 TEXT PRIMARY KEY,
+    filecode TEXT NOT NULL,
+    path TEXT,
+    size INTEGER,
+    uploaded_at REAL
+);
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    sha256 TEXT
+);
+"""
+
+# Órdenes de la cola (clave de ordenación sobre BulkItem)
+ORDERS = {
+    'largest': lambda item: -item.size,
+    'smallest': lambda item: item.size,
+    'oldest': lambda item: item.mtime,
+    'newest': lambda item: -item.mtime,
+    'name': lambda item: os.path.basename(item.path).lower(),
+}
+
+
+class UploadLedger:
+    """
+    Registro local de archivos subidos: SHA-256 -> filecode
+
+    También guarda el hash de cada ruta con su tamaño y fecha de
+    modificación, para no volver a leer archivos enteros en cada pasada.
+    """
+
+    def __init__(self, db_file=None):
+        self.db_file = Path(db_file or DownloadConfig.UPLOAD_LEDGER_FILE)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def file_hash(self, path, size, mtime):
+        """SHA-256 del archivo (del registro si no cambió desde la última vez)"""
+        path = os.path.abspath(str(path))
+        with self._lock:
+            row = self._conn.execute("SELECT size, mtime, sha256 FROM hashes WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == size and row[1] == mtime:
+            return row[2]
+
+        sha256 = file_sha256(path)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO hashes (path, size, mtime, sha256) VALUES (?, ?, ?, ?)",
+                               (path, size, mtime, sha256))
+        return sha256
+
+    def filecode(self, sha256):
+        with self._lock:
+            row = self._conn.execute("SELECT filecode FROM uploads WHERE sha256 = ?", (sha256,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, sha256, filecode, path, size):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO uploads (sha256, filecode, path, size, uploaded_at) "
+                               "VALUES (?, ?, ?, ?, ?)",
+                               (sha256, filecode, os.path.abspath(str(path)), size, time.time()))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class BulkItem:
+    """Un archivo de la carpeta y su resultado"""
+    __slots__ = ('path', 'size', 'mtime', 'sha256', 'status', 'filecode', 'attempts', 'error', 'seconds')
+
+    PENDING = 'pending'
+    UPLOADED = 'uploaded'
+    SKIPPED = 'skipped'       # Ya estaba subido (registro o índice de videos)
+    DUPLICATE = 'duplicate'   # Mismo contenido que otro archivo de esta pasada
+    FAILED = 'failed'
+
+    def __init__(self, path, size, mtime):
+        self.path = str(path)
+        self.size = size
+        self.mtime = mtime
+        self.sha256 = None
+        self.status = self.PENDING
+        self.filecode = None
+        self.attempts = 0
+        self.error = None
+        self.seconds = None
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class BulkUploader:
+    """
+    Sube todos los videos pendientes de una carpeta
+
+    Los archivos se ordenan (ORDERS o una función clave) y se comprueban y
+    encolan en ese orden: el hash de cada uno se calcula justo antes de
+    encolarlo, así los primeros empiezan a subirse mientras se revisan los
+    demás. Los uploads van por UploadPool (varios a la vez, con reintentos)
+    y cada uno se anota en el registro y en el informe en cuanto termina.
+    """
+
+    def __init__(self, api_key=None, custom_config=None, ledger=None, pool=None, store=None):
+        config = StreamWishConfig()
+        self.api_key = api_key or config.get_api_key()
+        self.custom_config = custom_config if custom_config is not None else config.get_upload_settings()
+        self.ledger = ledger or UploadLedger()
+        self.pool = pool or get_upload_pool()
+        self.store = store or get_video_store()
+
+    def scan(self, folder, recursive=False, extensions=None):
+        """Videos de la carpeta (sin ordenar)"""
+        extensions = {ext.lower() for ext in (extensions or DownloadConfig.SUPPORTED_EXTENSIONS)}
+        folder = Path(folder)
+        paths = folder.rglob('*') if recursive else folder.iterdir()
+        items = []
+        for path in paths:
+            if path.suffix.lower() not in extensions or not path.is_file():
+                continue
+            st = path.stat()
+            items.append(BulkItem(path, st.st_size, st.st_mtime))
+        return items
+
+    def _already_uploaded(self, item):
+        """filecode si el archivo ya se subió (índice de videos o registro)"""
+        stored = self.store.find_by_path(item.path)
+        if stored is not None and stored.is_uploaded and stored.size == item.size:
+            # El índice ya conoce el hash: no hace falta leer el archivo
+            item.sha256 = stored.sha256
+            return stored.filecode
+
+        item.sha256 = self.ledger.file_hash(item.path, item.size, item.mtime)
+        return self.ledger.filecode(item.sha256)
+
+    def run(self, folder, order='largest', recursive=False, extensions=None, limit=None,
+            dry_run=False, results_file=None):
+        """
+        Sube la carpeta y devuelve el informe (el mismo que se guarda en results_file)
+
+        Args:
+            order: nombre de ORDERS o función clave sobre BulkItem
+            limit: máximo de archivos a subir en esta pasada
+            dry_run: solo decir qué se subiría
+        """
+        if not self.api_key:
+            raise ValueError("API key de StreamWish no configurada")
+        sort_key = ORDERS[order] if isinstance(order, str) else order
+
+        items = sorted(self.scan(folder, recursive, extensions), key=sort_key)
+        logger.info(f"📂 {len(items)} videos en {folder}")
+        started = time.time()
+
+        lock = threading.Lock()
+        futures = []
+        by_hash = {}      # sha256 -> primer item de esta pasada
+        duplicates = {}   # sha256 -> items con el mismo contenido que el primero
+        done = [0]
+
+        def save():
+            if results_file:
+                with lock:
+                    self._write_results(results_file, self._report(folder, order, items, started, dry_run))
+
+        def finished(item, submitted, future):
+            # Se registra en cuanto termina (no en orden de envío): si la pasada
+            # se interrumpe, lo ya subido no se vuelve a subir en la siguiente
+            result = None if future.cancelled() else future.result()
+            with lock:
+                if result is not None:
+                    self._collect(item, result, submitted)
+                    self._settle_duplicates(item, duplicates.get(item.sha256, ()))
+                done[0] += 1
+                index = done[0]
+            if result is not None:
+                icon = '✅' if item.status == BulkItem.UPLOADED else '❌'
+                logger.info(f"{icon} [{index}/{len(futures)}] {os.path.basename(item.path)}")
+                save()
+
+        try:
+            for item in items:
+                try:
+                    filecode = self._already_uploaded(item)
+                except OSError as e:
+                    item.status, item.error = BulkItem.FAILED, str(e)
+                    continue
+
+                if filecode:
+                    item.status, item.filecode = BulkItem.SKIPPED, filecode
+                    continue
+                if item.sha256 in by_hash:
+                    with lock:
+                        first = by_hash[item.sha256]
+                        duplicates.setdefault(item.sha256, []).append(item)
+                        item.status = BulkItem.DUPLICATE
+                        if first.status in (BulkItem.UPLOADED, BulkItem.FAILED):
+                            self._settle_duplicates(first, [item])
+                    continue
+                by_hash[item.sha256] = item
+                if limit is not None and len(futures) >= limit:
+                    continue
+                if dry_run:
+                    futures.append(None)
+                    continue
+
+                future = self.pool.submit(item.path, self._video_data(item), api_key=self.api_key,
+                                          custom_config=self.custom_config)
+                futures.append(future)
+                submitted = time.monotonic()
+                future.add_done_callback(lambda future, item=item, submitted=submitted:
+                                         finished(item, submitted, future))
+
+            # Espera con plazo para que Ctrl+C se atienda enseguida
+            submitted_futures = [future for future in futures if future is not None]
+            while not all(future.done() for future in submitted_futures):
+                wait(submitted_futures, timeout=1)
+        except KeyboardInterrupt:
+            logger.warning("🛑 Interrumpido: se guarda el informe con lo terminado hasta ahora")
+            for future in futures:
+                if future is not None:
+                    self.pool.cancel(future)
+            raise
+        finally:
+            with lock:
+                # Copias de un archivo que no llegó a subirse en esta pasada: siguen pendientes
+                for sha256, copies in duplicates.items():
+                    if by_hash[sha256].status == BulkItem.PENDING and not dry_run:
+                        for copy in copies:
+                            copy.status = BulkItem.PENDING
+                report = self._report(folder, order, items, started, dry_run)
+                if results_file:
+                    self._write_results(results_file, report)
+        return report
+
+    @staticmethod
+    def _settle_duplicates(first, copies):
+        """Las copias de un archivo heredan su resultado (fallidas si falló)"""
+        for copy in copies:
+            if first.status == BulkItem.UPLOADED:
+                copy.status, copy.filecode = BulkItem.DUPLICATE, first.filecode
+            elif first.status == BulkItem.FAILED:
+                copy.status = BulkItem.FAILED
+                copy.error = f"Mismo contenido que {os.path.basename(first.path)}: {first.error}"
+
+    def _video_data(self, item):
+        stored = self.store.find_by_path(item.path)
+        title = stored.title if stored is not None and stored.title else Path(item.path).stem
+        return {
+            'title': title,
+            'description': f"Video subido desde archivo local: {title}"
+        }
+
+    def _collect(self, item, result, submitted):
+        item.seconds = round(time.monotonic() - submitted, 1)
+        item.attempts = result.attempts
+        if result.success and result.filecode:
+            item.status, item.filecode = BulkItem.UPLOADED, result.filecode
+            self.ledger.record(item.sha256, result.filecode, item.path, item.size)
+            stored = self.store.find_by_path(item.path)
+            if stored is not None:
+                self.store.mark_uploaded(stored.video_id, result.filecode)
+        else:
+            item.status, item.error = BulkItem.FAILED, result.error or "Upload fallido"
+
+    @staticmethod
+    def _report(folder, order, items, started, dry_run):
+        counts = {}
+        for item in items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return {
+            'created_at': datetime.now().isoformat(),
+            'folder': str(folder),
+            'order': order if isinstance(order, str) else getattr(order, '__name__', 'custom'),
+            'dry_run': dry_run,
+            'elapsed_seconds': round(time.time() - started, 1),
+            'summary': {'total': len(items), **counts},
+            'files': [item.to_dict() for item in items],
+        }
+
+    @staticmethod
+    def _write_results(results_file, report):
+        results_file = Path(results_file)
+        results_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = results_file.with_name(results_file.name + '.tmp')
+        tmp.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, results_file)
+        logger.info(f"💾 Resultados guardados en {results_file}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sube a StreamWish los videos pendientes de una carpeta")
+    parser.add_argument('folder', nargs='?', default=str(DownloadConfig.DEFAULT_DOWNLOAD_FOLDER),
+                        help="Carpeta de videos (por defecto la de descargas)")
+    parser.add_argument('--order', choices=sorted(ORDERS), default='largest', help="Orden de subida")
+    parser.add_argument('--recursive', action='store_true', help="Incluir subcarpetas")
+    parser.add_argument('--ext', nargs='*', help="Extensiones a subir (por defecto las de video soportadas)")
+    parser.add_argument('--limit', type=int, help="Máximo de archivos a subir en esta pasada")
+    parser.add_argument('--workers', type=int,
+                        help=f"Uploads simultáneos (por defecto {DownloadConfig.UPLOAD_MAX_PER_KEY}, "
+                             f"el límite por API key)")
+    parser.add_argument('--api-key', help="API key de StreamWish (por defecto la configurada)")
+    parser.add_argument('--results', help="Archivo JSON de resultados "
+                                          "(por defecto ~/.pornhub_downloader/bulk_upload_FECHA.json)")
+    parser.add_argument('--dry-run', action='store_true', help="Solo mostrar qué se subiría")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    folder = Path(args.folder)
+    if not folder.is_dir():
+        print(f"❌ No existe la carpeta: {folder}")
+        return 2
+
+    results = args.results or (Path.home() / ".pornhub_downloader" /
+                               f"bulk_upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    extensions = [ext if ext.startswith('.') else f'.{ext}' for ext in args.ext] if args.ext else None
+    # Una pasada usa una sola API key: el límite por key también es --workers
+    pool = UploadPool(workers=args.workers, max_per_key=args.workers) if args.workers else None
+
+    try:
+        uploader = BulkUploader(api_key=args.api_key, pool=pool)
+        report = uploader.run(folder, order=args.order, recursive=args.recursive, extensions=extensions,
+                              limit=args.limit, dry_run=args.dry_run, results_file=results)
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        return 2
+    except KeyboardInterrupt:
+        print(f"\n🛑 Interrumpido. Resultados parciales en {results}")
+        return 130
+
+    summary = report['summary']
+    print(f"\n📊 {summary['total']} videos: "
+          + ", ".join(f"{count} {status}" for status, count in summary.items() if status != 'total'))
+    print(f"💾 Resultados en {results}")
+    return 1 if summary.get(BulkItem.FAILED) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
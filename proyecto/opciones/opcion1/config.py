@@ -20,7 +20,52 @@ class DownloadConfig:
     }
     
     # Configuración de descarga
-    CHUNK_SIZE = 8192  # 8KB chunks
+    CHUNK_SIZE = 256 * 1024  # 256KB por lectura (8KB limitaba el rendimiento)
+    UPLOAD_CHUNK_SIZE = 1024 * 1024  # Trozo de envío de los uploads (un solo buffer reutilizado)
+    
+    # Descarga segmentada (varias conexiones con Range) para MP4 directos
+    DOWNLOAD_CONNECTIONS = 4                 # Conexiones simultáneas (1 = desactivada)
+    SEGMENT_SIZE = 8 * 1024 * 1024           # Tamaño de cada trozo
+    MIN_SEGMENTED_SIZE = 16 * 1024 * 1024    # Archivos más pequeños van por una sola conexión
+    SEGMENT_RETRIES = 3                      # Reintentos por trozo (continúan donde se quedó)
+    SEGMENT_RETRY_DELAY = 1.0                # Segundos (se multiplica por el intento)
+    
+    # HLS sin ffmpeg: segmentos en paralelo, escritos en orden
+    HLS_WORKERS = 6                          # Segmentos descargándose a la vez
+    HLS_MAX_BUFFERED_SEGMENTS = 12           # En vuelo o esperando turno (acota la memoria)
+    
+    # Cola de transferencias compartida por la interfaz y el programador
+    TRANSFER_WORKERS = 3                     # Trabajos (descarga + upload) a la vez
+    TRANSFER_HISTORY = 200                   # Trabajos terminados que se recuerdan (snapshot, get_job)
+    
+    # Índice local de videos descargados (ID -> archivo, hash, estado del upload)
+    VIDEO_STORE_FILE = Path.home() / ".pornhub_downloader" / "video_store.db"
+    
+    # Espacio en disco de la carpeta de descargas
+    STORAGE_BUDGET_BYTES = 0                     # Máximo ocupado por la carpeta (0 = sin límite)
+    STORAGE_MIN_FREE_BYTES = 2 * 1024 ** 3       # Espacio libre que siempre se deja en el disco
+    STORAGE_CHECK_INTERVAL = 60                  # Segundos entre revisiones en segundo plano
+    STORAGE_WAIT_TIMEOUT = 30 * 60               # Espera máxima por espacio antes de fallar la descarga
+    STORAGE_EVICT_UPLOADED = True                # Borrar videos ya subidos (LRU) si falta sitio (editable en la UI)
+    STORAGE_HLS_BYTES_PER_SECOND = 600 * 1024    # Estimación para HLS (tamaño desconocido)
+    STORAGE_UNKNOWN_SIZE = 1024 ** 3             # Estimación si tampoco se conoce la duración
+    
+    # Servidores de upload de StreamWish (compartidos, con salud y conmutación)
+    UPLOAD_SERVER_TTL = 30 * 60              # Segundos antes de pedir un servidor nuevo a la API
+    UPLOAD_SERVER_MAX_KNOWN = 4              # Servidores recordados por API key
+    UPLOAD_SERVER_MAX_FAILURES = 2           # Fallos seguidos para retirar un servidor
+    UPLOAD_SERVER_RETRY_AFTER = 10 * 60      # Un servidor retirado puede volver a usarse pasado este tiempo
+    UPLOAD_FAILOVER_ATTEMPTS = 3             # Servidores que se prueban por upload (errores de conexión o 5xx)
+    UPLOAD_HEALTH_SMOOTHING = 0.3            # Peso de la última medida en las medias de error y latencia
+    
+    # Pool de uploads (los uploads no frenan la descarga siguiente)
+    UPLOAD_WORKERS = 3                       # Uploads a la vez en total
+    UPLOAD_MAX_PER_KEY = 2                   # Uploads a la vez por API key de StreamWish
+    UPLOAD_RETRIES = 2                       # Reintentos de un upload fallido
+    UPLOAD_RETRY_DELAY = 15.0                # Segundos antes del primer reintento (se duplica)
+    
+    # Registro de uploads masivos (SHA-256 -> filecode y caché de hashes por ruta)
+    UPLOAD_LEDGER_FILE = Path.home() / ".pornhub_downloader" / "upload_ledger.db"
     MAX_FILENAME_LENGTH = 100
     
     # Extensiones de video soportadas
@@ -57,4 +102,26 @@ class DownloadConfig:
         if len(filename) > DownloadConfig.MAX_FILENAME_LENGTH:
             filename = filename[:DownloadConfig.MAX_FILENAME_LENGTH]
         
-        return filename.strip()
\ No newline at end of file
+        return filename.strip()
+
+class ScraperConfig:
+    # Paginación de listados de categoría
+    DEFAULT_MAX_PAGES = 3          # Páginas máximas por recorrido si no se indica otra cosa
+    
+    # Backend de parseo HTML: 'auto', 'selectolax', 'lxml' o 'bs4'
+    PARSER_BACKEND = 'auto'
+    
+    # Caché HTTP en disco (GET condicional con ETag/Last-Modified)
+    HTTP_CACHE_ENABLED = True
+    PARSE_MEMO_SIZE = 32           # Páginas parseadas que se recuerdan por huella del HTML
+    
+    # Caché de resultados parseados (stale-while-revalidate)
+    RESULT_CACHE_FILE = Path.home() / ".pornhub_downloader" / "scraper_cache.json"
+    CATEGORIES_CACHE_TTL = 6 * 3600       # Categorías: se refrescan cada 6 horas
+    VIDEOS_CACHE_TTL = 15 * 60            # Listados: se refrescan cada 15 minutos
+    RESULT_CACHE_MAX_STALE = 7 * 24 * 3600  # Más antiguo que esto no se sirve
+    
+    # Motor asíncrono (AsyncOpcion1Scraper)
+    ASYNC_MAX_PER_HOST = 4         # Peticiones simultáneas por host
+    ASYNC_MAX_CONNECTIONS = 32     # Conexiones totales (aiohttp) / hilos del modo sin aiohttp
+    ASYNC_SCHEDULED_CRAWL = True   # AutoScraper (tareas programadas) recorre con el motor asíncrono
@@ -2,6 +2,8 @@ import os
 import json
 from pathlib import Path
 
+from .config import DownloadConfig
+
 class StreamWishConfig:
     """
     Maneja la configuración de StreamWish
@@ -28,6 +30,8 @@ class StreamWishConfig:
             'api_key': '',
             'auto_upload': False,
             'delete_after_upload': False,  # AÑADIDO: Por defecto no eliminar
+            'pipelined_upload': False,  # Subir mientras se descarga (MP4 directos)
+            'evict_when_full': DownloadConfig.STORAGE_EVICT_UPLOADED,  # Borrar subidos si falta espacio
             'upload_settings': {
                 'file_public': 1,
                 'file_adult': 1,
@@ -88,6 +92,32 @@ class StreamWishConfig:
         """
         return self.config.get('delete_after_upload', False)
     
+    def set_evict_when_full(self, enabled):
+        """
+        Habilita/deshabilita borrar videos ya subidos cuando falta espacio
+        """
+        self.config['evict_when_full'] = enabled
+        return self._save_config()
+    
+    def is_evict_when_full_enabled(self):
+        """
+        Verifica si el gestor de espacio puede borrar videos ya subidos (los más antiguos primero)
+        """
+        return self.config.get('evict_when_full', DownloadConfig.STORAGE_EVICT_UPLOADED)
+    
+    def set_pipelined_upload(self, enabled):
+        """
+        Habilita/deshabilita la subida en paralelo con la descarga
+        """
+        self.config['pipelined_upload'] = enabled
+        return self._save_config()
+    
+    def is_pipelined_upload_enabled(self):
+        """
+        Verifica si los MP4 directos se suben a StreamWish mientras se descargan
+        """
+        return self.config.get('pipelined_upload', False)
+    
     def update_upload_settings(self, settings):
         """
         Actualiza configuración de upload
@@ -1,11 +1,12 @@
-import requests
-from bs4 import BeautifulSoup
+import io
 import logging
 import json
 import re
 import os
 import time
 import subprocess
+import threading
+from concurrent.futures import Future, CancelledError
 from urllib.parse import urljoin, urlparse
 from pathlib import Path
 from PyQt5.QtCore import QObject, pyqtSignal
@@ -14,18 +15,59 @@ from PyQt5.QtCore import QObject, pyqtSignal
 from .config import DownloadConfig
 from .config_streamwish import StreamWishConfig
 from .streamwish_uploader import StreamWishUploader
+from .segmented_download import SegmentedDownloader
+from .partial_download import PartialDownload
+from .hls import HlsDownloader
+from .upload_pipe import GrowingFile
+from .models import parse_duration_seconds, parse_video_id
+from .video_store import get_video_store
+from .storage_manager import get_storage_manager, StorageFullError
+from .upload_pool import get_upload_pool
+from utils.http_client import get_http_client
+from utils.ftp_pool import get_ftp_pool
+from utils.progress import ProgressAggregator, format_bytes
+from utils.ffmpeg import get_ffmpeg_capabilities
 
 # Configurar logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('VideoDownloader')
 
+class TransferCancelled(Exception):
+    """La transferencia se canceló desde la cola (ver transfer_manager)"""
+
+
 class ProgressReporter(QObject):
-    """Señales para reportar progreso"""
+    """
+    Señales para reportar progreso
+
+    Los bucles de transferencia no emiten directamente: pasan por los
+    agregadores download/conversion, que limitan la frecuencia de emisión y
+    calculan velocidad y tiempo restante.
+    """
     download_progress = pyqtSignal(int)  # 0-100
     upload_progress = pyqtSignal(int)    # 0-100
     conversion_progress = pyqtSignal(int)  # 0-100
+    download_stats = pyqtSignal(float, float)  # bytes/s, segundos restantes (-1 si se desconoce)
+    upload_stats = pyqtSignal(float, float)    # bytes/s, segundos restantes (-1 si se desconoce)
     status_changed = pyqtSignal(str)     # Mensaje de estado
     finished = pyqtSignal(bool)          # True si exitoso
+    
+    def __init__(self):
+        super().__init__()
+        self.download = ProgressAggregator(self.download_progress.emit, self.download_stats.emit,
+                                           label="📊 Descarga")
+        self.conversion = ProgressAggregator(self.download_progress.emit, label="🔄 Conversión HLS", unit='s')
+        self._last_status = None
+        self._last_status_time = 0.0
+    
+    def status_throttled(self, message, min_interval=1.0):
+        """Emite status_changed solo si el texto cambia y ha pasado min_interval"""
+        now = time.monotonic()
+        if message == self._last_status or now - self._last_status_time < min_interval:
+            return
+        self._last_status = message
+        self._last_status_time = now
+        self.status_changed.emit(message)
 
 class VideoDownloader(QObject):
     def __init__(self):
@@ -33,6 +75,9 @@ class VideoDownloader(QObject):
         self.base_url = "https://es.pornhub.com"
         self.headers = DownloadConfig.DEFAULT_HEADERS
         
+        # Cliente HTTP compartido (conexiones keep-alive reutilizadas)
+        self.session = get_http_client()
+        
         # Crear carpeta de descargas si no existe
         self.download_folder = DownloadConfig.get_download_folder()
         
@@ -43,9 +88,24 @@ class VideoDownloader(QObject):
         # Reporter de progreso
         self.progress_reporter = ProgressReporter()
         
-        # Variables para almacenar rutas de archivos descargados
+        # Índice local de videos (por ID) y resultado del último trabajo
+        self.video_store = get_video_store()
+        self.storage = get_storage_manager()
         self.downloaded_video_path = None
         self.downloaded_image_path = None
+        self.streamwish_filecode = None
+        self.page_duration = None  # Segundos según los flashvars de la última página analizada
+        
+        # Se activa para cancelar; se comprueba en cada trozo, segmento y fase
+        self.cancel_event = threading.Event()
+        
+        # Uploads por el pool compartido. Con defer_upload, download_video
+        # termina al acabar la descarga y el resultado del upload llega por
+        # upload_future (bool) y la señal finished
+        self.upload_pool = get_upload_pool()
+        self.defer_upload = False
+        self.upload_future = None
+        self._pool_future = None   # Future del pool del upload en curso (para cancelarlo)
         
         # Inicializar StreamWish si está configurado
         if self.streamwish_config.is_configured():
@@ -54,10 +114,49 @@ class VideoDownloader(QObject):
             self.streamwish_uploader.progress_reporter.upload_progress.connect(
                 self.progress_reporter.upload_progress.emit
             )
+            self.streamwish_uploader.progress_reporter.upload_stats.connect(
+                self.progress_reporter.upload_stats.emit
+            )
             self.streamwish_uploader.progress_reporter.status_changed.connect(
                 self.progress_reporter.status_changed.emit
             )
 
+    def _check_cancelled(self):
+        """Lanza TransferCancelled si se pidió cancelar"""
+        if self.cancel_event.is_set():
+            raise TransferCancelled("Transferencia cancelada")
+
+    def _video_id(self, video_data):
+        """ID de origen del video (viewkey)"""
+        return getattr(video_data, 'video_id', None) or parse_video_id(video_data.get('url'))
+
+    def _video_path(self, video_data, extension='.mp4'):
+        """Ruta local del video: titulo-limpio-ID (no choca entre títulos iguales)"""
+        clean_title = self._clean_filename_advanced(video_data.get('title', 'video_sin_titulo'))
+        return self.video_store.path_for(self.download_folder, clean_title, self._video_id(video_data), extension)
+
+    def _reserve_space(self, filepath, nbytes):
+        """
+        Reserva espacio en disco para una descarga (espera si falta)
+
+        Se usa con with: la reserva se libera al terminar la descarga. Si
+        no hay espacio tras STORAGE_WAIT_TIMEOUT lanza StorageFullError (y
+        lo avisa en el estado) para que el trabajo falle.
+        """
+        def on_wait(missing):
+            self.progress_reporter.status_changed.emit(
+                f"⏳ Esperando espacio en disco (faltan {format_bytes(missing)})...")
+        
+        try:
+            reservation = self.storage.reserve(nbytes, filepath, cancel_event=self.cancel_event, on_wait=on_wait)
+        except StorageFullError as e:
+            logger.error(f"❌ {str(e)}")
+            self.progress_reporter.status_changed.emit(f"❌ {str(e)}")
+            raise
+        if reservation is None:
+            self._check_cancelled()
+        return reservation
+
     def _clean_filename_advanced(self, filename):
         """Limpia nombre de archivo de forma avanzada - MÉTODO UNIFICADO"""
         import re
@@ -128,9 +227,9 @@ class VideoDownloader(QObject):
             logger.error(f"❌ Error extrayendo imagen Twitter: {str(e)}")
             return None
 
-    def _download_image(self, image_url, video_title):
+    def _download_image(self, image_url, video_data):
         """
-        Descarga la imagen localmente con nombre limpio
+        Descarga la imagen localmente con el mismo nombre que el video (titulo-limpio-ID)
         """
         try:
             if not image_url:
@@ -142,7 +241,7 @@ class VideoDownloader(QObject):
             print(f"📥 Descargando imagen desde: {image_url}")
             
             # Crear nombre de archivo limpio - SIN post_id ni _thumbnail
-            clean_title = self._clean_filename_advanced(video_title)
+            clean_title = self._clean_filename_advanced(video_data.get('title', 'video'))
             
             # Determinar extensión de la imagen
             if '.jpg' in image_url or 'jpeg' in image_url:
@@ -154,9 +253,10 @@ class VideoDownloader(QObject):
             else:
                 image_extension = '.jpg'  # Por defecto
             
-            # Nombre final: titulo-limpio.jpg (SIN _thumbnail)
-            image_filename = f"{clean_title}{image_extension}"
-            image_path = self.download_folder / image_filename
+            # Nombre final: titulo-limpio-ID.jpg (SIN _thumbnail), como el video
+            image_path = self.video_store.path_for(self.download_folder, clean_title,
+                                                   self._video_id(video_data), image_extension)
+            image_filename = image_path.name
             
             # Verificar si la imagen ya existe
             if image_path.exists():
@@ -165,7 +265,7 @@ class VideoDownloader(QObject):
                 return str(image_path)
             
             # Descargar la imagen
-            response = requests.get(image_url, headers=self.headers, timeout=30)
+            response = self.session.get(image_url, headers=self.headers, timeout=30)
             if response.status_code == 200:
                 with open(image_path, 'wb') as f:
                     f.write(response.content)
@@ -182,7 +282,7 @@ class VideoDownloader(QObject):
             print(f"❌ Error descargando imagen: {str(e)}")
             return None
 
-    def _upload_image_to_ftp(self, image_path, video_title):
+    def _upload_image_to_ftp(self, image_path):
         """
         Sube la imagen descargada por FTP con nombre limpio (SIN post_id)
         """
@@ -195,9 +295,7 @@ class VideoDownloader(QObject):
             logger.info(f"📤 Subiendo imagen por FTP: {image_path}")
             print(f"📤 Subiendo imagen: {os.path.basename(image_path)}")
             
-            # Conectar FTP
             import ftplib
-            import tempfile
             from datetime import datetime
             
             # Configuración FTP
@@ -211,120 +309,76 @@ class VideoDownloader(QObject):
             with open(image_path, 'rb') as f:
                 image_data = f.read()
             
-            # Crear nombre final limpio (sin post_id)
-            clean_title = self._clean_filename_advanced(video_title)
-            extension = os.path.splitext(image_path)[1]
-            final_filename = f"{clean_title}{extension}"
+            # Mismo nombre que la copia local: titulo-limpio-ID (sin post_id)
+            final_filename = os.path.basename(image_path)
             
             # Estructura de carpetas
             current_year = datetime.now().year
             current_month = datetime.now().strftime('%m')
             remote_folder = f"{current_year}/{current_month}"
             
-            ftp = None
-            try:
-                # Conectar FTP
-                ftp = ftplib.FTP()
-                ftp.connect(ftp_host, ftp_port)
-                ftp.login(ftp_user, ftp_pass)
-                
-                logger.info(f"🔗 Conectado a FTP: {ftp.pwd()}")
-                print(f"🔗 FTP conectado")
-                
-                # Crear estructura de carpetas
-                self._create_ftp_directories_simple(ftp, remote_folder)
-                
-                # Cambiar a directorio de destino
-                ftp.cwd(f"/{remote_folder}")
-                
-                # Crear archivo temporal para upload
-                with tempfile.NamedTemporaryFile() as temp_file:
-                    temp_file.write(image_data)
-                    temp_file.flush()
-                    
-                    # Subir archivo
-                    with open(temp_file.name, 'rb') as f:
-                        result = ftp.storbinary(f'STOR {final_filename}', f)
-                        logger.info(f"📤 Upload resultado: {result}")
-                
-                # Construir URL web final
-                web_url = f"{web_base_url}/{remote_folder}/{final_filename}"
-                
-                # Verificar que se subió
-                files = ftp.nlst()
-                if final_filename in files:
-                    logger.info(f"✅ Imagen verificada en servidor: {final_filename}")
-                    print(f"✅ Imagen confirmada: {final_filename}")
-                else:
-                    logger.warning(f"⚠️ {final_filename} no encontrado en listado")
-                
-                ftp.quit()
+            # Sesión FTP compartida: sin conectar ni hacer login por imagen
+            pool = get_ftp_pool(ftp_host, ftp_port, ftp_user, ftp_pass)
+            
+            def upload(session):
+                # Crear estructura de carpetas y entrar (las ya vistas no se recorren)
+                pool.ensure_dir(session, remote_folder)
                 
-                logger.info(f"✅ Imagen subida por FTP: {web_url}")
-                print(f"🌐 URL FTP: {web_url}")
-                return web_url
+                result = session.ftp.storbinary(f'STOR {final_filename}', io.BytesIO(image_data))
+                logger.info(f"📤 Upload resultado: {result}")
                 
+                # Verificar que se subió (SIZE: sin listar toda la carpeta)
+                try:
+                    if session.ftp.size(final_filename) == len(image_data):
+                        logger.info(f"✅ Imagen verificada en servidor: {final_filename}")
+                        print(f"✅ Imagen confirmada: {final_filename}")
+                    else:
+                        logger.warning(f"⚠️ {final_filename} en servidor con otro tamaño")
+                except ftplib.error_perm:
+                    logger.warning(f"⚠️ No se pudo verificar {final_filename}")
+            
+            try:
+                pool.run(upload)
             except Exception as ftp_error:
-                if ftp:
-                    try:
-                        ftp.quit()
-                    except:
-                        pass
                 logger.error(f"❌ Error FTP: {str(ftp_error)}")
                 print(f"❌ Error FTP: {str(ftp_error)}")
                 return None
+            
+            # Construir URL web final
+            web_url = f"{web_base_url}/{remote_folder}/{final_filename}"
+            logger.info(f"✅ Imagen subida por FTP: {web_url}")
+            print(f"🌐 URL FTP: {web_url}")
+            return web_url
                 
         except Exception as e:
             logger.error(f"❌ Error en upload FTP de imagen: {str(e)}")
             print(f"❌ Error FTP imagen: {str(e)}")
             return None
 
-    def _create_ftp_directories_simple(self, ftp, path):
-        """Crea directorios FTP de forma simple"""
-        import ftplib
-        
-        try:
-            # Dividir path: "2025/05" -> ["2025", "05"]
-            parts = path.strip('/').split('/')
-            current_path = ""
-            
-            for part in parts:
-                current_path = part if not current_path else current_path + "/" + part
-                
-                try:
-                    ftp.cwd("/" + current_path)
-                except ftplib.error_perm:
-                    # No existe, crearlo
-                    try:
-                        ftp.cwd("/")
-                        ftp.mkd(current_path)
-                        ftp.cwd("/" + current_path)
-                        print(f"✅ Creado directorio: {current_path}")
-                    except ftplib.error_perm as e:
-                        logger.error(f"❌ Error creando {current_path}: {str(e)}")
-                        return False
-            return True
-        except Exception as e:
-            logger.error(f"❌ Error creando directorios: {str(e)}")
-            return False
-
     def download_video(self, video_url, video_data):
         """
         Descarga un video desde la URL proporcionada y opcionalmente lo sube a StreamWish
         """
         try:
+            if not video_data.get('url'):
+                video_data['url'] = video_url
+            video_id = self._video_id(video_data)
+            
+            # Ya descargado o subido: se reutiliza sin ninguna petición
+            stored = self.video_store.get(video_id)
+            if stored is not None and stored.reusable:
+                return self._reuse_stored_video(stored, video_data)
+            
             self.progress_reporter.status_changed.emit("🔍 Analizando video...")
             logger.info(f"🔍 Analizando video: {video_data.get('title', 'Sin título')}")
             
             # Obtener el HTML de la página del video
-            response = requests.get(video_url, headers=self.headers)
+            response = self.session.get(video_url, headers=self.headers)
             if response.status_code != 200:
                 logger.error(f"❌ Error al acceder a la página: {response.status_code}")
                 self.progress_reporter.finished.emit(False)
                 return False
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
             # EXTRAER IMAGEN DE TWITTER META TAG
             twitter_image = self._extract_twitter_image(response.text)
             if twitter_image:
@@ -333,7 +387,7 @@ class VideoDownloader(QObject):
                 logger.info(f"🎯 Imagen Twitter agregada a video_data: {twitter_image}")
                 
                 # DESCARGAR IMAGEN LOCALMENTE con nombre limpio
-                downloaded_image_path = self._download_image(twitter_image, video_data.get('title', 'video'))
+                downloaded_image_path = self._download_image(twitter_image, video_data)
                 if downloaded_image_path:
                     self.downloaded_image_path = downloaded_image_path
                     video_data['local_image_path'] = downloaded_image_path
@@ -341,12 +395,14 @@ class VideoDownloader(QObject):
                     print(f"💾 Imagen local: {os.path.basename(downloaded_image_path)}")
                     
                     # SUBIR IMAGEN POR FTP inmediatamente
-                    ftp_image_url = self._upload_image_to_ftp(downloaded_image_path, video_data.get('title', 'video'))
+                    ftp_image_url = self._upload_image_to_ftp(downloaded_image_path)
                     if ftp_image_url:
                         video_data['ftp_image_url'] = ftp_image_url
                         logger.info(f"🌐 Imagen FTP URL: {ftp_image_url}")
                         print(f"🌐 Imagen en servidor: {ftp_image_url}")
                 
+            self._check_cancelled()
+            
             # Buscar las URLs de video en los scripts
             self.progress_reporter.status_changed.emit("🔍 Buscando URLs de video...")
             video_urls = self._extract_video_urls(response.text)
@@ -370,8 +426,11 @@ class VideoDownloader(QObject):
             # Descargar según el formato
             self.progress_reporter.status_changed.emit(f"⬇️ Descargando {video_format.upper()}...")
             
+            pipelined_upload = None
             if video_format == 'hls':
                 download_success = self._download_hls_with_ffmpeg(best_video_url, video_data)
+            elif video_format == 'mp4' and self._pipelined_upload_enabled():
+                download_success, pipelined_upload = self._download_and_upload_pipelined(best_video_url, video_data)
             elif video_format == 'mp4':
                 download_success = self._download_direct_mp4(best_video_url, video_data)
             else:
@@ -379,21 +438,28 @@ class VideoDownloader(QObject):
                 self.progress_reporter.finished.emit(False)
                 return False
             
+            self._check_cancelled()
+            
             if download_success:
                 self.progress_reporter.download_progress.emit(100)
                 self.progress_reporter.status_changed.emit("✅ Descarga completada!")
                 
-                # Guardar ruta del video descargado con nombre limpio
-                title = video_data.get('title', 'video_sin_titulo')
-                clean_title = self._clean_filename_advanced(title)
-                self.downloaded_video_path = str(self.download_folder / f"{clean_title}.mp4")
+                # Registrar en el índice (la ruta puede cambiar si el contenido ya estaba)
+                stored = self.video_store.add(
+                    video_id, self._video_path(video_data),
+                    title=video_data.get('title'), source_url=video_url,
+                    image_path=self.downloaded_image_path, image_url=video_data.get('ftp_image_url')
+                )
+                self.downloaded_video_path = stored.path
                 
                 # Si StreamWish está configurado para auto-upload
-                if self.streamwish_config.is_auto_upload_enabled():
-                    time.sleep(1)  # Pequeña pausa visual
-                    upload_success = self._upload_to_streamwish(video_data)
-                    self.progress_reporter.finished.emit(upload_success)
-                    return upload_success
+                if pipelined_upload is not None:
+                    # Ya se subió mientras se descargaba
+                    self._record_upload(video_id, pipelined_upload)
+                    self.progress_reporter.finished.emit(pipelined_upload)
+                    return pipelined_upload
+                elif self.streamwish_config.is_auto_upload_enabled():
+                    return self._upload_via_pool(video_data, video_id)
                 else:
                     self.progress_reporter.finished.emit(True)
                     return True
@@ -401,84 +467,259 @@ class VideoDownloader(QObject):
                 self.progress_reporter.finished.emit(False)
                 return False
             
+        except TransferCancelled:
+            logger.info(f"🛑 Descarga cancelada: {video_data.get('title', 'Sin título')}")
+            self.progress_reporter.status_changed.emit("🛑 Cancelado")
+            self.progress_reporter.finished.emit(False)
+            return False
         except Exception as e:
             logger.error(f"❌ Error general durante la descarga: {str(e)}")
             self.progress_reporter.status_changed.emit(f"❌ Error: {str(e)}")
             self.progress_reporter.finished.emit(False)
             return False
     
-    def _upload_to_streamwish(self, video_data):
+    def _reuse_stored_video(self, stored, video_data):
+        """
+        Completa un trabajo con un video que ya está en el almacén local
+        """
+        logger.info(f"♻️ Video ya en el almacén ({stored.video_id}), sin descargar: {video_data.get('title', '')[:50]}")
+        self.video_store.touch(stored.video_id)
+        self.progress_reporter.status_changed.emit("♻️ Video ya descargado")
+        self.progress_reporter.download_progress.emit(100)
+        
+        self.downloaded_video_path = stored.path
+        self.downloaded_image_path = stored.image_path
+        if stored.image_path:
+            video_data['local_image_path'] = stored.image_path
+        if stored.image_url:
+            video_data['ftp_image_url'] = stored.image_url
+        
+        if stored.is_uploaded:
+            self.streamwish_filecode = stored.filecode
+            logger.info(f"🔗 Ya subido a StreamWish: {stored.filecode}")
+            success = True
+        elif self.streamwish_config.is_auto_upload_enabled():
+            return self._upload_via_pool(video_data, stored.video_id)
+        else:
+            success = True
+        
+        self.progress_reporter.finished.emit(success)
+        return success
+    
+    def _record_upload(self, video_id, success):
+        """Guarda en el índice el resultado del upload"""
+        if success and self.streamwish_filecode:
+            self.video_store.mark_uploaded(video_id, self.streamwish_filecode)
+            # Borrar tras subir: lo hace el gestor de espacio en segundo plano
+            if self.streamwish_config.is_delete_after_upload_enabled():
+                self.storage.schedule_eviction(video_id)
+                logger.info("🗑️ El archivo local se borrará en segundo plano")
+        elif not success:
+            self.video_store.mark_upload_failed(video_id)
+    
+    def _upload_via_pool(self, video_data, video_id):
+        """
+        Sube el video descargado con el pool de uploads y termina el trabajo
+        
+        Con defer_upload no espera: devuelve True en cuanto el upload está en
+        cola y el resultado llega después por upload_future y finished.
+        """
+        future = self._queue_upload(video_data)
+        if future is None:
+            self._record_upload(video_id, False)
+            self.progress_reporter.finished.emit(False)
+            return False
+        
+        if self.defer_upload:
+            self.upload_future = Future()
+            future.add_done_callback(lambda done: self._complete_deferred_upload(done, video_id))
+            return True
+        
+        success = self._apply_upload_result(video_id, self._pool_result(future))
+        self.progress_reporter.finished.emit(success)
+        return success
+    
+    def _complete_deferred_upload(self, future, video_id):
+        """Se llama desde el pool al terminar un upload diferido"""
+        try:
+            success = self._apply_upload_result(video_id, self._pool_result(future))
+        except Exception as e:
+            logger.error(f"❌ Error registrando el upload: {str(e)}")
+            success = False
+        self.progress_reporter.finished.emit(success)
+        self.upload_future.set_result(success)
+    
+    def _queue_upload(self, video_data):
         """
-        Sube el video descargado a StreamWish
+        Encola en el pool el upload del video descargado
+        
+        Returns:
+            Future con un UploadResult, o None si no se puede subir
         """
         try:
             if not self.streamwish_uploader:
                 logger.warning("⚠️ StreamWish no está configurado correctamente")
-                return False
+                return None
             
-            # Construir la ruta del archivo descargado con nombre limpio
-            title = video_data.get('title', 'video_sin_titulo')
-            clean_title = self._clean_filename_advanced(title)
-            video_file = self.download_folder / f"{clean_title}.mp4"
+            # Archivo registrado en el índice (o el nombre que le corresponde)
+            if self.downloaded_video_path:
+                video_file = Path(self.downloaded_video_path)
+            else:
+                video_file = self._video_path(video_data)
             
             if not video_file.exists():
                 logger.error(f"❌ Archivo descargado no encontrado: {video_file}")
-                return False
-            
-            self.progress_reporter.status_changed.emit("📤 Iniciando upload a StreamWish...")
-            logger.info(f"📤 Iniciando upload a StreamWish: {clean_title}")
-            
-            # Preparar datos adicionales para el upload
-            upload_data = {
-                'title': title,
-                'description': f"Video descargado desde {video_data.get('url', '')}",
-                'tags': f"pornhub, {video_data.get('uploader', '')}, hd".replace(', ,', ',').strip(','),
-                'duration': video_data.get('duration', ''),
-                'views': video_data.get('views', ''),
-                'rating': video_data.get('rating', '')
-            }
+                return None
             
-            # Obtener configuración de upload
-            upload_settings = self.streamwish_config.get_upload_settings()
+            self.progress_reporter.status_changed.emit("📤 En cola de upload a StreamWish...")
+            logger.info(f"📤 Upload a StreamWish en cola: {video_file.stem}")
             
-            # Realizar el upload
-            result = self.streamwish_uploader.upload_video(
-                str(video_file), 
-                upload_data, 
-                upload_settings
+            self._pool_future = self.upload_pool.submit(
+                video_file,
+                self._streamwish_upload_data(video_data),
+                api_key=self.streamwish_uploader.api_key,
+                custom_config=self.streamwish_config.get_upload_settings(),
+                progress_reporter=self.progress_reporter,
+                cancel_event=self.cancel_event,
             )
-            
-            if result and result.get('status') == 200:
-                logger.info("✅ Upload a StreamWish completado exitosamente")
-                self.progress_reporter.status_changed.emit("✅ Upload completado!")
-                
-                # Mostrar información de los archivos subidos
-                if 'files' in result:
-                    for file_info in result['files']:
-                        filecode = file_info.get('filecode', 'N/A')
-                        logger.info(f"🔗 StreamWish Code: {filecode}")
-                        logger.info(f"🌐 Ver en: https://streamwish.to/{filecode}")
-                
-                # Si está configurado para eliminar después del upload
-                if self.streamwish_config.is_delete_after_upload_enabled():
-                    try:
-                        video_file.unlink()
-                        logger.info(f"🗑️ Archivo local eliminado: {clean_title}")
-                        self.progress_reporter.status_changed.emit("🗑️ Archivo local eliminado")
-                    except Exception as e:
-                        logger.warning(f"⚠️ No se pudo eliminar el archivo local: {str(e)}")
-                
-                return True
-            else:
-                logger.error("❌ Error en upload a StreamWish")
-                self.progress_reporter.status_changed.emit("❌ Error en upload")
-                return False
+            return self._pool_future
                 
         except Exception as e:
             logger.error(f"❌ Error durante upload a StreamWish: {str(e)}")
             self.progress_reporter.status_changed.emit(f"❌ Error upload: {str(e)}")
+            return None
+    
+    def cancel_upload(self):
+        """Saca del pool el upload de este downloader (en cola o esperando reintento)"""
+        if self._pool_future is not None:
+            self.upload_pool.cancel(self._pool_future)
+    
+    @staticmethod
+    def _pool_result(future):
+        """UploadResult de un Future del pool (None si se canceló)"""
+        try:
+            return future.result()
+        except CancelledError:
+            return None
+    
+    def _apply_upload_result(self, video_id, result):
+        """Registra el resultado de un upload del pool en el downloader y el índice"""
+        success = self._handle_streamwish_result(result.response if result else None, self.downloaded_video_path)
+        self._record_upload(video_id, success)
+        return success
+    
+    def _streamwish_upload_data(self, video_data):
+        """
+        Datos del video que acompañan al upload
+        """
+        return {
+            'title': video_data.get('title', 'video_sin_titulo'),
+            'description': f"Video descargado desde {video_data.get('url', '')}",
+            'tags': f"pornhub, {video_data.get('uploader', '')}, hd".replace(', ,', ',').strip(','),
+            'duration': video_data.get('duration', ''),
+            'views': video_data.get('views', ''),
+            'rating': video_data.get('rating', '')
+        }
+    
+    def _handle_streamwish_result(self, result, video_file):
+        """
+        Registra el resultado del upload (el borrado local lo decide _record_upload)
+        """
+        if result and result.get('status') == 200:
+            logger.info("✅ Upload a StreamWish completado exitosamente")
+            self.progress_reporter.status_changed.emit("✅ Upload completado!")
+            
+            # Mostrar información de los archivos subidos
+            if 'files' in result:
+                if result['files']:
+                    self.streamwish_filecode = result['files'][0].get('filecode')
+                for file_info in result['files']:
+                    filecode = file_info.get('filecode', 'N/A')
+                    logger.info(f"🔗 StreamWish Code: {filecode}")
+                    logger.info(f"🌐 Ver en: https://streamwish.to/{filecode}")
+            
+            return True
+        else:
+            logger.error("❌ Error en upload a StreamWish")
+            self.progress_reporter.status_changed.emit("❌ Error en upload")
             return False
     
+    def _download_and_upload_pipelined(self, video_url, video_data):
+        """
+        Descarga un MP4 directo y lo sube a StreamWish a la vez
+        
+        El upload sigue al .part por el prefijo ya escrito, así que funciona
+        con varias conexiones por rangos y al reanudar. El archivo local se
+        conserva como en una descarga normal.
+        
+        Returns:
+            tuple: (descarga correcta, upload correcto o None si hay que subir
+            después de la forma habitual)
+        """
+        filepath = self._video_path(video_data)
+        
+        if filepath.exists():
+            logger.info(f"ℹ️ El archivo ya existe: {filepath.name}")
+            self.progress_reporter.download_progress.emit(100)
+            return True, None
+        
+        downloader = SegmentedDownloader(self.session, self.headers)
+        try:
+            info = downloader.probe(video_url)
+        except Exception as e:
+            logger.error(f"❌ Error sondeando el video: {str(e)}")
+            return False, None
+        
+        if not (info['accept_ranges'] and info['size']):
+            # Sin tamaño conocido no se puede anunciar Content-Length
+            logger.info("ℹ️ El servidor no permite subir en paralelo; upload al terminar")
+            return self._download_file(video_url, video_data, '.mp4'), None
+        
+        partial = PartialDownload(filepath)
+        growing = GrowingFile(partial.part_path, info['size'])
+        upload_result = {}
+        
+        def upload():
+            upload_result['result'] = self.streamwish_uploader.upload_stream(
+                growing, filepath.name, info['size'],
+                self._streamwish_upload_data(video_data),
+                self.streamwish_config.get_upload_settings()
+            )
+        
+        upload_thread = threading.Thread(target=upload, name='pipelined-upload', daemon=True)
+        
+        reservation = self._reserve_space(filepath, info['size'])
+        
+        logger.info(f"⬇️📤 Descargando y subiendo a la vez: {filepath.name}")
+        self.progress_reporter.download.reset()
+        upload_thread.start()
+        try:
+            with reservation:
+                partial = downloader.download(video_url, filepath, progress_callback=self._report_download_progress,
+                                              info=info, tee=growing, finalize=False)
+        except Exception as e:
+            growing.fail(e)
+            upload_thread.join()
+            if isinstance(e, TransferCancelled):
+                raise
+            logger.error(f"❌ Error durante la descarga del archivo: {str(e)}")
+            self.progress_reporter.status_changed.emit(f"❌ Error descarga: {str(e)}")
+            return False, None
+        
+        self.progress_reporter.download_progress.emit(100)
+        self.progress_reporter.status_changed.emit("📤 Terminando upload a StreamWish...")
+        upload_thread.join()
+        
+        # Renombrar cuando el upload ya no lee el .part
+        partial.finish(info['size'])
+        logger.info(f"✅ Descarga completada: {filepath}")
+        
+        result = upload_result.get('result')
+        if not result:
+            logger.warning("⚠️ El upload en paralelo falló; se subirá el archivo completo")
+            return True, None
+        return True, self._handle_streamwish_result(result, filepath)
+    
     def configure_streamwish(self, api_key, auto_upload=True, upload_settings=None):
         """
         Configura StreamWish con los parámetros proporcionados
@@ -504,6 +745,9 @@ class VideoDownloader(QObject):
             self.streamwish_uploader.progress_reporter.upload_progress.connect(
                 self.progress_reporter.upload_progress.emit
             )
+            self.streamwish_uploader.progress_reporter.upload_stats.connect(
+                self.progress_reporter.upload_stats.emit
+            )
             self.streamwish_uploader.progress_reporter.status_changed.connect(
                 self.progress_reporter.status_changed.emit
             )
@@ -561,13 +805,23 @@ class VideoDownloader(QObject):
                     'description': f"Video subido desde archivo local: {filename}"
                 }
             
-            result = self.streamwish_uploader.upload_video(
+            future = self._pool_future = self.upload_pool.submit(
                 video_path,
                 video_data,
-                self.streamwish_config.get_upload_settings()
+                api_key=self.streamwish_uploader.api_key,
+                custom_config=self.streamwish_config.get_upload_settings(),
+                progress_reporter=self.progress_reporter,
+                cancel_event=self.cancel_event,
             )
+            result = self._pool_result(future)
             
-            return result and result.get('status') == 200
+            success = bool(result and result.success)
+            if success:
+                self.streamwish_filecode = result.filecode
+            stored = self.video_store.find_by_path(video_path)
+            if stored is not None:
+                self._record_upload(stored.video_id, success)
+            return success
             
         except Exception as e:
             logger.error(f"❌ Error subiendo video existente: {str(e)}")
@@ -578,6 +832,7 @@ class VideoDownloader(QObject):
         Extrae las URLs de video del HTML, priorizando MP4 directo sobre HLS
         """
         video_urls = {}
+        self.page_duration = None
         
         try:
             # Buscar en flashvars
@@ -591,6 +846,9 @@ class VideoDownloader(QObject):
                 try:
                     flashvars = json.loads(flashvars_str)
                     
+                    # Duración declarada por la página (evita sondear el stream)
+                    self.page_duration = parse_duration_seconds(flashvars.get('video_duration'))
+                    
                     # Buscar mediaDefinitions
                     if 'mediaDefinitions' in flashvars:
                         for media in flashvars['mediaDefinitions']:
@@ -680,6 +938,14 @@ class VideoDownloader(QObject):
         logger.info(f"⚠️ Usando formato disponible: {first_quality} ({video_info['format']})")
         return video_info['url'], video_info['format']
     
+    def _pipelined_upload_enabled(self):
+        """
+        Subir a StreamWish mientras se descarga (requiere auto-upload)
+        """
+        return (self.streamwish_uploader is not None and
+                self.streamwish_config.is_auto_upload_enabled() and
+                self.streamwish_config.is_pipelined_upload_enabled())
+    
     def _download_direct_mp4(self, video_url, video_data):
         """
         Descarga un archivo MP4 directo con progreso y nombre limpio
@@ -690,14 +956,13 @@ class VideoDownloader(QObject):
         """
         Descarga un archivo directo con progreso y nombre limpio
         """
+        filepath = None
         try:
-            # Limpiar el nombre del archivo
-            title = video_data.get('title', 'video_sin_titulo')
-            clean_title = self._clean_filename_advanced(title)
-            filename = f"{clean_title}{extension}"
-            filepath = self.download_folder / filename
+            # Nombre limpio con el ID del video
+            filepath = self._video_path(video_data, extension)
+            filename = filepath.name
             
-            # Verificar si el archivo ya existe
+            # Completo pero sin registrar en el índice (solo completo lleva el nombre final)
             if filepath.exists():
                 logger.info(f"ℹ️ El archivo ya existe: {filename}")
                 self.progress_reporter.download_progress.emit(100)
@@ -705,63 +970,53 @@ class VideoDownloader(QObject):
             
             logger.info(f"⬇️ Descargando: {filename}")
             
-            # Realizar la descarga
-            with requests.get(video_url, headers=self.headers, stream=True) as response:
-                response.raise_for_status()
-                
-                # Obtener el tamaño total si está disponible
-                total_size = int(response.headers.get('content-length', 0))
-                
-                with open(filepath, 'wb') as f:
-                    downloaded = 0
-                    chunk_size = DownloadConfig.CHUNK_SIZE
-                    
-                    for chunk in response.iter_content(chunk_size=chunk_size):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            
-                            # Calcular y emitir progreso
-                            if total_size > 0:
-                                progress = int((downloaded / total_size) * 100)
-                                self.progress_reporter.download_progress.emit(progress)
-                                
-                                # Log cada 10%
-                                if progress % 10 == 0 and progress > 0:
-                                    mb_downloaded = downloaded / (1024*1024)
-                                    mb_total = total_size / (1024*1024)
-                                    logger.info(f"📊 Descarga: {progress}% ({mb_downloaded:.1f}/{mb_total:.1f} MB)")
-                            else:
-                                # Si no conocemos el tamaño total, actualizar cada MB
-                                if downloaded % (1024 * 1024) == 0:
-                                    mb_downloaded = downloaded / (1024*1024)
-                                    logger.info(f"📊 Descargado: {mb_downloaded:.1f}MB")
+            # Sondear primero para reservar el espacio antes de empezar
+            downloader = SegmentedDownloader(self.session, self.headers)
+            info = downloader.probe(video_url)
+            
+            # Varias conexiones por rangos si el servidor lo permite
+            with self._reserve_space(filepath, info['size'] or DownloadConfig.STORAGE_UNKNOWN_SIZE):
+                self.progress_reporter.download.reset()
+                downloader.download(video_url, filepath, progress_callback=self._report_download_progress, info=info)
             
             logger.info(f"✅ Descarga completada: {filepath}")
             return True
             
+        except TransferCancelled:
+            # El .part se conserva igual que tras un error
+            raise
         except Exception as e:
             logger.error(f"❌ Error durante la descarga del archivo: {str(e)}")
             self.progress_reporter.status_changed.emit(f"❌ Error descarga: {str(e)}")
+            # Lo descargado queda en el .part y el próximo intento lo reanuda
+            if filepath is not None and PartialDownload(filepath).part_path.exists():
+                logger.info(f"⏸️ Descarga parcial conservada para reanudar: {filepath.name}.part")
             return False
     
+    def _report_download_progress(self, downloaded, total_size):
+        """
+        Pasa el progreso de descarga al agregador (emite y registra con límite)
+        """
+        self._check_cancelled()
+        self.progress_reporter.download.update(downloaded, total_size)
+    
     def _download_hls_with_ffmpeg(self, m3u8_url, video_data):
         """
         Descarga un stream HLS usando ffmpeg con progreso real y nombre limpio
         """
         try:
-            # Verificar si ffmpeg está instalado
-            try:
-                subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-            except (subprocess.CalledProcessError, FileNotFoundError):
+            # Capacidades de ffmpeg (consultadas una vez por proceso)
+            ffmpeg = get_ffmpeg_capabilities()
+            if not ffmpeg.available:
                 logger.error("❌ FFmpeg no está instalado. Instalando...")
                 return self._install_and_use_ffmpeg(m3u8_url, video_data)
+            if not ffmpeg.supports_muxer('mp4'):
+                logger.warning("⚠️ Este ffmpeg no puede escribir MP4; descarga manual")
+                return self._download_hls_manually(m3u8_url, video_data)
             
-            # Limpiar el nombre del archivo
-            title = video_data.get('title', 'video_sin_titulo')
-            clean_title = self._clean_filename_advanced(title)
-            filename = f"{clean_title}.mp4"
-            filepath = self.download_folder / filename
+            # Nombre limpio con el ID del video
+            filepath = self._video_path(video_data)
+            filename = filepath.name
             
             # Verificar si el archivo ya existe
             if filepath.exists():
@@ -772,58 +1027,51 @@ class VideoDownloader(QObject):
             logger.info(f"⬇️ Descargando HLS: {filename}")
             self.progress_reporter.status_changed.emit("📋 Analizando video HLS...")
             
-            # Primero obtener información del video para calcular duración
-            info_cmd = [
-                'ffprobe',
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                m3u8_url
-            ]
-            
-            try:
-                info_result = subprocess.run(info_cmd, capture_output=True, text=True, timeout=30)
-                duration = None
-                if info_result.returncode == 0:
-                    import json
-                    info_data = json.loads(info_result.stdout)
-                    if 'format' in info_data and 'duration' in info_data['format']:
-                        duration = float(info_data['format']['duration'])
-                        logger.info(f"🕐 Duración del video: {duration:.1f} segundos")
-            except:
-                duration = None
+            # Duración para el progreso: de la página o de la playlist (sin ffprobe)
+            duration = self._get_hls_duration(m3u8_url, video_data)
+            if duration:
+                logger.info(f"🕐 Duración del video: {duration:.1f} segundos")
+            else:
                 logger.warning("⚠️ No se pudo obtener duración del video")
             
             self.progress_reporter.status_changed.emit("🔄 Convirtiendo video HLS...")
             
+            # ffmpeg escribe en .part; el nombre final solo si termina bien
+            partial = PartialDownload(filepath)
+            
             # Comando ffmpeg con progreso
             ffmpeg_cmd = [
-                'ffmpeg',
+                ffmpeg.ffmpeg_path,
                 '-i', m3u8_url,
                 '-c', 'copy',  # Copiar sin recodificar
-                '-bsf:a', 'aac_adtstoasc',  # Fix para audio AAC
+            ]
+            if ffmpeg.supports_bsf('aac_adtstoasc'):
+                ffmpeg_cmd += ['-bsf:a', 'aac_adtstoasc']  # Fix para audio AAC
+            ffmpeg_cmd += [
                 '-progress', 'pipe:1',  # Enviar progreso a stdout
+                '-f', 'mp4',  # El formato no se deduce de la extensión .part
                 '-y',  # Sobrescribir archivo si existe
-                str(filepath)
+                str(partial.part_path)
             ]
             
-            # Ejecutar ffmpeg con monitoreo de progreso
-            process = subprocess.Popen(
-                ffmpeg_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                bufsize=1
-            )
-            
-            # Monitorear progreso en tiempo real
-            self._monitor_ffmpeg_progress(process, duration)
-            
-            # Esperar a que termine el proceso
-            stdout, stderr = process.communicate()
+            with self._reserve_space(filepath, self.storage.estimate_hls_size(duration)):
+                # Ejecutar ffmpeg con monitoreo de progreso
+                process = subprocess.Popen(
+                    ffmpeg_cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    universal_newlines=True,
+                    bufsize=1
+                )
+                
+                # Monitorear progreso en tiempo real
+                self._monitor_ffmpeg_progress(process, duration)
+                
+                # Esperar a que termine el proceso
+                stdout, stderr = process.communicate()
             
-            if process.returncode == 0:
+            if process.returncode == 0 and partial.part_path.exists():
+                partial.finish()
                 self.progress_reporter.download_progress.emit(100)
                 self.progress_reporter.status_changed.emit("✅ Conversión HLS completada!")
                 logger.info(f"✅ Descarga HLS completada: {filepath}")
@@ -831,6 +1079,8 @@ class VideoDownloader(QObject):
             else:
                 logger.error(f"❌ Error en ffmpeg: {stderr}")
                 self.progress_reporter.status_changed.emit("❌ Error en conversión HLS")
+                # ffmpeg no puede continuar un mp4 a medias: no sirve de nada conservarlo
+                partial.discard()
                 return False
                 
         except Exception as e:
@@ -838,14 +1088,40 @@ class VideoDownloader(QObject):
             self.progress_reporter.status_changed.emit(f"❌ Error HLS: {str(e)}")
             return False
     
+    def _get_hls_duration(self, m3u8_url, video_data):
+        """
+        Duración en segundos para calcular el progreso de ffmpeg
+
+        Orden: flashvars de la página, duración del listado y, como último
+        recurso, la suma de #EXTINF de la playlist (solo texto, sin segmentos).
+        """
+        if self.page_duration:
+            return float(self.page_duration)
+        
+        duration = getattr(video_data, 'duration_seconds', None) or parse_duration_seconds(video_data.get('duration'))
+        if duration:
+            return float(duration)
+        
+        try:
+            return HlsDownloader(self.session, self.headers).load_playlist(m3u8_url).duration or None
+        except Exception as e:
+            logger.debug(f"Playlist sin duración: {str(e)}")
+            return None
+    
     def _monitor_ffmpeg_progress(self, process, total_duration=None):
         """
         Monitorea el progreso de FFmpeg en tiempo real
         """
         try:
             current_time = 0
+            self.progress_reporter.conversion.reset()
             
             while True:
+                if self.cancel_event.is_set():
+                    logger.info("🛑 Conversión cancelada, deteniendo ffmpeg")
+                    process.terminate()
+                    break
+                
                 output = process.stdout.readline()
                 if output == '' and process.poll() is not None:
                     break
@@ -870,19 +1146,13 @@ class VideoDownloader(QObject):
                                 current_time = float(time_str) / 1000000
                             
                             # Calcular progreso si conocemos la duración total
+                            # (el agregador limita emisiones y registra cada 10%)
                             if total_duration and total_duration > 0:
-                                progress = min(int((current_time / total_duration) * 100), 99)
-                                self.progress_reporter.download_progress.emit(progress)
-                                
-                                if progress % 10 == 0 and progress > 0:
-                                    logger.info(f"🔄 Conversión HLS: {progress}% ({current_time:.1f}s/{total_duration:.1f}s)")
+                                self.progress_reporter.conversion.update(
+                                    min(current_time, total_duration * 0.99), total_duration)
                             else:
-                                # Si no conocemos la duración, mostrar tiempo transcurrido
-                                if int(current_time) % 5 == 0:  # Log cada 5 segundos
-                                    logger.info(f"🔄 Procesando HLS: {current_time:.1f}s")
-                                    # Progreso estimado basado en tiempo (máximo 90%)
-                                    estimated_progress = min(int(current_time * 2), 90)
-                                    self.progress_reporter.download_progress.emit(estimated_progress)
+                                # Progreso estimado basado en tiempo (máximo 90%)
+                                self.progress_reporter.conversion.report_percent(min(int(current_time * 2), 90))
                         
                         except ValueError:
                             continue
@@ -891,10 +1161,10 @@ class VideoDownloader(QObject):
                     elif line.startswith('progress='):
                         status = line.split('=')[1]
                         if status == 'end':
-                            self.progress_reporter.download_progress.emit(100)
+                            self.progress_reporter.conversion.finish()
                             break
                         elif status == 'continue':
-                            self.progress_reporter.status_changed.emit(f"🔄 Convirtiendo... {current_time:.1f}s")
+                            self.progress_reporter.status_throttled(f"🔄 Convirtiendo... {current_time:.0f}s")
         
         except Exception as e:
             logger.error(f"❌ Error monitoreando progreso FFmpeg: {str(e)}")
@@ -913,7 +1183,8 @@ class VideoDownloader(QObject):
             if system == "darwin":  # macOS
                 try:
                     subprocess.run(['brew', 'install', 'ffmpeg'], check=True)
-                    return self._download_hls_with_ffmpeg(m3u8_url, video_data)
+                    if get_ffmpeg_capabilities(refresh=True).available:
+                        return self._download_hls_with_ffmpeg(m3u8_url, video_data)
                 except subprocess.CalledProcessError:
                     logger.error("❌ No se pudo instalar ffmpeg con Homebrew")
             
@@ -921,7 +1192,8 @@ class VideoDownloader(QObject):
                 try:
                     subprocess.run(['sudo', 'apt', 'update'], check=True)
                     subprocess.run(['sudo', 'apt', 'install', '-y', 'ffmpeg'], check=True)
-                    return self._download_hls_with_ffmpeg(m3u8_url, video_data)
+                    if get_ffmpeg_capabilities(refresh=True).available:
+                        return self._download_hls_with_ffmpeg(m3u8_url, video_data)
                 except subprocess.CalledProcessError:
                     logger.error("❌ No se pudo instalar ffmpeg con apt")
             
@@ -935,84 +1207,70 @@ class VideoDownloader(QObject):
     
     def _download_hls_manually(self, m3u8_url, video_data):
         """
-        Descarga manual de HLS obteniendo la playlist y segmentos con nombre limpio
+        Descarga manual de HLS: segmentos en paralelo escritos en orden en el .part
         """
         try:
             logger.info("📋 Descargando playlist HLS...")
             self.progress_reporter.status_changed.emit("📋 Analizando playlist HLS...")
             
-            # Descargar playlist m3u8
-            response = requests.get(m3u8_url, headers=self.headers)
-            if response.status_code != 200:
-                logger.error(f"❌ Error descargando playlist: {response.status_code}")
-                return False
-            
-            playlist_content = response.text
-            
-            # Extraer URLs de segmentos
-            segment_urls = []
-            base_url = m3u8_url.rsplit('/', 1)[0] + '/'
+            # Playlist de medios (si es maestra se elige la variante)
+            hls = HlsDownloader(self.session, self.headers)
+            playlist = hls.load_playlist(m3u8_url)
+            segment_count = len(playlist.segments)
+            logger.info(f"📦 Encontrados {segment_count} segmentos")
             
-            for line in playlist_content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    if line.startswith('http'):
-                        segment_urls.append(line)
-                    else:
-                        segment_urls.append(base_url + line)
+            # Los segmentos se añaden en orden al .part; el sidecar guarda
+            # cuántos hay escritos para reanudar desde el último completo
+            final_path = self._video_path(video_data)
             
-            if not segment_urls:
-                logger.error("❌ No se encontraron segmentos en la playlist")
-                return False
-            
-            logger.info(f"📦 Encontrados {len(segment_urls)} segmentos")
-            
-            # Descargar segmentos y combinar con nombre limpio
-            title = video_data.get('title', 'video_sin_titulo')
-            clean_title = self._clean_filename_advanced(title)
-            temp_folder = self.download_folder / f"temp_{clean_title}"
-            temp_folder.mkdir(exist_ok=True)
+            if final_path.exists():
+                logger.info(f"ℹ️ El archivo ya existe: {final_path.name}")
+                self.progress_reporter.download_progress.emit(100)
+                return True
             
-            # Descargar cada segmento con progreso
-            for i, segment_url in enumerate(segment_urls):
-                try:
-                    segment_response = requests.get(segment_url, headers=self.headers)
-                    if segment_response.status_code == 200:
-                        segment_path = temp_folder / f"segment_{i:04d}.ts"
-                        with open(segment_path, 'wb') as f:
-                            f.write(segment_response.content)
+            partial = PartialDownload(final_path)
+            if (partial.load() and partial.matches_hls(segment_count) and
+                    partial.part_path.stat().st_size >= partial.meta['bytes']):
+                first_segment = partial.meta['segments_done']
+                written = partial.meta['bytes']
+                logger.info(f"⏯️ Reanudando HLS desde el segmento {first_segment + 1}/{segment_count}")
+            else:
+                partial.start_hls(playlist.url, segment_count)
+                first_segment, written = 0, 0
+            
+            with self._reserve_space(final_path, self.storage.estimate_hls_size(playlist.duration)):
+                self.progress_reporter.download.reset()
+                with open(partial.part_path, 'r+b' if first_segment else 'wb') as output_file:
+                    # Descartar lo escrito después del último segmento registrado
+                    output_file.truncate(written)
+                    output_file.seek(written)
+                    
+                    def on_segment(segments_done, segment_bytes):
+                        nonlocal written
+                        written += segment_bytes
+                        partial.mark_segment(segments_done, written)
+                        self._check_cancelled()
                         
-                        # Calcular y emitir progreso
-                        progress = int((i + 1) / len(segment_urls) * 100)
-                        self.progress_reporter.download_progress.emit(progress)
+                        # Calcular y emitir progreso (con el límite del agregador)
+                        progress = int(segments_done / segment_count * 100)
+                        self.progress_reporter.download.report_percent(progress)
                         
-                        if i % 10 == 0:  # Log cada 10 segmentos
-                            logger.info(f"📊 Descargando segmentos: {progress}% ({i+1}/{len(segment_urls)})")
+                        if segments_done % 10 == 0:  # Log cada 10 segmentos
+                            logger.info(f"📊 Descargando segmentos: {progress}% ({segments_done}/{segment_count})")
                     
-                except Exception as e:
-                    logger.warning(f"⚠️ Error descargando segmento {i}: {str(e)}")
-            
-            # Combinar segmentos
-            self.progress_reporter.status_changed.emit("🔧 Combinando segmentos...")
-            final_path = self.download_folder / f"{clean_title}.mp4"
-            with open(final_path, 'wb') as output_file:
-                for i in range(len(segment_urls)):
-                    segment_path = temp_folder / f"segment_{i:04d}.ts"
-                    if segment_path.exists():
-                        with open(segment_path, 'rb') as segment_file:
-                            output_file.write(segment_file.read())
-            
-            # Limpiar archivos temporales
-            import shutil
-            shutil.rmtree(temp_folder)
+                    hls.download(playlist, output_file, start=first_segment, on_segment=on_segment)
+            
+            partial.finish(written)
             
             logger.info(f"✅ Video HLS combinado: {final_path}")
             return True
             
+        except TransferCancelled:
+            raise
         except Exception as e:
             logger.error(f"❌ Error en descarga manual HLS: {str(e)}")
             return False
-
+    
     def get_downloaded_paths(self):
         """
         Devuelve las rutas de los archivos descargados
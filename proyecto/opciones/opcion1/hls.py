@@ -0,0 +1,219 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from .config import DownloadConfig
+
+logger = logging.getLogger('HlsDownloader')
+
+_ATTRIBUTE_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+class HlsError(Exception):
+    """Playlist HLS inválida o no soportada"""
+
+
+class HlsVariant:
+    """Una calidad de una playlist maestra"""
+    __slots__ = ('url', 'bandwidth', 'height')
+
+    def __init__(self, url, bandwidth=0, height=None):
+        self.url = url
+        self.bandwidth = bandwidth
+        self.height = height
+
+
+class HlsPlaylist:
+    """Playlist HLS: maestra (variants) o de medios (segments, duration)"""
+    __slots__ = ('url', 'variants', 'segments', 'duration')
+
+    def __init__(self, url, variants=None, segments=None, duration=0.0):
+        self.url = url
+        self.variants = variants or []
+        self.segments = segments or []
+        self.duration = duration
+
+    @property
+    def is_master(self):
+        return bool(self.variants)
+
+
+def _parse_attributes(text):
+    return {key: value.strip('"') for key, value in _ATTRIBUTE_RE.findall(text)}
+
+
+def parse_playlist(text, url):
+    """
+    Interpreta una playlist m3u8
+
+    Las URIs relativas se resuelven contra url. Los segmentos cifrados o por
+    rangos de bytes no se soportan (esos casos quedan para ffmpeg).
+
+    Raises:
+        HlsError si no es una playlist o usa algo no soportado
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines or not lines[0].startswith('#EXTM3U'):
+        raise HlsError("La respuesta no es una playlist m3u8")
+
+    playlist = HlsPlaylist(url)
+    stream_info = None
+
+    for line in lines[1:]:
+        if line.startswith('#EXT-X-STREAM-INF:'):
+            stream_info = _parse_attributes(line.split(':', 1)[1])
+        elif line.startswith('#EXTINF:'):
+            try:
+                playlist.duration += float(line.split(':', 1)[1].split(',', 1)[0])
+            except ValueError:
+                pass
+        elif line.startswith('#EXT-X-KEY:'):
+            method = _parse_attributes(line.split(':', 1)[1]).get('METHOD', 'NONE')
+            if method != 'NONE':
+                raise HlsError(f"Segmentos cifrados ({method}) no soportados")
+        elif line.startswith('#EXT-X-BYTERANGE'):
+            raise HlsError("Segmentos por rangos de bytes no soportados")
+        elif line.startswith('#EXT-X-MAP:'):
+            # Segmento de inicialización (fMP4): va delante de todos
+            map_uri = _parse_attributes(line.split(':', 1)[1]).get('URI')
+            if map_uri:
+                playlist.segments.insert(0, urljoin(url, map_uri))
+        elif not line.startswith('#'):
+            if stream_info is not None:
+                resolution = stream_info.get('RESOLUTION', '')
+                height = resolution.split('x')[1] if 'x' in resolution else ''
+                playlist.variants.append(HlsVariant(
+                    urljoin(url, line),
+                    bandwidth=int(stream_info.get('BANDWIDTH', 0) or 0),
+                    height=int(height) if height.isdigit() else None,
+                ))
+                stream_info = None
+            else:
+                playlist.segments.append(urljoin(url, line))
+
+    return playlist
+
+
+def select_variant(variants, max_height=None):
+    """
+    Elige la variante de más calidad que no supere max_height
+
+    Si ninguna cumple el límite (o no declaran resolución) se usa la de
+    mayor ancho de banda.
+    """
+    if not variants:
+        return None
+    allowed = [v for v in variants if max_height and v.height and v.height <= max_height]
+    return max(allowed or variants, key=lambda v: (v.height or 0, v.bandwidth))
+
+
+class HlsDownloader:
+    """
+    Descarga de segmentos HLS en paralelo con escritura en orden
+
+    Un pool de hilos adelanta la descarga de los siguientes segmentos y el
+    hilo llamante los escribe en orden directamente en el archivo de salida.
+    Como mucho hay max_buffered segmentos en vuelo o esperando turno, así
+    que la memoria queda acotada aunque uno se retrase.
+    """
+
+    def __init__(self, session, headers=None, workers=None, max_buffered=None, retries=None):
+        self.session = session
+        self.headers = dict(headers or {})
+        self.workers = workers or DownloadConfig.HLS_WORKERS
+        self.max_buffered = max(max_buffered or DownloadConfig.HLS_MAX_BUFFERED_SEGMENTS, self.workers)
+        self.retries = DownloadConfig.SEGMENT_RETRIES if retries is None else retries
+
+    def load_playlist(self, url, max_height=None):
+        """
+        Descarga la playlist; si es maestra, sigue la mejor variante
+
+        Args:
+            max_height: altura máxima deseada (por defecto la primera de QUALITY_PRIORITY)
+        """
+        response = self.session.get(url, headers=self.headers)
+        response.raise_for_status()
+        playlist = parse_playlist(response.text, response.url or url)
+
+        if playlist.is_master:
+            if max_height is None:
+                max_height = int(DownloadConfig.QUALITY_PRIORITY[0])
+            variant = select_variant(playlist.variants, max_height)
+            logger.info(f"🎚️ Variante HLS: {variant.height or '?'}p ({variant.bandwidth // 1000} kbps) "
+                        f"de {len(playlist.variants)}")
+            response = self.session.get(variant.url, headers=self.headers)
+            response.raise_for_status()
+            playlist = parse_playlist(response.text, response.url or variant.url)
+            if playlist.is_master:
+                raise HlsError("Playlist maestra anidada")
+
+        if not playlist.segments:
+            raise HlsError("No se encontraron segmentos en la playlist")
+        return playlist
+
+    def download(self, playlist, output, start=0, on_segment=None):
+        """
+        Escribe en output (abierto en binario) los segmentos desde start
+
+        Args:
+            on_segment: función (segmentos escritos, bytes del segmento) tras cada escritura
+
+        Returns:
+            int: bytes escritos
+
+        Raises:
+            Exception si un segmento agota sus reintentos (lo escrito hasta
+            el segmento anterior es válido)
+        """
+        segments = playlist.segments
+        cancelled = threading.Event()
+        pending = deque()
+        next_index = start
+        written = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='hls-segment') as executor:
+            def submit_ahead():
+                nonlocal next_index
+                while next_index < len(segments) and len(pending) < self.max_buffered:
+                    future = executor.submit(self._fetch_segment, segments[next_index], next_index, cancelled)
+                    pending.append((next_index, future))
+                    next_index += 1
+
+            try:
+                submit_ahead()
+                while pending:
+                    index, future = pending.popleft()
+                    data = future.result()
+                    output.write(data)
+                    written += len(data)
+                    submit_ahead()
+                    if on_segment:
+                        on_segment(index + 1, len(data))
+            except BaseException:
+                cancelled.set()
+                for _, future in pending:
+                    future.cancel()
+                raise
+
+        return written
+
+    def _fetch_segment(self, segment_url, index, cancelled):
+        """Descarga un segmento completo con reintentos"""
+        attempts = 0
+        while True:
+            if cancelled.is_set():
+                raise HlsError("Descarga cancelada")
+            try:
+                response = self.session.get(segment_url, headers=self.headers)
+                response.raise_for_status()
+                return response.content
+            except Exception as e:
+                attempts += 1
+                if attempts > self.retries:
+                    raise IOError(f"Segmento {index} no disponible: {str(e)}")
+                logger.warning(f"⚠️ Reintentando segmento {index} ({attempts}/{self.retries}): {str(e)}")
+                time.sleep(DownloadConfig.SEGMENT_RETRY_DELAY * attempts)
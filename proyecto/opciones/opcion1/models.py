@@ -0,0 +1,189 @@
+import re
+from collections.abc import MutableMapping
+from urllib.parse import parse_qs, urlparse
+
+# Sufijos de vistas abreviadas ('1.2M', '850K')
+_VIEWS_SUFFIXES = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+_VIEWS_RE = re.compile(r'^([\d.,]+)\s*([KMB])?$', re.IGNORECASE)
+_RATING_RE = re.compile(r'(\d+(?:[.,]\d+)?)')
+
+
+def parse_views_count(views):
+    """
+    Convierte el texto de vistas en un número ('1.2M' -> 1200000, '12,345' -> 12345)
+
+    Devuelve None si el texto no se reconoce.
+    """
+    if not views:
+        return None
+
+    match = _VIEWS_RE.match(views.strip().replace(' ', ''))
+    if not match:
+        return None
+
+    number, suffix = match.groups()
+    try:
+        if suffix:
+            # Con sufijo la coma/punto es decimal ('1,2K' o '1.2K')
+            return int(float(number.replace(',', '.')) * _VIEWS_SUFFIXES[suffix.upper()])
+        # Sin sufijo son separadores de miles
+        return int(number.replace(',', '').replace('.', ''))
+    except ValueError:
+        return None
+
+
+def parse_duration_seconds(duration):
+    """
+    Convierte una duración 'MM:SS' o 'HH:MM:SS' en segundos. None si no se reconoce
+
+    También acepta segundos ya numéricos (los flashvars traen video_duration así).
+    """
+    if not duration:
+        return None
+    if isinstance(duration, (int, float)):
+        return int(duration)
+
+    seconds = 0
+    try:
+        for part in duration.strip().split(':'):
+            seconds = seconds * 60 + int(part)
+    except ValueError:
+        return None
+    return seconds
+
+
+def parse_rating_percent(rating):
+    """
+    Convierte la valoración '85%' en un número (85.0). None si no se reconoce
+    """
+    if not rating:
+        return None
+
+    match = _RATING_RE.search(rating)
+    if not match:
+        return None
+    return float(match.group(1).replace(',', '.'))
+
+
+def parse_video_id(url):
+    """
+    Identificador estable de un video: el viewkey de la URL (o la URL si no lo tiene)
+    """
+    if not url:
+        return None
+
+    viewkey = parse_qs(urlparse(url).query).get('viewkey')
+    if viewkey and viewkey[0]:
+        return viewkey[0]
+    return url
+
+
+class VideoRecord(MutableMapping):
+    """
+    Video extraído del listado
+
+    Guarda los campos del scraper como atributos con __slots__ (mucho más
+    ligero que un dict) y precalcula una vez las versiones numéricas de
+    vistas, duración y valoración para ordenar o filtrar sin volver a
+    parsear textos. video_id es el viewkey de la URL.
+
+    También se comporta como un dict: video['title'], video.get('views'),
+    video['ftp_image_url'] = ... Las claves que no son campos del scraper
+    (las que añaden el descargador o la UI) se guardan en extra.
+    """
+
+    FIELDS = ('title', 'url', 'thumbnail', 'duration', 'views', 'rating', 'uploader')
+
+    __slots__ = FIELDS + ('video_id', 'views_count', 'duration_seconds', 'rating_percent', 'extra')
+
+    def __init__(self, title='', url='', thumbnail='', duration='', views='', rating='', uploader='', **extra):
+        self.title = title
+        self.thumbnail = thumbnail
+        self.uploader = uploader
+        self.extra = extra or None
+
+        self._set_url(url)
+        self._set_duration(duration)
+        self._set_views(views)
+        self._set_rating(rating)
+
+    def _set_url(self, url):
+        self.url = url
+        self.video_id = parse_video_id(url)
+
+    def _set_duration(self, duration):
+        self.duration = duration
+        self.duration_seconds = parse_duration_seconds(duration)
+
+    def _set_views(self, views):
+        self.views = views
+        self.views_count = parse_views_count(views)
+
+    def _set_rating(self, rating):
+        self.rating = rating
+        self.rating_percent = parse_rating_percent(rating)
+
+    # Interfaz de diccionario
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'url':
+            self._set_url(value)
+        elif key == 'duration':
+            self._set_duration(value)
+        elif key == 'views':
+            self._set_views(value)
+        elif key == 'rating':
+            self._set_rating(value)
+        elif key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            raise KeyError(f"No se puede eliminar el campo '{key}' de un VideoRecord")
+        if not self.extra or key not in self.extra:
+            raise KeyError(key)
+        del self.extra[key]
+
+    def __iter__(self):
+        yield from self.FIELDS
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return len(self.FIELDS) + (len(self.extra) if self.extra else 0)
+
+    def __contains__(self, key):
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+
+    def __repr__(self):
+        return f"VideoRecord(title={(self.title or '')[:40]!r}, url={self.url!r})"
+
+    # Conversión
+
+    def copy(self):
+        """Copia independiente (los extra no se comparten)"""
+        record = VideoRecord.__new__(VideoRecord)
+        for slot in self.__slots__:
+            setattr(record, slot, getattr(self, slot))
+        record.extra = dict(self.extra) if self.extra else None
+        return record
+
+    def to_dict(self):
+        """Diccionario plano (para JSON)"""
+        return dict(self.items())
+
+    @classmethod
+    def from_dict(cls, data):
+        """Crea un VideoRecord desde un dict (los campos desconocidos van a extra)"""
+        return cls(**data)
@@ -0,0 +1,403 @@
+import logging
+
+# Backends de parseo opcionales (se usa el más rápido disponible)
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from bs4 import BeautifulSoup, NavigableString, Tag, CData
+    import soupsieve
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+from .config import ScraperConfig
+
+logger = logging.getLogger('Opcion1Parser')
+
+# Clases que dan contexto a los selectores descendientes
+# ('.title a', '.views var', '.rating-container .value', '.usernameWrap a')
+_CONTEXT_CLASSES = frozenset(['title', 'views', 'rating-container', 'usernameWrap'])
+
+
+class ListingItem:
+    """
+    Instantánea de un elemento del listado tomada en un único recorrido
+
+    Contiene los campos del video y la información estructural (clases,
+    tags, data-url y texto) que necesita el filtro de publicidad.
+    """
+    __slots__ = (
+        'root_classes', 'classes', 'tags', 'data_urls', 'text',
+        'has_title_link', 'title_href', 'title_attr', 'title_text',
+        'has_thumb_link', 'thumb_href', 'thumb_title', 'thumbnail',
+        'duration', 'views', 'rating', 'uploader',
+    )
+
+    def __init__(self):
+        self.root_classes = []    # Clases del propio elemento
+        self.classes = set()      # Clases de los descendientes
+        self.tags = set()         # Tags de los descendientes
+        self.data_urls = []       # Valores data-url de los descendientes
+        self.text = ''            # Texto completo del elemento
+        self.has_title_link = False   # Existe '.title a'
+        self.title_href = None
+        self.title_attr = None
+        self.title_text = None
+        self.has_thumb_link = False   # Existe 'a.linkVideoThumb'
+        self.thumb_href = None
+        self.thumb_title = None
+        self.thumbnail = None     # 'img.thumb'
+        self.duration = None      # '.duration'
+        self.views = None         # '.views var'
+        self.rating = None        # '.rating-container .value'
+        self.uploader = None      # '.usernameWrap a'
+
+
+class _ItemBuilder:
+    """
+    Construye un ListingItem a partir de eventos de apertura/cierre de nodos
+
+    Todos los backends recorren el árbol del elemento una sola vez y llaman
+    a start/text/end; aquí se resuelven todos los selectores a la vez.
+    """
+    __slots__ = ('item', 'pieces', 'context', 'stack')
+
+    def __init__(self):
+        self.item = ListingItem()
+        self.pieces = []
+        self.context = {}   # clase de contexto -> nº de ancestros abiertos con ella
+        self.stack = []
+
+    def start(self, tag, classes, get_attr, is_root=False):
+        item = self.item
+        context = self.context
+
+        if is_root:
+            item.root_classes = list(classes)
+        else:
+            item.classes.update(classes)
+            item.tags.add(tag)
+            data_url = get_attr('data-url')
+            if data_url:
+                item.data_urls.append(data_url)
+
+        # Resolver selectores (el primer elemento en orden de documento gana)
+        captures = None
+        if tag == 'a':
+            if context.get('title') and not item.has_title_link:
+                item.has_title_link = True
+                item.title_href = get_attr('href')
+                item.title_attr = get_attr('title')
+                captures = ['title_text']
+            if 'linkVideoThumb' in classes and not item.has_thumb_link:
+                item.has_thumb_link = True
+                item.thumb_href = get_attr('href')
+                item.thumb_title = get_attr('data-title')
+            if context.get('usernameWrap') and item.uploader is None:
+                item.uploader = ''
+                captures = (captures or []) + ['uploader']
+        elif tag == 'img':
+            if 'thumb' in classes and item.thumbnail is None:
+                item.thumbnail = (get_attr('data-mediumthumb') or
+                                  get_attr('src') or
+                                  get_attr('data-src') or "")
+        elif tag == 'var':
+            if context.get('views') and item.views is None:
+                item.views = ''
+                captures = ['views']
+
+        if 'duration' in classes and item.duration is None:
+            item.duration = ''
+            captures = (captures or []) + ['duration']
+        if 'value' in classes and context.get('rating-container') and item.rating is None:
+            item.rating = ''
+            captures = (captures or []) + ['rating']
+
+        # Las clases de contexto aplican a los descendientes, no al propio nodo
+        added = [c for c in classes if c in _CONTEXT_CLASSES]
+        for class_name in added:
+            context[class_name] = context.get(class_name, 0) + 1
+
+        self.stack.append((added, captures, len(self.pieces)))
+
+    def text(self, value):
+        self.pieces.append(value)
+
+    def end(self):
+        added, captures, start = self.stack.pop()
+        for class_name in added:
+            count = self.context[class_name] - 1
+            if count:
+                self.context[class_name] = count
+            else:
+                del self.context[class_name]
+        if captures:
+            value = ''.join(self.pieces[start:]).strip()
+            for field in captures:
+                setattr(self.item, field, value)
+
+    def finish(self):
+        self.item.text = ''.join(self.pieces)
+        return self.item
+
+
+class BaseListingParser:
+    """Interfaz común de los backends de parseo"""
+
+    name = 'base'
+
+    def parse_listing(self, html):
+        """
+        Parsea una página de listado
+
+        Returns:
+            tuple: (lista de ListingItem, href de la página siguiente o None)
+        """
+        raise NotImplementedError
+
+    def parse_categories(self, html):
+        """
+        Parsea la página de categorías
+
+        Returns:
+            list: diccionarios con 'title', 'url' y 'count'
+        """
+        raise NotImplementedError
+
+
+def _class_xpath(class_name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+class LxmlListingParser(BaseListingParser):
+    """Backend basado en lxml con expresiones XPath compiladas una sola vez"""
+
+    name = 'lxml'
+
+    if LXML_AVAILABLE:
+        _XP_ITEMS = etree.XPath(f"//li[{_class_xpath('pcVideoListItem')}]")
+        _XP_ITEMS_ALT = etree.XPath("//ul[@id='videoCategory']//li")
+        _XP_NEXT = etree.XPath(f"//li[{_class_xpath('page_next')}]//a[@href]/@href")
+        _XP_CATEGORIES = etree.XPath(f"//*[@id='categoriesListingWrapper']//*[{_class_xpath('catPic')}]")
+        _XP_CATEGORY_LINK = etree.XPath(f".//*[{_class_xpath('categoryTitleWrapper')}]//a")
+        _XP_CATEGORY_TITLE = etree.XPath(".//strong")
+        _XP_CATEGORY_COUNT = etree.XPath(f".//*[{_class_xpath('videoCount')}]//var")
+
+    def parse_listing(self, html):
+        doc = lxml_html.document_fromstring(html)
+
+        elements = self._XP_ITEMS(doc)
+        if not elements:
+            elements = self._XP_ITEMS_ALT(doc)
+
+        items = [self._build_item(element) for element in elements]
+
+        next_hrefs = self._XP_NEXT(doc)
+        return items, (str(next_hrefs[0]) if next_hrefs else None)
+
+    def _build_item(self, root):
+        builder = _ItemBuilder()
+        self._walk(root, builder, True)
+        return builder.finish()
+
+    def _walk(self, element, builder, is_root=False):
+        builder.start(element.tag, (element.get('class') or '').split(), element.get, is_root)
+        if element.text:
+            builder.text(element.text)
+        for child in element:
+            # Los comentarios no aportan texto pero su tail sí
+            if isinstance(child.tag, str):
+                self._walk(child, builder)
+            if child.tail:
+                builder.text(child.tail)
+        builder.end()
+
+    def parse_categories(self, html):
+        doc = lxml_html.document_fromstring(html)
+        categories = []
+
+        for item in self._XP_CATEGORIES(doc):
+            links = self._XP_CATEGORY_LINK(item)
+            if not links or not links[0].get('href'):
+                continue
+            link_elem = links[0]
+
+            titles = self._XP_CATEGORY_TITLE(link_elem)
+            if not titles:
+                continue
+
+            counts = self._XP_CATEGORY_COUNT(link_elem)
+            categories.append({
+                'title': titles[0].text_content().strip(),
+                'url': link_elem.get('href'),
+                'count': counts[0].text_content().strip() if counts else "0"
+            })
+
+        return categories
+
+
+class SelectolaxListingParser(BaseListingParser):
+    """Backend basado en selectolax (lexbor), el más rápido cuando está instalado"""
+
+    name = 'selectolax'
+
+    def parse_listing(self, html):
+        tree = LexborHTMLParser(html)
+
+        elements = tree.css('li.pcVideoListItem')
+        if not elements:
+            elements = tree.css('ul#videoCategory li')
+
+        items = [self._build_item(element) for element in elements]
+
+        next_link = tree.css_first('li.page_next a[href]')
+        next_href = next_link.attributes.get('href') if next_link else None
+        return items, next_href
+
+    def _build_item(self, root):
+        builder = _ItemBuilder()
+        self._walk(root, builder, True)
+        return builder.finish()
+
+    def _walk(self, node, builder, is_root=False):
+        attributes = node.attributes
+        builder.start(node.tag, (attributes.get('class') or '').split(), attributes.get, is_root)
+        child = node.child
+        while child is not None:
+            tag = child.tag
+            if tag == '-text':
+                builder.text(child.text(deep=False))
+            elif not tag.startswith(('-', '_')):
+                self._walk(child, builder)
+            child = child.next
+        builder.end()
+
+    def parse_categories(self, html):
+        tree = LexborHTMLParser(html)
+        categories = []
+
+        for item in tree.css('#categoriesListingWrapper .catPic'):
+            link_elem = item.css_first('.categoryTitleWrapper a')
+            if not link_elem or not link_elem.attributes.get('href'):
+                continue
+
+            title_elem = link_elem.css_first('strong')
+            if not title_elem:
+                continue
+
+            video_count_elem = link_elem.css_first('.videoCount var')
+            categories.append({
+                'title': title_elem.text().strip(),
+                'url': link_elem.attributes['href'],
+                'count': video_count_elem.text().strip() if video_count_elem else "0"
+            })
+
+        return categories
+
+
+class SoupListingParser(BaseListingParser):
+    """Backend de respaldo en Python puro (BeautifulSoup + html.parser)"""
+
+    name = 'bs4'
+
+    if BS4_AVAILABLE:
+        _SEL_ITEMS = soupsieve.compile('li.pcVideoListItem')
+        _SEL_ITEMS_ALT = soupsieve.compile('ul#videoCategory li')
+        _SEL_NEXT = soupsieve.compile('li.page_next a[href]')
+        _SEL_CATEGORIES = soupsieve.compile('#categoriesListingWrapper .catPic')
+        _SEL_CATEGORY_LINK = soupsieve.compile('.categoryTitleWrapper a')
+        _SEL_CATEGORY_TITLE = soupsieve.compile('strong')
+        _SEL_CATEGORY_COUNT = soupsieve.compile('.videoCount var')
+
+    def parse_listing(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+
+        elements = self._SEL_ITEMS.select(soup)
+        if not elements:
+            elements = self._SEL_ITEMS_ALT.select(soup)
+
+        items = [self._build_item(element) for element in elements]
+
+        next_link = self._SEL_NEXT.select_one(soup)
+        return items, (next_link['href'] if next_link else None)
+
+    def _build_item(self, root):
+        builder = _ItemBuilder()
+        self._walk(root, builder, True)
+        return builder.finish()
+
+    def _walk(self, tag, builder, is_root=False):
+        builder.start(tag.name, tag.get('class') or (), tag.get, is_root)
+        for child in tag.children:
+            if isinstance(child, Tag):
+                self._walk(child, builder)
+            elif type(child) is NavigableString or isinstance(child, CData):
+                builder.text(str(child))
+        builder.end()
+
+    def parse_categories(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+        categories = []
+
+        for item in self._SEL_CATEGORIES.select(soup):
+            link_elem = self._SEL_CATEGORY_LINK.select_one(item)
+            if not link_elem or not link_elem.get('href'):
+                continue
+
+            title_elem = self._SEL_CATEGORY_TITLE.select_one(link_elem)
+            if not title_elem:
+                continue
+
+            video_count_elem = self._SEL_CATEGORY_COUNT.select_one(link_elem)
+            categories.append({
+                'title': title_elem.text.strip(),
+                'url': link_elem['href'],
+                'count': video_count_elem.text.strip() if video_count_elem else "0"
+            })
+
+        return categories
+
+
+# Backends en orden de preferencia
+PARSER_BACKENDS = [
+    ('selectolax', SELECTOLAX_AVAILABLE, SelectolaxListingParser),
+    ('lxml', LXML_AVAILABLE, LxmlListingParser),
+    ('bs4', BS4_AVAILABLE, SoupListingParser),
+]
+
+
+def get_parser(backend=None):
+    """
+    Devuelve una instancia del backend de parseo solicitado
+
+    Args:
+        backend: 'selectolax', 'lxml', 'bs4' o 'auto' (por defecto
+                 ScraperConfig.PARSER_BACKEND). En modo 'auto', o si el
+                 backend pedido no está instalado, se usa el más rápido
+                 disponible.
+    """
+    backend = backend or ScraperConfig.PARSER_BACKEND
+
+    for name, available, parser_class in PARSER_BACKENDS:
+        if name == backend:
+            if available:
+                return parser_class()
+            logger.warning(f"⚠️ Backend de parseo '{backend}' no instalado, usando el mejor disponible")
+            break
+
+    for name, available, parser_class in PARSER_BACKENDS:
+        if available:
+            return parser_class()
+
+    raise ImportError("No hay ningún backend de parseo HTML instalado (selectolax, lxml o beautifulsoup4)")
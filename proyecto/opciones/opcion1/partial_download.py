@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+logger = logging.getLogger('PartialDownload')
+
+
+class PartialDownload:
+    """
+    Descarga en curso: archivo .part más un sidecar .part.json
+
+    El sidecar guarda la URL, los validadores (tamaño, ETag, Last-Modified) y
+    qué rangos de bytes (o cuántos segmentos HLS) están ya escritos, para
+    poder reanudar tras un fallo. El archivo solo toma su nombre final con
+    finish(), después de comprobar que está completo.
+    """
+
+    def __init__(self, final_path):
+        self.final_path = Path(final_path)
+        self.part_path = self.final_path.with_name(self.final_path.name + '.part')
+        self.meta_path = self.final_path.with_name(self.final_path.name + '.part.json')
+        self.meta = {}
+        self._lock = threading.Lock()
+
+    # Estado en disco
+
+    def load(self):
+        """Carga el sidecar. True si hay una descarga previa reanudable"""
+        if not (self.part_path.exists() and self.meta_path.exists()):
+            return False
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Sidecar ilegible, se descarga de nuevo: {str(e)}")
+            self.meta = {}
+            return False
+
+    def save(self):
+        # Con el lock: varios hilos comparten el mismo .tmp
+        with self._lock:
+            tmp_path = self.meta_path.with_name(self.meta_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.meta, f)
+            os.replace(tmp_path, self.meta_path)
+
+    def discard(self):
+        """Elimina el .part y su sidecar"""
+        for path in (self.part_path, self.meta_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self.meta = {}
+
+    # Descargas por rangos HTTP
+
+    def matches(self, info):
+        """
+        Indica si la descarga previa corresponde al mismo archivo remoto
+
+        No se compara la URL: las del CDN llevan tokens que caducan. Se exige
+        el mismo tamaño y que coincidan los validadores conocidos.
+        """
+        if self.meta.get('kind') != 'http' or not info.get('size'):
+            return False
+        if self.meta.get('size') != info['size']:
+            return False
+        for key in ('etag', 'last_modified'):
+            if self.meta.get(key) and info.get(key) and self.meta[key] != info[key]:
+                return False
+        return True
+
+    def start(self, url, info):
+        """Empieza una descarga por rangos desde cero"""
+        self.meta = {
+            'kind': 'http',
+            'url': url,
+            'size': info.get('size'),
+            'etag': info.get('etag'),
+            'last_modified': info.get('last_modified'),
+            'completed': [],
+        }
+        self.save()
+
+    def add_range(self, start, end):
+        """Registra los bytes start..end (inclusive) como escritos"""
+        if end < start:
+            return
+        with self._lock:
+            ranges = sorted(self.meta.setdefault('completed', []) + [[start, end]])
+            merged = []
+            for range_start, range_end in ranges:
+                if merged and range_start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], range_end)
+                else:
+                    merged.append([range_start, range_end])
+            self.meta['completed'] = merged
+        self.save()
+
+    def completed_bytes(self):
+        with self._lock:
+            return sum(end - start + 1 for start, end in self.meta.get('completed', []))
+
+    def missing_ranges(self):
+        """Rangos (inicio, fin) que faltan por descargar"""
+        size = self.meta.get('size') or 0
+        missing = []
+        position = 0
+        with self._lock:
+            for start, end in self.meta.get('completed', []):
+                if start > position:
+                    missing.append((position, start - 1))
+                position = max(position, end + 1)
+        if position < size:
+            missing.append((position, size - 1))
+        return missing
+
+    # Descargas HLS (segmentos en orden)
+
+    def matches_hls(self, segment_count):
+        return self.meta.get('kind') == 'hls' and self.meta.get('segment_count') == segment_count
+
+    def start_hls(self, url, segment_count):
+        self.meta = {
+            'kind': 'hls',
+            'url': url,
+            'segment_count': segment_count,
+            'segments_done': 0,
+            'bytes': 0,
+        }
+        self.save()
+
+    def mark_segment(self, segments_done, total_bytes):
+        """Registra que los primeros segments_done segmentos ocupan total_bytes"""
+        with self._lock:
+            self.meta['segments_done'] = segments_done
+            self.meta['bytes'] = total_bytes
+        self.save()
+
+    # Final
+
+    def finish(self, expected_size=None):
+        """
+        Comprueba que el .part está completo y lo renombra de forma atómica
+
+        Raises:
+            IOError si faltan datos (el .part se conserva para reanudar)
+        """
+        actual_size = self.part_path.stat().st_size
+        if expected_size is not None and actual_size != expected_size:
+            raise IOError(f"Archivo incompleto: {actual_size} de {expected_size} bytes")
+        if self.meta.get('kind') == 'http' and self.missing_ranges():
+            raise IOError(f"Faltan {len(self.missing_ranges())} rangos por descargar")
+
+        os.replace(self.part_path, self.final_path)
+        try:
+            self.meta_path.unlink()
+        except FileNotFoundError:
+            pass
+        logger.debug(f"✅ {self.final_path.name} completado")
@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from .config import ScraperConfig
+
+logger = logging.getLogger('ResultCache')
+
+
+class ResultCache:
+    """
+    Caché de resultados ya parseados (categorías, listados de videos)
+
+    Se guarda en memoria y en disco (JSON) para que la app arranque con los
+    datos de la sesión anterior. Cada entrada tiene un TTL: mientras está
+    fresca se devuelve tal cual; si ha caducado pero no supera max_stale se
+    devuelve igualmente y se refresca en segundo plano (stale-while-revalidate).
+    Las recargas se deduplican: varias peticiones de la misma clave comparten
+    una sola descarga.
+    """
+
+    def __init__(self, cache_file=None, max_stale=None):
+        self.cache_file = Path(cache_file or ScraperConfig.RESULT_CACHE_FILE)
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_stale = ScraperConfig.RESULT_CACHE_MAX_STALE if max_stale is None else max_stale
+
+        self._entries = {}            # clave -> {'stored_at': ts, 'value': ...}
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # Un guardado a la vez (sin bloquear las lecturas)
+        self._key_locks = {}          # clave -> lock de carga síncrona
+        self._refreshing = set()      # claves con refresco en segundo plano en curso
+        self._load()
+
+    def _load(self):
+        """Carga las entradas guardadas en disco"""
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+                logger.info(f"💾 Caché de resultados: {len(self._entries)} entradas cargadas")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo leer la caché de resultados: {str(e)}")
+            self._entries = {}
+
+    def _save(self):
+        """
+        Guarda todas las entradas en disco (escritura atómica)
+
+        Los guardados (set() y los refrescos en segundo plano) se hacen de uno
+        en uno y cada uno con su propio temporal: el último en escribir lleva
+        siempre los datos más recientes.
+        """
+        with self._save_lock:
+            tmp_file = None
+            try:
+                with self._lock:
+                    data = json.dumps(self._entries, ensure_ascii=False)
+                fd, tmp_file = tempfile.mkstemp(prefix=self.cache_file.name + '.', suffix='.tmp',
+                                                dir=self.cache_file.parent)
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.cache_file)
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo guardar la caché de resultados: {str(e)}")
+                if tmp_file is not None and os.path.exists(tmp_file):
+                    os.unlink(tmp_file)
+
+    def peek(self, key):
+        """
+        Devuelve (valor, edad en segundos) o (None, None) si no hay entrada utilizable
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if not entry:
+            return None, None
+
+        age = time.time() - entry['stored_at']
+        if age > self.max_stale:
+            return None, None
+        return entry['value'], age
+
+    def set(self, key, value):
+        """Guarda un resultado (solo si no está vacío)"""
+        if not value:
+            return
+        with self._lock:
+            self._entries[key] = {'stored_at': time.time(), 'value': value}
+            self._prune()
+        self._save()
+
+    def invalidate(self, key=None):
+        """Elimina una clave, o toda la caché si no se indica ninguna"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        self._save()
+
+    def _prune(self):
+        now = time.time()
+        expired = [key for key, entry in self._entries.items() if now - entry['stored_at'] > self.max_stale]
+        for key in expired:
+            del self._entries[key]
+
+    def get_or_load(self, key, loader, ttl):
+        """
+        Devuelve el resultado de key, cargándolo con loader() si hace falta
+
+        - Entrada fresca (edad < ttl): se devuelve sin más.
+        - Entrada caducada: se devuelve y se lanza un refresco en segundo plano.
+        - Sin entrada: se llama a loader() (una sola vez aunque haya varios hilos esperando).
+        """
+        value, age = self.peek(key)
+        if value is not None:
+            if age >= ttl:
+                self.refresh_async(key, loader)
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Otro hilo pudo haberlo cargado mientras esperábamos
+            value, age = self.peek(key)
+            if value is not None and age < ttl:
+                return value
+
+            value = loader()
+            self.set(key, value)
+            return value
+
+    def refresh_async(self, key, loader):
+        """
+        Recarga key en un hilo en segundo plano (si no hay ya un refresco en curso)
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                logger.info(f"🔄 Refrescando en segundo plano: {key}")
+                self.set(key, loader())
+            except Exception as e:
+                logger.warning(f"⚠️ Error refrescando {key}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name='result-cache-refresh', daemon=True).start()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """
+    Devuelve la caché de resultados compartida por todo el proceso
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache()
+    return _cache
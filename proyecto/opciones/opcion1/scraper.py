@@ -1,15 +1,27 @@
-import requests
-from bs4 import BeautifulSoup
 import logging
-import time
-import random
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
+from utils.http_client import get_http_client
+from utils.http_cache import CachedPage, get_http_cache
+from .config import ScraperConfig
+from .parsers import get_parser
+from .ad_classifier import AdClassifier
+from .result_cache import get_result_cache
+from .models import VideoRecord
+
 # Configurar logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('Opcion1Scraper')
 
 class Opcion1Scraper:
+    # Resultados de parseo por huella del HTML, compartidos entre instancias:
+    # una página sin cambios (304 o copia fresca) no se vuelve a parsear
+    _parse_memo = OrderedDict()
+    _parse_memo_lock = threading.Lock()
+    
     def __init__(self):
         self.base_url = "https://es.pornhub.com"
         self.headers = {
@@ -20,41 +32,56 @@ class Opcion1Scraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
+        
+        # Cliente HTTP compartido (conexiones keep-alive reutilizadas)
+        self.session = get_http_client()
+        
+        # Caché en disco de páginas de listado y categorías
+        self.http_cache = get_http_cache() if ScraperConfig.HTTP_CACHE_ENABLED else None
+        
+        # Resultados parseados compartidos por toda la app (UI, programador...)
+        self.result_cache = get_result_cache()
+        
+        # Backend de parseo HTML (selectolax/lxml si están instalados)
+        self.parser = get_parser()
+        
+        # Clasificador compilado de publicidad (registra qué regla decide)
+        self.ad_classifier = AdClassifier()
+    
+    def get_categories(self, use_cache=True):
+        """
+        Obtiene todas las categorías disponibles
+        
+        Con use_cache se devuelve al instante la última lista conocida (y se
+        refresca en segundo plano si ha caducado).
+        """
+        if not use_cache:
+            return self._scrape_categories()
+        
+        categories = self.result_cache.get_or_load(
+            self._categories_cache_key(), self._scrape_categories,
+            ScraperConfig.CATEGORIES_CACHE_TTL)
+        return [dict(category) for category in categories]
+    
+    def _categories_cache_key(self):
+        """Clave de la lista de categorías en la caché de resultados"""
+        return f"categories:{self.base_url}"
     
-    def get_categories(self):
-        """Obtiene todas las categorías disponibles"""
+    def _scrape_categories(self):
+        """Descarga y parsea la página de categorías"""
         try:
             url = urljoin(self.base_url, "/categories")
             logger.info(f"Obteniendo categorías desde: {url}")
             
-            response = requests.get(url, headers=self.headers)
-            if response.status_code != 200:
-                logger.error(f"Error al obtener categorías: {response.status_code}")
+            page = self._fetch_page(url)
+            if page.status_code != 200:
+                logger.error(f"Error al obtener categorías: {page.status_code}")
                 return []
             
-            html = response.text
-            soup = BeautifulSoup(html, 'html.parser')
-            categories = []
-            
-            category_items = soup.select('#categoriesListingWrapper .catPic')
-            
-            for item in category_items:
-                link_elem = item.select_one('.categoryTitleWrapper a')
-                if not link_elem:
-                    continue
-                
-                title_elem = link_elem.select_one('strong')
-                if not title_elem:
-                    continue
-                
-                video_count_elem = link_elem.select_one('.videoCount var')
-                
-                category = {
-                    'title': title_elem.text.strip(),
-                    'url': link_elem['href'],
-                    'count': video_count_elem.text.strip() if video_count_elem else "0"
-                }
-                categories.append(category)
+            categories = self._memoized_parse(
+                ('categories', url), page.fingerprint,
+                lambda: self.parser.parse_categories(page.text))
+            categories = [dict(category) for category in categories]
                 
             logger.info(f"Se encontraron {len(categories)} categorías")
             return categories
@@ -63,181 +90,273 @@ class Opcion1Scraper:
             logger.error(f"Error al obtener categorías: {str(e)}")
             return []
     
-    def get_videos(self, category_url):
-        """Obtiene videos de una categoría específica"""
+    def get_videos(self, category_url, max_pages=None, max_videos=None, use_cache=True, watermark=None):
+        """
+        Obtiene videos de una categoría siguiendo la paginación del listado
+        
+        Es un generador perezoso: mientras se consumen los videos de la página N
+        la página N+1 se descarga en segundo plano. Se detiene cuando el
+        consumidor deja de iterar o al alcanzar max_pages / max_videos.
+        
+        Con use_cache, si el mismo listado se recorrió hace poco se sirve desde
+        la caché de resultados (refrescándolo en segundo plano si caducó). Un
+        recorrido completo sin errores se guarda en la caché.
+        
+        Con watermark (objeto con is_seen(video_id), p. ej. CategoryWatermark)
+        solo se devuelven videos nuevos y no se pasa de la primera página que
+        contenga contenido ya visto. En ese caso no se usa la caché.
+        """
+        max_pages = max_pages or ScraperConfig.DEFAULT_MAX_PAGES
+        if not use_cache or watermark is not None:
+            yield from self._iter_videos(category_url, max_pages, max_videos, watermark)
+            return
+        
+        cache_key = self._videos_cache_key(category_url, max_pages, max_videos)
+        cached, age = self.result_cache.peek(cache_key)
+        if cached is not None:
+            if age >= ScraperConfig.VIDEOS_CACHE_TTL:
+                self.result_cache.refresh_async(
+                    cache_key, lambda: self._collect_videos(category_url, max_pages, max_videos))
+            logger.info(f"💾 {len(cached)} videos desde caché para {category_url}")
+            for video_data in cached:
+                yield VideoRecord.from_dict(video_data)
+            return
+        
+        collected = []
+        for video_data in self._iter_videos(category_url, max_pages, max_videos):
+            if video_data is None:
+                # Recorrido con errores: no se guarda en caché
+                yield None
+                return
+            collected.append(video_data.to_dict())
+            yield video_data
+        
+        self.result_cache.set(cache_key, collected)
+    
+    def _videos_cache_key(self, category_url, max_pages, max_videos):
+        """Clave de un listado en la caché de resultados"""
+        return f"videos:{urljoin(self.base_url, category_url)}:{max_pages}:{max_videos or ''}"
+    
+    def _collect_videos(self, category_url, max_pages, max_videos):
+        """Recorre el listado completo (como dicts para la caché); [] si hubo errores"""
+        videos = list(self._iter_videos(category_url, max_pages, max_videos))
+        if None in videos:
+            return []
+        return [video_data.to_dict() for video_data in videos]
+    
+    def _iter_videos(self, category_url, max_pages, max_videos, watermark=None):
+        """Recorrido real del listado con descarga anticipada de la página siguiente"""
+        prefetcher = None
+        pending_page = None
+        
         try:
-            full_url = urljoin(self.base_url, category_url)
-            logger.info(f"Obteniendo videos desde: {full_url}")
+            page_url = urljoin(self.base_url, category_url)
+            logger.info(f"Obteniendo videos desde: {page_url}")
             
-            response = requests.get(full_url, headers=self.headers)
-            if response.status_code != 200:
-                logger.error(f"Error al obtener videos: {response.status_code}")
+            page = self._fetch_listing_page(page_url)
+            if page is None:
                 yield None
                 return
             
-            html = response.text
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Usar el selector correcto basado en el HTML real
-            video_items = soup.select('li.pcVideoListItem')
-            
-            if not video_items:
-                # Selector alternativo
-                video_items = soup.select('ul#videoCategory li')
+            page_number = 1
+            count = 0
+            seen_urls = set()
             
-            # Filtrar elementos publicitarios
-            filtered_items = []
-            for item in video_items:
-                # Excluir elementos que contienen publicidad
-                if self._is_advertisement(item):
-                    continue
-                filtered_items.append(item)
+            while True:
+                videos, next_url = self._memoized_parse(
+                    ('listing', page_url), page.fingerprint,
+                    lambda: self._parse_listing_page(page.text, page_url))
+                videos = [video_data.copy() for video_data in videos]
                 
-            logger.info(f"Encontrados {len(video_items)} elementos totales, {len(filtered_items)} videos válidos después de filtrar publicidad")
-            
-            count = 0
-            for item in filtered_items:
-                video_data = self._extract_video_data_from_real_html(item)
+                # Saltar lo visto en ejecuciones anteriores; si aparece contenido
+                # visto, lo que sigue en el listado es más antiguo: no paginar más
+                reached_seen = False
+                if watermark is not None:
+                    unseen = [video_data for video_data in videos if not watermark.is_seen(video_data.video_id)]
+                    reached_seen = len(unseen) < len(videos)
+                    videos = unseen
+                    if reached_seen:
+                        logger.info(f"🔖 Contenido ya visto en la página {page_number}: {len(videos)} videos nuevos")
                 
-                if video_data:
+                # Descargar la siguiente página mientras se consume esta,
+                # salvo que el presupuesto ya se cubra con la página actual
+                remaining = (max_videos - count) if max_videos else None
+                if (next_url and page_number < max_pages and not reached_seen and
+                        (remaining is None or len(videos) < remaining)):
+                    if prefetcher is None:
+                        prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='listing-prefetch')
+                    pending_page = prefetcher.submit(self._fetch_listing_page, next_url)
+                
+                new_on_page = 0
+                for video_data in videos:
+                    if video_data['url'] in seen_urls:
+                        continue
+                    seen_urls.add(video_data['url'])
+                    
                     count += 1
+                    new_on_page += 1
                     yield video_data
-                    # Pequeño delay para evitar ser bloqueado
-                    time.sleep(random.uniform(0.1, 0.3))
+                    
+                    if max_videos and count >= max_videos:
+                        logger.info(f"Se alcanzó el límite de {max_videos} videos para {category_url}")
+                        return
+                
+                if pending_page is None or new_on_page == 0:
+                    break
+                
+                page = pending_page.result()
+                pending_page = None
+                if page is None:
+                    break
+                
+                page_url = next_url
+                page_number += 1
+                logger.info(f"Página {page_number} de {category_url}: {page_url}")
             
-            logger.info(f"Se procesaron {count} videos para {category_url}")
+            logger.info(f"Se procesaron {count} videos en {page_number} página(s) para {category_url}")
             
         except Exception as e:
             logger.error(f"Error al obtener videos: {str(e)}")
             yield None
+        
+        finally:
+            if pending_page is not None:
+                pending_page.cancel()
+            if prefetcher is not None:
+                prefetcher.shutdown(wait=False)
     
-    def _is_advertisement(self, item):
-        """Detecta si un elemento es publicidad"""
+    def _fetch_page(self, url):
+        """
+        Descarga una página pasando por la caché HTTP si está activada
+        
+        Returns:
+            CachedPage: con la huella del HTML cuando la respuesta es 200
+        """
+        if self.http_cache is not None:
+            return self.http_cache.get(url, headers=self.headers)
+        
+        response = self.session.get(url, headers=self.headers)
+        return CachedPage(url, response.status_code, response.text)
+    
+    def _fetch_listing_page(self, page_url):
+        """Descarga una página de listado (CachedPage), o None si falla"""
         try:
-            # Buscar indicadores de publicidad
-            ad_indicators = [
-                '.tj-inban-container',  # TrafficJunky ads
-                '.tj-inban-icon',
-                '[data-url*="trafficjunky"]',
-                '.mcacdmgrhc',  # Contenedor de anuncios
-                '.mbbdfhgfle',  # Otro contenedor de anuncios
-                'cbcac',  # Tag de anuncio
-                'bdhdd'   # Otro tag de anuncio
-            ]
-            
-            # Verificar si contiene algún indicador de publicidad
-            for selector in ad_indicators:
-                if item.select(selector):
-                    logger.debug("Elemento publicitario detectado y filtrado")
-                    return True
-            
-            # Verificar por texto que indique publicidad
-            item_text = item.get_text().lower()
-            ad_texts = [
-                'ad by traff',
-                'traffic junky',
-                'advertising',
-                'publicidad'
-            ]
-            
-            for ad_text in ad_texts:
-                if ad_text in item_text:
-                    logger.debug(f"Publicidad detectada por texto: {ad_text}")
-                    return True
-            
-            # Verificar si no tiene estructura de video válida
-            # Un video válido debe tener título y enlace
-            if not item.select('.title a') and not item.select('a.linkVideoThumb'):
-                logger.debug("Elemento sin estructura de video válida")
-                return True
-            
-            # Verificar elementos con clases dinámicas (anuncios suelen tener clases generadas)
-            class_names = item.get('class', [])
-            for class_name in class_names:
-                # Clases con muchos números/caracteres aleatorios suelen ser anuncios
-                if len(class_name) > 10 and any(char.isdigit() for char in class_name):
-                    # Pero solo si no es pcVideoListItem que sabemos que es válido
-                    if class_name != 'pcVideoListItem':
-                        logger.debug(f"Posible anuncio detectado por clase dinámica: {class_name}")
-                        return True
+            page = self._fetch_page(page_url)
+            if page.status_code != 200:
+                logger.error(f"Error al obtener videos: {page.status_code} ({page_url})")
+                return None
+            if page.from_cache:
+                logger.debug(f"💾 Listado servido desde caché: {page_url}")
+            return page
+        except Exception as e:
+            logger.error(f"Error descargando {page_url}: {str(e)}")
+            return None
+    
+    @classmethod
+    def _memoized_parse(cls, key, fingerprint, parse):
+        """
+        Devuelve el resultado de parse() reutilizándolo si el HTML no ha cambiado
+        
+        key identifica la página (tipo, URL) y fingerprint es la huella de su HTML.
+        Sin huella (caché desactivada) siempre se parsea.
+        """
+        if fingerprint is None:
+            return parse()
+        
+        memo_key = key + (fingerprint,)
+        with cls._parse_memo_lock:
+            result = cls._parse_memo.get(memo_key)
+            if result is not None:
+                cls._parse_memo.move_to_end(memo_key)
+                logger.debug(f"♻️ HTML sin cambios, se reutiliza el parseo de {key[1]}")
+                return result
+        
+        result = parse()
+        
+        with cls._parse_memo_lock:
+            cls._parse_memo[memo_key] = result
+            while len(cls._parse_memo) > ScraperConfig.PARSE_MEMO_SIZE:
+                cls._parse_memo.popitem(last=False)
+        return result
+    
+    def _parse_listing_page(self, html, page_url):
+        """
+        Parsea una página de listado
+        
+        Returns:
+            tuple: (lista de videos válidos, URL de la página siguiente o None)
+        """
+        video_items, next_href = self.parser.parse_listing(html)
+        
+        # Filtrar elementos publicitarios
+        filtered_items = []
+        ad_rules = Counter()
+        for item in video_items:
+            verdict = self.ad_classifier.classify(item)
+            if verdict.is_ad:
+                ad_rules[verdict.rule] += 1
+                continue
+            filtered_items.append(item)
             
-            return False
+        logger.info(f"Encontrados {len(video_items)} elementos totales, {len(filtered_items)} videos válidos después de filtrar publicidad")
+        if ad_rules:
+            logger.debug(f"Reglas de publicidad aplicadas: {dict(ad_rules)}")
+        
+        videos = []
+        for item in filtered_items:
+            video_data = self._extract_video_data_from_real_html(item)
+            if video_data:
+                videos.append(video_data)
+        
+        # Enlace a la página siguiente
+        next_url = urljoin(page_url, next_href) if next_href else None
+        
+        return videos, next_url
+    
+    def _is_advertisement(self, item):
+        """Detecta si un elemento (ListingItem) es publicidad"""
+        try:
+            verdict = self.ad_classifier.classify(item)
+            if verdict.is_ad:
+                logger.debug(f"Elemento publicitario filtrado por regla '{verdict.rule}': {verdict.detail}")
+            return verdict.is_ad
             
         except Exception as e:
             logger.debug(f"Error verificando publicidad: {str(e)}")
             return False
+    
+    def get_ad_filter_stats(self):
+        """Devuelve cuántos elementos ha decidido cada regla del filtro de publicidad"""
+        return self.ad_classifier.get_stats()
 
     def _extract_video_data_from_real_html(self, item):
-        """Extrae datos de video del HTML real proporcionado"""
+        """Extrae datos de video de un ListingItem ya recorrido por el parser"""
         try:
-            # Extraer título desde .title a
+            # Título desde .title a (atributo title o texto), si no data-title del enlace principal
             title = ""
-            title_elem = item.select_one('.title a')
-            if title_elem:
-                title = title_elem.get('title', '') or title_elem.text.strip()
-            
-            # Si no hay título, buscar en data-title del enlace principal
-            if not title:
-                main_link = item.select_one('a.linkVideoThumb')
-                if main_link:
-                    title = main_link.get('data-title', '')
+            if item.has_title_link:
+                title = item.title_attr or item.title_text or ""
+            if not title and item.has_thumb_link:
+                title = item.thumb_title or ""
             
-            # Extraer URL del video
+            # URL del video desde .title a, si no desde el enlace principal
             video_url = ""
-            link_elem = item.select_one('.title a')
-            if link_elem and link_elem.get('href'):
-                video_url = urljoin(self.base_url, link_elem['href'])
-            
-            # Si no encontramos URL en .title a, buscar en el enlace principal
-            if not video_url:
-                main_link = item.select_one('a.linkVideoThumb')
-                if main_link and main_link.get('href'):
-                    video_url = urljoin(self.base_url, main_link['href'])
-            
-            # Extraer miniatura
-            thumbnail = ""
-            img_elem = item.select_one('img.thumb')
-            if img_elem:
-                # Priorizar data-mediumthumb, luego src
-                thumbnail = (img_elem.get('data-mediumthumb') or 
-                           img_elem.get('src') or 
-                           img_elem.get('data-src') or "")
-            
-            # Extraer duración
-            duration = ""
-            duration_elem = item.select_one('.duration')
-            if duration_elem:
-                duration = duration_elem.text.strip()
-            
-            # Extraer vistas
-            views = ""
-            views_elem = item.select_one('.views var')
-            if views_elem:
-                views = views_elem.text.strip()
-            
-            # Extraer rating
-            rating = ""
-            rating_elem = item.select_one('.rating-container .value')
-            if rating_elem:
-                rating = rating_elem.text.strip()
-            
-            # Extraer canal/uploader
-            uploader = ""
-            uploader_elem = item.select_one('.usernameWrap a')
-            if uploader_elem:
-                uploader = uploader_elem.text.strip()
+            if item.title_href:
+                video_url = urljoin(self.base_url, item.title_href)
+            elif item.thumb_href:
+                video_url = urljoin(self.base_url, item.thumb_href)
             
             # Solo devolver si tenemos datos mínimos necesarios
             if title and video_url:
-                video_data = {
-                    'title': title,
-                    'url': video_url,
-                    'thumbnail': thumbnail,
-                    'duration': duration,
-                    'views': views,
-                    'rating': rating,
-                    'uploader': uploader
-                }
+                video_data = VideoRecord(
+                    title=title,
+                    url=video_url,
+                    thumbnail=item.thumbnail or "",
+                    duration=item.duration or "",
+                    views=item.views or "",
+                    rating=item.rating or "",
+                    uploader=item.uploader or ""
+                )
                 
                 logger.debug(f"Video extraído: {title[:50]}...")
                 return video_data
@@ -0,0 +1,249 @@
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+
+import requests
+
+from .config import DownloadConfig
+from .partial_download import PartialDownload
+
+logger = logging.getLogger('SegmentedDownloader')
+
+_CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+
+class RangeNotSupported(Exception):
+    """El servidor no respetó una petición con Range"""
+
+
+class _TransferState:
+    """Progreso compartido entre los hilos de una descarga"""
+
+    def __init__(self, total, progress_callback=None):
+        self.total = total
+        self.downloaded = 0
+        self.failed = threading.Event()
+        self._callback = progress_callback
+        self._lock = threading.Lock()
+
+    def add(self, count):
+        with self._lock:
+            self.downloaded += count
+            if self._callback:
+                self._callback(self.downloaded, self.total)
+
+
+class SegmentedDownloader:
+    """
+    Descarga de archivos directos por rangos en paralelo
+
+    Primero sondea el tamaño y si el servidor acepta Range. Si lo acepta,
+    reserva el .part completo y descarga los trozos que faltan (varios a la
+    vez si el archivo es suficientemente grande), cada uno en su posición. Si
+    no, o si el servidor deja de respetar Range a mitad, descarga desde cero
+    con una sola conexión.
+    """
+
+    def __init__(self, session, headers=None, connections=None, segment_size=None, chunk_size=None):
+        self.session = session
+        self.headers = dict(headers or {})
+        # Los rangos deben llegar tal cual, sin compresión
+        self.headers['Accept-Encoding'] = 'identity'
+        self.connections = connections or DownloadConfig.DOWNLOAD_CONNECTIONS
+        self.segment_size = segment_size or DownloadConfig.SEGMENT_SIZE
+        self.chunk_size = chunk_size or DownloadConfig.CHUNK_SIZE
+        self.retries = DownloadConfig.SEGMENT_RETRIES
+
+    def probe(self, url):
+        """
+        Consulta tamaño y soporte de Range con una petición de 1 byte
+
+        Returns:
+            dict: size (o None), accept_ranges, etag, last_modified
+        """
+        headers = {**self.headers, 'Range': 'bytes=0-0'}
+        with self.session.get(url, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            info = {
+                'size': None,
+                'accept_ranges': False,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+
+            if response.status_code == 206:
+                match = _CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+                if match and match.group(3) != '*':
+                    info['size'] = int(match.group(3))
+                    info['accept_ranges'] = True
+            elif response.headers.get('Content-Length'):
+                info['size'] = int(response.headers['Content-Length'])
+
+        return info
+
+    def download(self, url, filepath, progress_callback=None, info=None, tee=None, finalize=True):
+        """
+        Descarga url en filepath pasando por filepath.part
+
+        Si queda un .part de un intento anterior del mismo archivo remoto
+        (mismo tamaño y validadores), solo se piden los rangos que faltan. El
+        archivo toma su nombre final cuando está verificado completo.
+
+        Args:
+            progress_callback: función (bytes descargados, bytes totales o 0)
+            info: resultado de probe() si ya se sondeó
+            tee: objeto con written(inicio, fin) y fail(error) al que se avisa
+                de cada trozo escrito (p. ej. GrowingFile para subir a la vez)
+            finalize: renombrar al nombre final; con False lo hace quien llama
+                (partial.finish) cuando ya nadie lee el .part
+
+        Returns:
+            PartialDownload de la descarga completa
+
+        Raises:
+            Exception si la descarga falla (el .part se conserva para reanudar)
+        """
+        info = info or self.probe(url)
+        size = info['size']
+        partial = PartialDownload(filepath)
+
+        if info['accept_ranges'] and size:
+            if partial.load() and partial.matches(info):
+                done_mb = partial.completed_bytes() / (1024*1024)
+                logger.info(f"⏯️ Reanudando {partial.final_path.name}: {done_mb:.1f} de {size / (1024*1024):.1f} MB")
+            else:
+                partial.start(url, info)
+
+            if tee is not None:
+                for start, end in partial.meta['completed']:
+                    tee.written(start, end)
+
+            try:
+                self._download_ranges(url, partial, size, info, progress_callback, tee)
+                if finalize:
+                    partial.finish(size)
+                return partial
+            except RangeNotSupported as e:
+                logger.warning(f"⚠️ {str(e)}; se descarga de nuevo con una sola conexión")
+                if tee is not None:
+                    tee.fail(e)  # Lo ya entregado puede ser de otra versión del archivo
+                partial.discard()
+
+        self._download_single(url, partial, size, progress_callback, tee)
+        if finalize:
+            partial.finish(size)
+        return partial
+
+    def _segments(self, ranges):
+        """Parte los rangos pendientes en trozos de segment_size"""
+        return [(start, min(start + self.segment_size - 1, end))
+                for range_start, end in ranges
+                for start in range(range_start, end + 1, self.segment_size)]
+
+    def _download_ranges(self, url, partial, size, info, progress_callback, tee=None):
+        # Reservar el archivo completo: cada trozo se escribe en su posición
+        mode = 'r+b' if partial.part_path.exists() else 'wb'
+        with open(partial.part_path, mode) as f:
+            f.truncate(size)
+
+        state = _TransferState(size, progress_callback)
+        state.downloaded = partial.completed_bytes()
+        segments = self._segments(partial.missing_ranges())
+
+        # If-Range: si el archivo cambió, el servidor responde 200 y no se mezclan versiones
+        validator = info['last_modified']
+        if info['etag'] and not info['etag'].startswith('W/'):
+            validator = info['etag']
+        headers = {**self.headers, 'If-Range': validator} if validator else self.headers
+
+        connections = self.connections if size >= DownloadConfig.MIN_SEGMENTED_SIZE else 1
+        connections = max(1, min(connections, len(segments)))
+        if connections > 1:
+            logger.info(f"🚀 Descarga segmentada: {size / (1024*1024):.1f} MB con {connections} conexiones")
+
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix='range-download') as executor:
+            futures = [executor.submit(self._fetch_range, url, headers, partial, start, end, state, tee)
+                       for start, end in segments]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+
+            for future in done:
+                if future.exception() is not None:
+                    state.failed.set()
+                    for pending in futures:
+                        pending.cancel()
+                    raise future.exception()
+
+        if state.downloaded != size:
+            raise IOError(f"Descarga incompleta: {state.downloaded} de {size} bytes")
+
+    def _fetch_range(self, url, headers, partial, start, end, state, tee=None):
+        """Descarga los bytes start..end (inclusive), reintentando desde donde se quedó"""
+        offset = start
+        attempts = 0
+
+        try:
+            while offset <= end:
+                if state.failed.is_set():
+                    return
+
+                range_headers = {**headers, 'Range': f'bytes={offset}-{end}'}
+                try:
+                    with self.session.get(url, headers=range_headers, stream=True) as response:
+                        if response.status_code != 206:
+                            raise RangeNotSupported(f"Respuesta {response.status_code} a una petición Range")
+
+                        with open(partial.part_path, 'r+b') as f:
+                            f.seek(offset)
+                            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                                if state.failed.is_set():
+                                    return
+                                if not chunk:
+                                    continue
+                                chunk = chunk[:end - offset + 1]
+                                f.write(chunk)
+                                if tee is not None:
+                                    f.flush()  # Quien sigue el archivo lee por otro descriptor
+                                    tee.written(offset, offset + len(chunk) - 1)
+                                offset += len(chunk)
+                                state.add(len(chunk))
+                                if offset > end:
+                                    break
+
+                    if offset <= end:
+                        raise IOError(f"Conexión cerrada en el byte {offset} del rango {start}-{end}")
+
+                except RangeNotSupported:
+                    raise
+                except (requests.RequestException, IOError) as e:
+                    attempts += 1
+                    if attempts > self.retries:
+                        raise
+                    logger.warning(f"⚠️ Reintentando rango {start}-{end} desde {offset} ({attempts}/{self.retries}): {str(e)}")
+                    time.sleep(DownloadConfig.SEGMENT_RETRY_DELAY * attempts)
+        finally:
+            # Lo escrito queda registrado en el sidecar aunque el rango falle
+            partial.add_range(start, offset - 1)
+
+    def _download_single(self, url, partial, size, progress_callback, tee=None):
+        """Descarga con una sola conexión (sin Range no se puede reanudar)"""
+        partial.discard()
+        state = _TransferState(size or 0, progress_callback)
+
+        with self.session.get(url, headers=self.headers, stream=True) as response:
+            response.raise_for_status()
+            if not state.total:
+                state.total = int(response.headers.get('Content-Length', 0))
+
+            with open(partial.part_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if chunk:
+                        f.write(chunk)
+                        if tee is not None:
+                            f.flush()
+                            tee.written(state.downloaded, state.downloaded + len(chunk) - 1)
+                        state.add(len(chunk))
+
+        if state.total and state.downloaded != state.total:
+            raise IOError(f"Descarga incompleta: {state.downloaded} de {state.total} bytes")
@@ -0,0 +1,340 @@
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from .config import DownloadConfig
+from .video_store import get_video_store
+from utils.progress import format_bytes
+
+logger = logging.getLogger('StorageManager')
+
+
+class StorageFullError(Exception):
+    """No hay (ni habrá) espacio para la descarga pedida"""
+
+
+class Reservation:
+    """
+    Espacio reservado para una descarga en curso
+
+    Se usa como context manager: al salir se libera y se avisa a quien
+    esté esperando espacio.
+    """
+    __slots__ = ('manager', 'nbytes', 'path', 'released')
+
+    def __init__(self, manager, nbytes, path=None):
+        self.manager = manager
+        self.nbytes = nbytes
+        self.path = Path(path) if path else None
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.manager._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class StorageManager:
+    """
+    Presupuesto de disco de la carpeta de descargas
+
+    Antes de descargar, cada trabajo reserva el tamaño esperado. Si no cabe
+    (por el presupuesto de la carpeta o por el mínimo de espacio libre del
+    disco) se borran los videos ya subidos que hace más tiempo que no se
+    usan, salvo que el usuario lo haya desactivado en la configuración de
+    StreamWish (por defecto STORAGE_EVICT_UPLOADED). Si aun así no cabe, el
+    trabajo espera a que se libere espacio (como mucho STORAGE_WAIT_TIMEOUT)
+    en lugar de fallar a mitad de descarga. Un hilo en segundo plano aplica
+    los mismos límites cada STORAGE_CHECK_INTERVAL segundos y borra los
+    videos marcados para eliminar tras subirlos.
+
+    El lock solo protege la lista de reservas: las medidas del disco y los
+    borrados se hacen fuera, sobre una copia de esa lista.
+    """
+
+    def __init__(self, folder=None, budget_bytes=None, min_free_bytes=None, store=None, evict_uploaded=None):
+        self.folder = Path(folder or DownloadConfig.get_download_folder())
+        self.budget_bytes = DownloadConfig.STORAGE_BUDGET_BYTES if budget_bytes is None else budget_bytes
+        self.min_free_bytes = DownloadConfig.STORAGE_MIN_FREE_BYTES if min_free_bytes is None else min_free_bytes
+        self.evict_uploaded = self._evict_setting() if evict_uploaded is None else evict_uploaded
+        self.store = store or get_video_store()
+
+        self._reservations = []
+        self._version = 0        # Cambia con cada reserva o liberación
+        self._evict_queue = []   # IDs a borrar en cuanto se pueda (borrar tras subir)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    @staticmethod
+    def _evict_setting():
+        """Preferencia del usuario (configuración de StreamWish) o el valor por defecto"""
+        try:
+            from .config_streamwish import StreamWishConfig
+            return StreamWishConfig().is_evict_when_full_enabled()
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo leer la configuración de limpieza: {str(e)}")
+            return DownloadConfig.STORAGE_EVICT_UPLOADED
+
+    # Medidas (sin el lock: reciben una copia de las reservas)
+
+    def _free_bytes(self):
+        return shutil.disk_usage(self.folder).free
+
+    @staticmethod
+    def _allocated(path):
+        """Bytes que ocupa realmente un archivo (los .part reservados son dispersos)"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 0
+        blocks = getattr(st, 'st_blocks', None)
+        return min(st.st_size, blocks * 512) if blocks is not None else st.st_size
+
+    def _snapshot(self):
+        with self._cond:
+            return list(self._reservations), self._version
+
+    def used_bytes(self, exclude=None, reservations=None):
+        """Ocupado por la carpeta sin contar lo de las descargas en curso (ni exclude)"""
+        if reservations is None:
+            reservations = self._snapshot()[0]
+        names = [r.path.name for r in reservations if r.path is not None]
+        if exclude is not None:
+            names.append(Path(exclude).name)
+        prefixes = tuple(names)
+
+        total = 0
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if entry.is_file() and not (prefixes and entry.name.startswith(prefixes)):
+                        total += entry.stat().st_size
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo medir la carpeta de descargas: {str(e)}")
+        return total
+
+    def _pending_bytes(self, reservations):
+        """Lo que aún escribirán las descargas en curso"""
+        pending = 0
+        for reservation in reservations:
+            written = self._allocated(Path(str(reservation.path) + '.part')) if reservation.path else 0
+            pending += max(reservation.nbytes - written, 0)
+        return pending
+
+    def _shortfall(self, reservations, nbytes=0, path=None):
+        """Bytes que faltan para que quepan nbytes más (0 si caben)"""
+        # Lo ya escrito en un .part que se va a reanudar no vuelve a ocupar
+        written = self._allocated(Path(str(path) + '.part')) if path else 0
+        shortfall = max(self.min_free_bytes + self._pending_bytes(reservations) + max(nbytes - written, 0)
+                        - self._free_bytes(), 0)
+        if self.budget_bytes:
+            reserved = sum(r.nbytes for r in reservations)
+            shortfall = max(shortfall, self.used_bytes(path, reservations) + reserved + nbytes - self.budget_bytes)
+        return shortfall
+
+    # Reservas
+
+    def estimate_hls_size(self, duration):
+        """Tamaño aproximado de un HLS por su duración"""
+        if duration:
+            return int(duration * DownloadConfig.STORAGE_HLS_BYTES_PER_SECOND)
+        return DownloadConfig.STORAGE_UNKNOWN_SIZE
+
+    def reserve(self, nbytes, path=None, cancel_event=None, on_wait=None, timeout=None):
+        """
+        Reserva nbytes para la descarga de path, esperando si no hay espacio
+
+        Args:
+            cancel_event: si se activa mientras espera, devuelve None
+            on_wait: función (bytes que faltan) llamada al empezar a esperar
+            timeout: segundos máximos de espera (por defecto STORAGE_WAIT_TIMEOUT)
+
+        Returns:
+            Reservation (o None si se canceló)
+
+        Raises:
+            StorageFullError si nbytes no cabe nunca en el presupuesto o se
+            agota el tiempo de espera
+        """
+        nbytes = max(int(nbytes or 0), 0)
+        if self.budget_bytes and nbytes > self.budget_bytes:
+            raise StorageFullError(f"El video ({format_bytes(nbytes)}) supera el presupuesto "
+                                   f"de la carpeta ({format_bytes(self.budget_bytes)})")
+
+        self._ensure_thread()
+        timeout = DownloadConfig.STORAGE_WAIT_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waiting = False
+
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+
+            reservations, version = self._snapshot()
+            shortfall = self._shortfall(reservations, nbytes, path)
+            if shortfall > 0 and self._evict(shortfall, reservations):
+                shortfall = self._shortfall(reservations, nbytes, path)
+
+            with self._cond:
+                if shortfall <= 0:
+                    if version != self._version:
+                        # Otra descarga reservó (o liberó) mientras se medía: volver a medir
+                        continue
+                    reservation = Reservation(self, nbytes, path)
+                    self._reservations.append(reservation)
+                    self._version += 1
+                    if waiting:
+                        logger.info(f"💾 Espacio disponible para {Path(path).name if path else 'la descarga'}")
+                    return reservation
+
+                if not waiting:
+                    waiting = True
+                    logger.warning(f"⏳ Faltan {format_bytes(shortfall)} en disco; esperando a que se libere espacio")
+                    if on_wait:
+                        on_wait(shortfall)
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise StorageFullError(f"Sin espacio en disco tras esperar {timeout:.0f}s: "
+                                           f"faltan {format_bytes(shortfall)}")
+                # Se despierta al liberar una reserva; revisa también por si se libera fuera
+                if version == self._version:
+                    self._cond.wait(min(5.0, remaining))
+
+    def _release(self, reservation):
+        with self._cond:
+            if reservation in self._reservations:
+                self._reservations.remove(reservation)
+                self._version += 1
+            self._cond.notify_all()
+
+    # Limpieza
+
+    def schedule_eviction(self, video_id):
+        """Borra en segundo plano la copia local de un video ya subido"""
+        self._ensure_thread()
+        with self._cond:
+            if video_id and video_id not in self._evict_queue:
+                self._evict_queue.append(video_id)
+            self._cond.notify_all()
+
+    def _evict(self, needed, reservations):
+        """
+        Borra videos subidos (LRU) hasta liberar needed bytes, si está permitido
+
+        Returns:
+            int: bytes liberados
+        """
+        if not self.evict_uploaded:
+            return 0
+        # Candidatos por el tamaño del índice (sin tocar el disco); se borran después
+        in_use = {str(r.path) for r in reservations if r.path is not None}
+        candidates = []
+        planned = 0
+        for video in self.store.evictable():
+            if planned >= needed:
+                break
+            if video.path in in_use:
+                continue
+            candidates.append(video)
+            planned += video.size or 0
+        return sum(self._evict_video(video) for video in candidates)
+
+    def _evict_video(self, video):
+        path = video.path
+        if path is None:
+            return 0
+        with self._cond:
+            # Un archivo que otra descarga aún usa no se toca
+            if any(r.path is not None and str(r.path) == path for r in self._reservations):
+                return 0
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except FileNotFoundError:
+            size = 0
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo borrar {os.path.basename(path)}: {str(e)}")
+            return 0
+        logger.info(f"🗑️ Liberado {format_bytes(size)}: {os.path.basename(path)} (ya subido)")
+        self.store.mark_evicted(video.video_id)
+        return size
+
+    def _ensure_thread(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name='storage-manager', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                queued, self._evict_queue = self._evict_queue, []
+
+            try:
+                for video_id in queued:
+                    # Si otro registro comparte el archivo y aún no se subió, se conserva
+                    if self.store.is_evictable(video_id):
+                        self._evict_video(self.store.get(video_id))
+                reservations = self._snapshot()[0]
+                shortfall = self._shortfall(reservations)
+                if shortfall > 0:
+                    self._evict(shortfall, reservations)
+            except Exception as e:
+                logger.error(f"❌ Error en la limpieza del disco: {str(e)}")
+
+            with self._cond:
+                self._cond.notify_all()
+                if not self._stopped and not self._evict_queue:
+                    self._cond.wait(DownloadConfig.STORAGE_CHECK_INTERVAL)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def status(self):
+        """Resumen para mostrar (bytes)"""
+        reservations = self._snapshot()[0]
+        return {
+            'used': self.used_bytes(reservations=reservations),
+            'reserved': sum(r.nbytes for r in reservations),
+            'free': self._free_bytes(),
+            'budget': self.budget_bytes,
+            'min_free': self.min_free_bytes,
+            'evict_uploaded': self.evict_uploaded,
+            'evictable': len(self.store.evictable()),
+        }
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_storage_manager():
+    """
+    Devuelve el gestor de espacio compartido de la carpeta de descargas
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = StorageManager()
+                logger.info(f"💾 Carpeta de descargas: presupuesto "
+                            f"{format_bytes(_manager.budget_bytes) if _manager.budget_bytes else 'sin límite'}, "
+                            f"mínimo libre {format_bytes(_manager.min_free_bytes)}, "
+                            f"borrar subidos si falta espacio: {'sí' if _manager.evict_uploaded else 'no'}")
+    return _manager
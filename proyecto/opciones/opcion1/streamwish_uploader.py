@@ -7,14 +7,27 @@ import time
 import re
 from PyQt5.QtCore import QObject, pyqtSignal
 
+from utils.http_client import get_http_client
+from utils.progress import ProgressAggregator
+from .models import parse_duration_seconds
+from .config import DownloadConfig
+from .upload_endpoints import get_upload_endpoints
+from .upload_pipe import StreamingMultipartBody, FileChunks
+
 # Configurar logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('StreamWishUploader')
 
 class UploadProgressReporter(QObject):
-    """Señales para reportar progreso de upload"""
+    """Señales para reportar progreso de upload (limitadas por el agregador upload)"""
     upload_progress = pyqtSignal(int)  # 0-100
+    upload_stats = pyqtSignal(float, float)  # bytes/s, segundos restantes (-1 si se desconoce)
     status_changed = pyqtSignal(str)   # Mensaje de estado
+    
+    def __init__(self):
+        super().__init__()
+        self.upload = ProgressAggregator(self.upload_progress.emit, self.upload_stats.emit,
+                                         label="📤 Upload")
 
 class StreamWishUploader(QObject):
     """
@@ -25,7 +38,13 @@ class StreamWishUploader(QObject):
         super().__init__()
         self.api_key = api_key
         self.server_info_url = "https://streamhgapi.com/api/upload/server"
-        self.upload_url = None  # Se obtendrá dinámicamente
+        self.upload_url = None  # Último servidor usado (se elige en cada upload)
+        
+        # Cliente HTTP compartido (conexiones keep-alive reutilizadas)
+        self.session = get_http_client()
+        
+        # Servidores de upload compartidos por todos los uploaders (salud y conmutación)
+        self.endpoints = get_upload_endpoints()
         
         # Reporter de progreso
         self.progress_reporter = UploadProgressReporter()
@@ -46,6 +65,9 @@ class StreamWishUploader(QObject):
         
         # Variable para almacenar el último resultado de upload
         self.last_upload_result = None
+        
+        # El último fallo fue de red o del servidor (5xx): tiene sentido reintentar
+        self.last_error_retryable = False
     
     def set_api_key(self, api_key):
         """
@@ -66,7 +88,7 @@ class StreamWishUploader(QObject):
             params = {'key': self.api_key}
             logger.info(f"🌐 Obteniendo servidor de upload...")
             
-            response = requests.get(
+            response = self.session.get(
                 self.server_info_url,
                 params=params,
                 headers=self.headers,
@@ -94,8 +116,13 @@ class StreamWishUploader(QObject):
             else:
                 logger.error(f"❌ Error HTTP obteniendo servidor: {response.status_code}")
                 logger.error(f"❌ Respuesta: {response.text[:300]}")
+                self.last_error_retryable = response.status_code >= 500
                 return None
                 
+        except requests.exceptions.RequestException as e:
+            logger.error(f"❌ Error obteniendo servidor de upload: {str(e)}")
+            self.last_error_retryable = True
+            return None
         except Exception as e:
             logger.error(f"❌ Error obteniendo servidor de upload: {str(e)}")
             return None
@@ -117,6 +144,7 @@ class StreamWishUploader(QObject):
             
             if upload_url:
                 self.upload_url = upload_url
+                self.endpoints.add(self.api_key, upload_url)
                 logger.info("✅ API key válida - Conexión exitosa")
                 return True
             else:
@@ -158,7 +186,9 @@ class StreamWishUploader(QObject):
             
         Returns:
             dict: Respuesta de la API con información del video subido
+            (si es None, last_error_retryable dice si merece reintentarse)
         """
+        self.last_error_retryable = False
         try:
             if not self.api_key:
                 logger.error("❌ API key no configurada")
@@ -177,13 +207,9 @@ class StreamWishUploader(QObject):
                 logger.error("❌ StreamWish solo acepta archivos de video")
                 return None
             
-            # Obtener URL de upload si no la tenemos
-            if not self.upload_url:
-                self.progress_reporter.status_changed.emit("🌐 Obteniendo servidor...")
-                self.upload_url = self.get_upload_server()
-                if not self.upload_url:
-                    logger.error("❌ No se pudo obtener servidor de upload")
-                    return None
+            # Comprobar que hay servidor de upload antes de preparar nada
+            if not self._ensure_upload_server():
+                return None
             
             # Preparar datos del video
             upload_data = self._prepare_upload_data(video_data, custom_config)
@@ -195,7 +221,7 @@ class StreamWishUploader(QObject):
             self.progress_reporter.status_changed.emit("📤 Subiendo video...")
             
             # Realizar upload
-            response = self._upload_to_server_with_progress(self.upload_url, upload_data, video_path)
+            response = self._upload_to_server_with_progress(upload_data, video_path)
             
             if response:
                 result = self._process_response(response)
@@ -213,6 +239,72 @@ class StreamWishUploader(QObject):
             self.progress_reporter.status_changed.emit(f"❌ Error: {str(e)}")
             return None
     
+    def upload_stream(self, chunks, filename, size, video_data=None, custom_config=None):
+        """
+        Sube un video a medida que se descarga
+        
+        Args:
+            chunks: iterable con los bytes del archivo en orden (p. ej. GrowingFile)
+            filename: nombre con el que se sube
+            size: tamaño exacto en bytes (el servidor necesita Content-Length)
+            video_data: Datos del video (título, descripción, etc.)
+            custom_config: Configuración personalizada
+            
+        Returns:
+            dict: Respuesta de la API, o None si falla (también si la descarga se interrumpe)
+        """
+        self.last_error_retryable = False
+        try:
+            if not self.api_key:
+                logger.error("❌ API key no configurada")
+                return None
+            
+            if not self._ensure_upload_server():
+                return None
+            
+            upload_data = self._prepare_upload_data(video_data, custom_config)
+            
+            logger.info(f"📤 Iniciando upload en paralelo con la descarga: {filename}")
+            logger.info(f"📊 Tamaño del archivo: {size / (1024 * 1024):.1f} MB")
+            self.progress_reporter.status_changed.emit("📤 Subiendo video...")
+            
+            body = StreamingMultipartBody(upload_data, 'file', filename, 'video/mp4', chunks, size,
+                                          progress=self.progress_reporter.upload)
+            
+            response = self._post_upload(body)
+            
+            if response:
+                result = self._process_response(response)
+                if result:
+                    self.progress_reporter.upload_progress.emit(100)
+                    self.progress_reporter.status_changed.emit("✅ Upload completado!")
+                return result
+            else:
+                logger.error("❌ Upload en paralelo falló")
+                return None
+                
+        except Exception as e:
+            logger.error(f"❌ Error durante el upload en paralelo: {str(e)}")
+            return None
+    
+    def _ensure_upload_server(self, refresh=False):
+        """
+        Elige el servidor de upload más sano del registro compartido
+        
+        Solo se consulta la API si no hay ninguno vigente o con refresh
+        (tras un fallo del servidor). Devuelve el UploadEndpoint o None.
+        """
+        endpoint = self.endpoints.acquire(self.api_key, self._fetch_upload_server, refresh=refresh)
+        if endpoint is None:
+            logger.error("❌ No se pudo obtener servidor de upload")
+            return None
+        self.upload_url = endpoint.url
+        return endpoint
+    
+    def _fetch_upload_server(self):
+        self.progress_reporter.status_changed.emit("🌐 Obteniendo servidor...")
+        return self.get_upload_server()
+    
     def _prepare_upload_data(self, video_data, custom_config):
         """
         Prepara los datos para el upload
@@ -243,83 +335,90 @@ class StreamWishUploader(QObject):
         logger.info(f"📋 Datos de upload preparados: {list(upload_data.keys())}")
         return upload_data
     
-    def _upload_to_server_with_progress(self, url, data, video_path):
+    def _upload_to_server_with_progress(self, data, video_path):
         """
         Realiza el upload al servidor con progreso
         """
         try:
-            logger.info(f"🌐 Subiendo a: {url}")
-            
-            file_size = os.path.getsize(video_path)
+            # Cuerpo multipart generado al enviar (files= de requests lo
+            # montaría entero en memoria antes del primer byte)
+            chunks = FileChunks(video_path)
+            body = StreamingMultipartBody(data, 'file', os.path.basename(video_path), 'video/mp4',
+                                          chunks, chunks.size, progress=self.progress_reporter.upload)
             
-            # Crear clase personalizada para monitorear progreso
-            class ProgressFile:
-                def __init__(self, file_path, progress_callback):
-                    self.file = open(file_path, 'rb')
-                    self.progress_callback = progress_callback
-                    self.uploaded = 0
-                    self.total_size = os.path.getsize(file_path)
-                
-                def read(self, size=-1):
-                    chunk = self.file.read(size)
-                    if chunk:
-                        self.uploaded += len(chunk)
-                        progress = int((self.uploaded / self.total_size) * 100)
-                        self.progress_callback(progress)
-                    return chunk
-                
-                def close(self):
-                    self.file.close()
-                
-                def __enter__(self):
-                    return self
-                
-                def __exit__(self, *args):
-                    self.close()
-            
-            # Función callback para progreso
-            def progress_callback(progress):
-                self.progress_reporter.upload_progress.emit(progress)
-                if progress % 10 == 0 and progress > 0:
-                    mb_uploaded = (progress / 100) * (file_size / (1024*1024))
-                    mb_total = file_size / (1024*1024)
-                    logger.info(f"📤 Upload: {progress}% ({mb_uploaded:.1f}/{mb_total:.1f} MB)")
-            
-            # Preparar archivo con monitoreo de progreso
-            with ProgressFile(video_path, progress_callback) as progress_file:
-                files = {
-                    'file': (os.path.basename(video_path), progress_file, 'video/mp4')
-                }
+            # Realizar upload
+            return self._post_upload(body)
                 
-                # Realizar upload
-                response = requests.post(
-                    url,
-                    data=data,
-                    files=files,
-                    headers=self.headers,
+        except Exception as e:
+            logger.error(f"❌ Error en upload: {str(e)}")
+            self.progress_reporter.status_changed.emit(f"❌ Error upload: {str(e)}")
+            return None
+    
+    def _post_upload(self, body):
+        """
+        Envía el POST de upload, cambiando de servidor si el actual falla
+        
+        Un error de conexión, timeout o 5xx cuenta en la salud del servidor
+        y el upload se repite desde el principio (el cuerpo se vuelve a
+        generar) con un servidor recién pedido a la API, hasta
+        UPLOAD_FAILOVER_ATTEMPTS veces. Devuelve la respuesta si es 200,
+        si no None.
+        """
+        headers = {**self.headers, 'Content-Type': body.content_type}
+        attempts = DownloadConfig.UPLOAD_FAILOVER_ATTEMPTS
+        
+        for attempt in range(1, attempts + 1):
+            endpoint = self._ensure_upload_server(refresh=attempt > 1)
+            if endpoint is None:
+                self.progress_reporter.status_changed.emit("❌ Sin servidor de upload")
+                return None
+            
+            if attempt > 1:
+                logger.info(f"🔀 Reintentando upload en {endpoint.url} ({attempt}/{attempts})")
+                self.progress_reporter.status_changed.emit(f"🔀 Cambiando de servidor ({attempt}/{attempts})...")
+            logger.info(f"🌐 Subiendo a: {endpoint.url}")
+            
+            if body.progress is not None:
+                body.progress.reset(body.size)
+            started = time.monotonic()
+            try:
+                response = self.session.post(
+                    endpoint.url,
+                    data=body,
+                    headers=headers,
                     timeout=600,  # 10 minutos timeout para videos grandes
                 )
+            except requests.exceptions.Timeout as e:
+                logger.error(f"❌ Timeout durante el upload en {endpoint.url}")
+                self.endpoints.report_failure(endpoint, e)
+                continue
+            except requests.exceptions.ConnectionError as e:
+                logger.error(f"❌ Error de conexión durante upload en {endpoint.url}")
+                self.endpoints.report_failure(endpoint, e)
+                continue
+            except Exception as e:
+                # Descarga interrumpida (PipeAborted) u otro fallo que no es del servidor
+                logger.error(f"❌ Error en upload: {str(e)}")
+                self.progress_reporter.status_changed.emit(f"❌ Error upload: {str(e)}")
+                return None
             
             if response.status_code == 200:
+                self.endpoints.report_success(endpoint, len(body), time.monotonic() - started)
                 logger.info("✅ Upload completado exitosamente")
                 return response
-            else:
-                logger.error(f"❌ Error HTTP: {response.status_code}")
-                logger.error(f"❌ Respuesta: {response.text[:500]}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            logger.error("❌ Timeout durante el upload (el video puede ser muy grande)")
-            self.progress_reporter.status_changed.emit("❌ Timeout en upload")
-            return None
-        except requests.exceptions.ConnectionError:
-            logger.error("❌ Error de conexión durante upload")
-            self.progress_reporter.status_changed.emit("❌ Error de conexión")
-            return None
-        except Exception as e:
-            logger.error(f"❌ Error en upload: {str(e)}")
-            self.progress_reporter.status_changed.emit(f"❌ Error upload: {str(e)}")
+            
+            logger.error(f"❌ Error HTTP: {response.status_code}")
+            logger.error(f"❌ Respuesta: {response.text[:500]}")
+            if response.status_code >= 500:
+                self.endpoints.report_failure(endpoint, f"HTTP {response.status_code}")
+                continue
             return None
+        
+        logger.error(f"❌ Upload falló en {attempts} intentos")
+        self.progress_reporter.status_changed.emit("❌ Error de conexión con los servidores de upload")
+        # Solo se llega aquí tras errores de red o 5xx
+        self.last_error_retryable = True
+        return None
     
     def _process_response(self, response):
         """
@@ -448,21 +547,18 @@ class StreamWishUploader(QObject):
         """
         tags = []
         
-        # Tags basados en duración
-        if video_data.get('duration'):
-            duration = video_data['duration']
-            if ':' in duration:
-                try:
-                    parts = duration.split(':')
-                    minutes = int(parts[-2]) if len(parts) > 1 else 0
-                    if minutes > 30:
-                        tags.append('long')
-                    elif minutes > 15:
-                        tags.append('medium')
-                    else:
-                        tags.append('short')
-                except:
-                    pass
+        # Tags basados en duración (VideoRecord ya la trae en segundos)
+        duration_seconds = getattr(video_data, 'duration_seconds', None)
+        if duration_seconds is None:
+            duration_seconds = parse_duration_seconds(video_data.get('duration'))
+        if duration_seconds is not None:
+            minutes = duration_seconds // 60
+            if minutes > 30:
+                tags.append('long')
+            elif minutes > 15:
+                tags.append('medium')
+            else:
+                tags.append('short')
         
         # Tags basados en uploader
         if video_data.get('uploader'):
@@ -0,0 +1,344 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+
+from PyQt5.QtCore import Qt
+
+from .config import DownloadConfig
+from .downloader import VideoDownloader, TransferCancelled
+
+logger = logging.getLogger('TransferManager')
+
+# Prioridades (menor = antes)
+PRIORITY_HIGH = 0     # Importaciones pedidas desde la interfaz
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10     # Ejecuciones programadas
+
+
+class TransferJob:
+    """
+    Una transferencia en la cola y su estado propio
+
+    Cada trabajo usa su propio VideoDownloader mientras se ejecuta, así que
+    las rutas, la imagen y el código de StreamWish no se mezclan entre
+    trabajos simultáneos. Al terminar, el resultado queda en el trabajo y el
+    downloader se suelta.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, job_id, kind, url, video_data, priority, video_path=None):
+        self.job_id = job_id
+        self.kind = kind              # 'download' (descarga + auto-upload) o 'upload'
+        self.url = url
+        self.video_data = video_data if video_data is not None else {}
+        self.priority = priority
+        self.state = self.QUEUED
+        self.status = ''
+        self.progress = 0
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        # Resultado (se rellena al terminar)
+        self.success = False
+        self.video_path = video_path
+        self.image_path = None
+        self.ftp_image_url = None
+        self.streamwish_filecode = None
+        self.downloader = None        # Solo mientras se ejecuta
+
+        self.cancel_event = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Espera a que termine. True si terminó dentro del plazo"""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'title': self.video_data.get('title', ''),
+            'priority': self.priority,
+            'state': self.state,
+            'status': self.status,
+            'progress': self.progress,
+            'error': self.error,
+            'video_path': self.video_path,
+            'streamwish_filecode': self.streamwish_filecode,
+        }
+
+
+class TransferManager:
+    """
+    Cola central de descargas y uploads
+
+    Un pool de hilos toma los trabajos por prioridad (y orden de llegada).
+    No hay tope por host: la página siempre es el mismo sitio y los videos
+    salen de CDNs que solo se conocen tras extraer las URLs, así que la
+    concurrencia la fija TRANSFER_WORKERS y el ritmo por host lo pone el
+    limitador del cliente HTTP (utils.rate_limiter). El auto-upload
+    de una descarga va al pool de uploads: el hilo queda libre para la
+    descarga siguiente y el trabajo termina cuando acaba su upload. Los oyentes
+    reciben (job, evento, valor) con los eventos queued, started, progress,
+    upload_progress, status y finished; se llaman desde los hilos de
+    trabajo, la interfaz debe pasarlos a su hilo (ver TransferSignals en ui).
+    Los trabajos terminados se guardan en un historial acotado
+    (TRANSFER_HISTORY) para snapshot() y get_job().
+    """
+
+    def __init__(self, workers=None, history=None):
+        self.workers = workers or DownloadConfig.TRANSFER_WORKERS
+        self._queue = []  # heap de (prioridad, secuencia, job)
+        self._jobs = {}   # En cola o en marcha
+        self._finished = deque(maxlen=history or DownloadConfig.TRANSFER_HISTORY)
+        self._listeners = []
+        self._threads = []
+        self._sequence = itertools.count(1)
+        self._cond = threading.Condition()
+        self._shutdown = False
+
+    # Cola
+
+    def submit_download(self, video_url, video_data, priority=PRIORITY_NORMAL):
+        """Encola descarga (y auto-upload si está configurado) de un video"""
+        return self._submit(TransferJob(next(self._sequence), 'download', video_url, video_data, priority))
+
+    def submit_upload(self, video_path, video_data=None, priority=PRIORITY_NORMAL):
+        """Encola el upload a StreamWish de un archivo ya descargado"""
+        job = TransferJob(next(self._sequence), 'upload', None, video_data, priority, video_path=str(video_path))
+        return self._submit(job)
+
+    def _submit(self, job):
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("El gestor de transferencias está detenido")
+            self._jobs[job.job_id] = job
+            heapq.heappush(self._queue, (job.priority, job.job_id, job))
+            self._ensure_workers()
+            self._cond.notify_all()
+        logger.info(f"📥 En cola #{job.job_id} ({job.kind}): {job.video_data.get('title', job.url or '')[:40]}")
+        self._notify(job, 'queued')
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancela un trabajo. Si está en cola no llega a empezar; si está en
+        marcha se detiene en el siguiente punto de control (trozo, segmento
+        o fase). Devuelve False si ya había terminado o no existe.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancel_event.set()
+            if job.state == TransferJob.QUEUED:
+                self._queue = [entry for entry in self._queue if entry[2] is not job]
+                heapq.heapify(self._queue)
+                queued = True
+            else:
+                queued = False
+            downloader = job.downloader
+
+        if queued:
+            self._finish(job, TransferJob.CANCELLED)
+        elif downloader is not None:
+            # Si ya está en el pool de uploads (o esperando reintento), sale ya
+            downloader.cancel_upload()
+        logger.info(f"🛑 Cancelación pedida para #{job_id}")
+        return True
+
+    def get_job(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = next((done for done in self._finished if done.job_id == job_id), None)
+            return job
+
+    def snapshot(self):
+        """Estado de los trabajos en cola, en marcha y los últimos terminados"""
+        with self._cond:
+            jobs = list(self._jobs.values()) + list(self._finished)
+        return [job.to_dict() for job in sorted(jobs, key=lambda j: (j.finished, j.priority, j.job_id))]
+
+    def clear_finished(self):
+        """Olvida los trabajos terminados"""
+        with self._cond:
+            self._finished.clear()
+
+    # Oyentes
+
+    def add_listener(self, listener):
+        with self._cond:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._cond:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, job, event, value=None):
+        for listener in list(self._listeners):
+            try:
+                listener(job, event, value)
+            except Exception as e:
+                logger.warning(f"⚠️ Error en oyente de transferencias: {str(e)}")
+
+    # Hilos de trabajo
+
+    def _ensure_workers(self):
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f'transfer-{len(self._threads) + 1}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_job(self):
+        """Primer trabajo por prioridad (bloquea)"""
+        with self._cond:
+            while not self._shutdown:
+                if self._queue:
+                    job = heapq.heappop(self._queue)[2]
+                    job.state = TransferJob.RUNNING
+                    job.started_at = time.time()
+                    return job
+                self._cond.wait()
+            return None
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._notify(job, 'started')
+            try:
+                state = self._run(job)  # None: sigue en el pool de uploads
+            except TransferCancelled:
+                state = TransferJob.CANCELLED
+            except Exception as e:
+                job.error = str(e)
+                logger.error(f"❌ Transferencia #{job.job_id} falló: {str(e)}")
+                state = TransferJob.FAILED
+            if state is not None:
+                self._finish(job, state)
+
+    def _run(self, job):
+        downloader = VideoDownloader()
+        downloader.cancel_event = job.cancel_event
+        downloader.defer_upload = job.kind == 'download'
+        job.downloader = downloader
+        self._connect(job, downloader)
+
+        if job.kind == 'download':
+            job.success = downloader.download_video(job.url, job.video_data)
+            if job.success:
+                job.video_path = downloader.downloaded_video_path
+            if downloader.upload_future is not None:
+                downloader.upload_future.add_done_callback(lambda future: self._upload_done(job, future))
+                return None
+        else:
+            job.success = downloader.upload_existing_video(job.video_path, job.video_data)
+
+        return self._result_state(job)
+
+    def _upload_done(self, job, future):
+        """Termina un trabajo de descarga cuando el pool acaba su upload"""
+        job.success = future.result()
+        self._finish(job, self._result_state(job))
+
+    def _result_state(self, job):
+        """Copia el resultado del downloader al trabajo y devuelve su estado final"""
+        downloader = job.downloader
+        job.image_path = downloader.downloaded_image_path
+        job.ftp_image_url = job.video_data.get('ftp_image_url')
+        job.streamwish_filecode = downloader.streamwish_filecode
+
+        if job.cancel_event.is_set():
+            return TransferJob.CANCELLED
+        if not job.success and job.error is None:
+            job.error = job.status or "Error en la transferencia"
+        return TransferJob.DONE if job.success else TransferJob.FAILED
+
+    def _connect(self, job, downloader):
+        """Pasa las señales del downloader del trabajo a los oyentes"""
+        reporter = downloader.progress_reporter
+
+        def on_progress(value):
+            job.progress = value
+            self._notify(job, 'progress', value)
+
+        def on_status(message):
+            job.status = message
+            self._notify(job, 'status', message)
+
+        # Directas: se emiten desde hilos sin bucle de eventos
+        reporter.download_progress.connect(on_progress, Qt.DirectConnection)
+        reporter.upload_progress.connect(lambda value: self._notify(job, 'upload_progress', value),
+                                         Qt.DirectConnection)
+        reporter.download_stats.connect(lambda speed, eta: self._notify(job, 'download_stats', (speed, eta)),
+                                        Qt.DirectConnection)
+        reporter.upload_stats.connect(lambda speed, eta: self._notify(job, 'upload_stats', (speed, eta)),
+                                      Qt.DirectConnection)
+        reporter.status_changed.connect(on_status, Qt.DirectConnection)
+
+    def _finish(self, job, state):
+        job.state = state
+        job.finished_at = time.time()
+        # El resultado ya está copiado en el trabajo: soltar el downloader
+        # (QObject, buffers) para que el historial no lo mantenga vivo
+        job.downloader = None
+        with self._cond:
+            self._jobs.pop(job.job_id, None)
+            self._finished.append(job)
+        job._done.set()
+        icon = {TransferJob.DONE: '✅', TransferJob.CANCELLED: '🛑'}.get(state, '❌')
+        logger.info(f"{icon} Transferencia #{job.job_id} terminada: {state}")
+        self._notify(job, 'finished', state)
+
+    def shutdown(self, wait=True, cancel_running=False):
+        """Detiene los hilos (los trabajos en cola se cancelan)"""
+        with self._cond:
+            self._shutdown = True
+            pending = [entry[2] for entry in self._queue]
+            self._queue = []
+            running = [job for job in self._jobs.values() if job.state == TransferJob.RUNNING]
+            self._cond.notify_all()
+        for job in pending:
+            job.cancel_event.set()
+            self._finish(job, TransferJob.CANCELLED)
+        if cancel_running:
+            for job in running:
+                job.cancel_event.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_transfer_manager():
+    """
+    Devuelve el gestor de transferencias compartido (interfaz y programador)
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = TransferManager()
+                logger.info(f"🚚 Gestor de transferencias: {_manager.workers} hilos")
+    return _manager
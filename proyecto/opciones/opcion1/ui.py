@@ -2,10 +2,9 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                             QPushButton, QScrollArea, QFrame, QGridLayout, QMessageBox,
                             QDialog, QLineEdit, QCheckBox, QDialogButtonBox, QTextEdit,
                             QListWidget, QListWidgetItem)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize, QTimer
+from PyQt5.QtCore import Qt, QThread, QObject, pyqtSignal, QSize, QTimer
 from PyQt5.QtGui import QPixmap, QImage
 
-import requests
 from io import BytesIO
 import time
 import random
@@ -18,10 +17,12 @@ logger = logging.getLogger(__name__)
 
 from opciones.opcion1.scraper import Opcion1Scraper
 from utils.common import normalize_image_url
+from utils.http_client import get_http_client
 
 # Importar downloader de manera segura
 try:
     from opciones.opcion1.downloader import VideoDownloader
+    from opciones.opcion1.transfer_manager import get_transfer_manager, PRIORITY_HIGH
     DOWNLOADER_AVAILABLE = True
 except ImportError:
     DOWNLOADER_AVAILABLE = False
@@ -112,6 +113,15 @@ class StreamWishConfigDialog(QDialog):
         self.delete_after_checkbox.setStyleSheet("color: #d32f2f;")
         layout.addWidget(self.delete_after_checkbox)
         
+        # Limpieza automática cuando falta espacio
+        self.evict_when_full_checkbox = QCheckBox("♻️ Si falta espacio, borrar los videos ya subidos más antiguos")
+        self.evict_when_full_checkbox.setChecked(True)
+        layout.addWidget(self.evict_when_full_checkbox)
+        
+        # Subir mientras se descarga
+        self.pipelined_checkbox = QCheckBox("⚡ Subir mientras se descarga (MP4 directos)")
+        layout.addWidget(self.pipelined_checkbox)
+        
         # Botones
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         button_box.accepted.connect(self.accept)
@@ -140,6 +150,8 @@ class StreamWishConfigDialog(QDialog):
             self.adult_checkbox.setChecked(settings.get('file_adult', 1) == 1)
             self.tags_input.setText(settings.get('tags', 'pornhub, hd, video'))
             self.delete_after_checkbox.setChecked(config.config.get('delete_after_upload', False))
+            self.evict_when_full_checkbox.setChecked(config.is_evict_when_full_enabled())
+            self.pipelined_checkbox.setChecked(config.is_pipelined_upload_enabled())
             
         except Exception as e:
             print(f"Error cargando configuración: {str(e)}")
@@ -154,7 +166,9 @@ class StreamWishConfigDialog(QDialog):
                 'file_adult': 1 if self.adult_checkbox.isChecked() else 0,
                 'tags': self.tags_input.text().strip()
             },
-            'delete_after_upload': self.delete_after_checkbox.isChecked()
+            'delete_after_upload': self.delete_after_checkbox.isChecked(),
+            'evict_when_full': self.evict_when_full_checkbox.isChecked(),
+            'pipelined_upload': self.pipelined_checkbox.isChecked()
         }
 
 class CategorySelectionDialog(QDialog):
@@ -371,7 +385,7 @@ class CategorySelectionDialog(QDialog):
         return self.selected_category
 
 class VideoLoader(QThread):
-    video_loaded = pyqtSignal(dict)
+    video_loaded = pyqtSignal(object)  # VideoRecord
     finished_loading = pyqtSignal()
     
     def __init__(self, scraper, category_url):
@@ -402,30 +416,33 @@ class CategoryLoader(QThread):
         categories = self.scraper.get_categories()
         self.category_loaded.emit(categories)
 
-class DownloadWorker(QThread):
-    """Worker thread para descargar videos sin bloquear la UI"""
-    finished = pyqtSignal(bool)
-    
-    def __init__(self, video_url, video_data, downloader):
-        super().__init__()
-        self.video_url = video_url
-        self.video_data = video_data
-        self.downloader = downloader
-    
-    def run(self):
-        try:
-            success = self.downloader.download_video(self.video_url, self.video_data)
-            self.finished.emit(success)
-        except Exception as e:
-            print(f"❌ Error en worker de descarga: {str(e)}")
-            self.finished.emit(False)
+class TransferSignals(QObject):
+    """
+    Pasa los eventos del gestor de transferencias al hilo de la interfaz
+
+    El gestor avisa desde sus hilos; al emitir una señal de un QObject del
+    hilo principal la llamada queda en cola y los slots corren en la UI.
+    """
+    job_event = pyqtSignal(object, str, object)  # (job, evento, valor)
+
+
+_transfer_signals = None
+
+
+def get_transfer_signals():
+    """Puente único (se crea en el hilo de la interfaz la primera vez)"""
+    global _transfer_signals
+    if _transfer_signals is None:
+        _transfer_signals = TransferSignals()
+        get_transfer_manager().add_listener(_transfer_signals.job_event.emit)
+    return _transfer_signals
 
 class VideoCard(QWidget):
     def __init__(self, video_data):
         super().__init__()
         self.video_data = video_data
         self.is_downloading = False
-        self.download_worker = None
+        self.transfer_job = None
         self.selected_category_for_publish = None
         self.already_published = False  # ✅ NUEVO: Flag para evitar doble publicación
         self.setup_ui()
@@ -569,6 +586,12 @@ class VideoCard(QWidget):
             return
         
         if self.is_downloading:
+            # El botón sirve para cancelar mientras está en cola o descargando
+            if self.transfer_job is not None:
+                self.import_button.setText("Cancelando...")
+                self.import_button.setEnabled(False)
+                # Si aún estaba en cola, el aviso de fin llega aquí mismo
+                get_transfer_manager().cancel(self.transfer_job.job_id)
             return
         
         # ✅ VERIFICAR SI YA SE PUBLICÓ
@@ -612,27 +635,47 @@ class VideoCard(QWidget):
         
         print(f"🚀 Iniciando importación de: {self.video_data['title']}")
         
-        # Cambiar el estado del botón
+        # Cambiar el estado del botón (mientras tanto sirve para cancelar)
         self.is_downloading = True
-        self.import_button.setText("Descargando...")
-        self.import_button.setEnabled(False)
+        self.import_button.setText("En cola · Cancelar")
         
         # Mostrar barra de progreso de descarga
         main_window.show_download_progress(f"⬇️ Descargando: {self.video_data['title'][:30]}...")
         
-        # Crear downloader
-        self.downloader = VideoDownloader()
-        
-        # Conectar señales de progreso
-        self.downloader.progress_reporter.download_progress.connect(main_window.update_download_progress)
-        self.downloader.progress_reporter.upload_progress.connect(main_window.update_upload_progress)
-        self.downloader.progress_reporter.status_changed.connect(self._handle_status_change)
-        self.downloader.progress_reporter.finished.connect(self._handle_download_finished)
+        # Encolar en el gestor compartido: cada trabajo tiene su propio
+        # downloader, así que varias importaciones no se pisan el estado
+        get_transfer_signals().job_event.connect(self._handle_job_event)
+        self.transfer_job = get_transfer_manager().submit_download(
+            self.video_data['url'], self.video_data, priority=PRIORITY_HIGH
+        )
+    
+    def _handle_job_event(self, job, event, value):
+        """Eventos del gestor de transferencias (ya en el hilo de la interfaz)"""
+        if job is not self.transfer_job:
+            return
         
-        # Crear y ejecutar worker thread
-        self.download_worker = DownloadWorker(self.video_data['url'], self.video_data, self.downloader)
-        self.download_worker.finished.connect(self._handle_worker_finished)
-        self.download_worker.start()
+        main_window = self.window()
+        if event == 'started':
+            self.import_button.setText("Descargando · Cancelar")
+        elif event == 'progress':
+            main_window.update_download_progress(value)
+        elif event == 'upload_progress':
+            main_window.update_upload_progress(value)
+        elif event == 'download_stats':
+            main_window.update_download_stats(*value)
+        elif event == 'upload_stats':
+            main_window.update_upload_stats(*value)
+        elif event == 'status':
+            self._handle_status_change(value)
+        elif event == 'finished':
+            get_transfer_signals().job_event.disconnect(self._handle_job_event)
+            success = value == job.DONE
+            if value == job.CANCELLED:
+                main_window.update_progress_status("🛑 Importación cancelada")
+                main_window.hide_progress()
+            else:
+                self._handle_download_finished(success)
+            self._handle_worker_finished(success)
     
     def _handle_status_change(self, status_text):
         """Maneja cambios de estado"""
@@ -678,23 +721,13 @@ class VideoCard(QWidget):
             main_window.update_progress_status("📝 Publicando en WordPress...")
             
             # Obtener código de StreamWish si existe
-            streamwish_code = None
-            if hasattr(self.downloader, 'streamwish_uploader') and self.downloader.streamwish_uploader:
-                streamwish_code = self._extract_streamwish_code()
+            streamwish_code = self._extract_streamwish_code()
             
             # NUEVO: Obtener y subir imagen por FTP
             ftp_image_url = None
-            if hasattr(self.downloader, 'downloaded_image_path') and self.downloader.downloaded_image_path:
-                main_window.update_progress_status("📤 Subiendo imagen por FTP...")
-                
-                # Generar un post_id temporal para el nombre del archivo
-                import time
-                temp_post_id = int(time.time())
-                
-                ftp_image_url = self.downloader.get_image_ftp_url(
-                    self.video_data.get('title', 'video'), 
-                    temp_post_id
-                )
+            if self.transfer_job.image_path:
+                # La imagen ya se subió por FTP durante la descarga
+                ftp_image_url = self.transfer_job.ftp_image_url
                 
                 if ftp_image_url:
                     # Actualizar video_data con la URL del FTP
@@ -745,7 +778,10 @@ class VideoCard(QWidget):
                 main_window.update_progress_status(f"✅ Publicado en WordPress! Post ID: {result['post_id']}")
                 
                 # ACTUALIZAR: Mostrar información de archivos descargados
-                downloaded_paths = self.downloader.get_downloaded_paths()
+                downloaded_paths = {
+                    'video_path': self.transfer_job.video_path,
+                    'image_path': self.transfer_job.image_path
+                }
                 
                 # Mostrar mensaje de éxito mejorado
                 success_msg = (
@@ -821,14 +857,10 @@ class VideoCard(QWidget):
     def _extract_streamwish_code(self):
         """Extrae el código de StreamWish del resultado del upload"""
         try:
-            # Usar el nuevo método del uploader
-            if (hasattr(self.downloader, 'streamwish_uploader') and 
-                self.downloader.streamwish_uploader):
-                
-                code = self.downloader.streamwish_uploader.get_last_filecode()
-                if code:
-                    print(f"✅ Código de StreamWish obtenido: {code}")
-                    return code
+            # Código guardado por el trabajo (propio de esta importación)
+            if self.transfer_job is not None and self.transfer_job.streamwish_filecode:
+                print(f"✅ Código de StreamWish obtenido: {self.transfer_job.streamwish_filecode}")
+                return self.transfer_job.streamwish_filecode
             
             print("⚠️ No se pudo obtener código de StreamWish")
             return None
@@ -838,8 +870,9 @@ class VideoCard(QWidget):
             return None
     
     def _handle_worker_finished(self, success):
-        """Maneja finalización del worker thread"""
+        """Maneja finalización del trabajo en la cola"""
         self.is_downloading = False
+        self.transfer_job = None
         
         if success:
             self.import_button.setText("✅ Completado")
@@ -906,7 +939,7 @@ class VideoCard(QWidget):
                 'Referer': 'https://es.pornhub.com/'
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = get_http_client().get(url, headers=headers, timeout=10)
             if response.status_code == 200:
                 image = QImage()
                 if image.loadFromData(response.content):
@@ -1080,6 +1113,9 @@ class Opcion1Widget(QWidget):
                 # Configurar delete_after_upload por separado
                 if config['delete_after_upload']:
                     downloader.streamwish_config.set_delete_after_upload(True)
+                downloader.streamwish_config.set_pipelined_upload(config['pipelined_upload'])
+                downloader.streamwish_config.set_evict_when_full(config['evict_when_full'])
+                downloader.storage.evict_uploaded = config['evict_when_full']
                 
                 success = downloader.configure_streamwish(
                     config['api_key'],
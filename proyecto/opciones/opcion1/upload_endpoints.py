@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+
+from .config import DownloadConfig
+
+logger = logging.getLogger('UploadEndpoints')
+
+
+class UploadEndpoint:
+    """Un servidor de upload y su salud reciente"""
+    __slots__ = ('url', 'fetched_at', 'uploads', 'failures', 'consecutive_failures',
+                 'error_rate', 'seconds_per_mb', 'retired_at', 'last_error')
+
+    def __init__(self, url):
+        self.url = url
+        self.fetched_at = time.time()
+        self.uploads = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.error_rate = 0.0        # Media móvil: 1 = todos fallan
+        self.seconds_per_mb = None   # Media móvil del tiempo de subida por MB
+        self.retired_at = None
+        self.last_error = None
+
+    @property
+    def retired(self):
+        return self.retired_at is not None
+
+    @property
+    def stale(self):
+        return time.time() - self.fetched_at > DownloadConfig.UPLOAD_SERVER_TTL
+
+    @property
+    def score(self):
+        """Mayor es mejor: pocos errores y subida rápida (sin datos cuenta como bueno)"""
+        speed = 1.0 / (1.0 + self.seconds_per_mb) if self.seconds_per_mb is not None else 1.0
+        return (1.0 - self.error_rate) * speed
+
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'uploads': self.uploads,
+            'failures': self.failures,
+            'error_rate': round(self.error_rate, 3),
+            'seconds_per_mb': round(self.seconds_per_mb, 3) if self.seconds_per_mb is not None else None,
+            'retired': self.retired,
+            'last_error': self.last_error,
+        }
+
+
+class UploadEndpointRegistry:
+    """
+    Servidores de upload compartidos por todos los StreamWishUploader
+
+    La API devuelve un servidor por consulta; aquí se guardan los obtenidos
+    (por API key) con su salud: media de errores y de tiempo por MB de los
+    últimos uploads. acquire() da el mejor servidor vigente y pide uno
+    nuevo cuando el mejor ha caducado (UPLOAD_SERVER_TTL), cuando se pide refresh (tras
+    un fallo) o cuando no queda ninguno sano. Tras UPLOAD_SERVER_MAX_FAILURES
+    fallos seguidos un servidor se retira.
+    """
+
+    def __init__(self):
+        self._endpoints = {}   # api_key -> [UploadEndpoint]
+        self._lock = threading.RLock()
+        self._fetch_locks = {}
+
+    def add(self, api_key, url):
+        """Registra un servidor recién obtenido de la API"""
+        with self._lock:
+            endpoints = self._endpoints.setdefault(api_key, [])
+            for endpoint in endpoints:
+                if endpoint.url == url:
+                    endpoint.fetched_at = time.time()
+                    if endpoint.retired and time.time() - endpoint.retired_at > DownloadConfig.UPLOAD_SERVER_RETRY_AFTER:
+                        logger.info(f"🔁 Servidor de upload rehabilitado: {url}")
+                        endpoint.retired_at = None
+                        endpoint.consecutive_failures = 0
+                    return endpoint
+
+            endpoint = UploadEndpoint(url)
+            endpoints.append(endpoint)
+            # Olvidar primero los retirados y después los peores
+            if len(endpoints) > DownloadConfig.UPLOAD_SERVER_MAX_KNOWN:
+                endpoints.sort(key=lambda e: (not e.retired, e.score, e.fetched_at), reverse=True)
+                del endpoints[DownloadConfig.UPLOAD_SERVER_MAX_KNOWN:]
+            return endpoint
+
+    def _best(self, api_key, skip_failing=False):
+        healthy = [e for e in self._endpoints.get(api_key, [])
+                   if not e.retired and not (skip_failing and e.consecutive_failures)]
+        return max(healthy, key=lambda e: (e.score, e.fetched_at)) if healthy else None
+
+    def acquire(self, api_key, fetch_server, refresh=False):
+        """
+        Devuelve el servidor a usar (o None si no hay ninguno)
+
+        Args:
+            fetch_server: función sin argumentos que consulta la API y
+                devuelve una URL (o None)
+            refresh: pedir un servidor nuevo aunque haya uno vigente
+        """
+        with self._lock:
+            best = self._best(api_key)
+            if best is not None and not best.stale and not refresh:
+                return best
+            fetch_lock = self._fetch_locks.setdefault(api_key, threading.Lock())
+
+        # Una sola consulta a la API a la vez por key; los demás usan su resultado
+        with fetch_lock:
+            with self._lock:
+                current = self._best(api_key)
+                if current is not None and current is not best and not current.stale:
+                    return current
+
+            url = fetch_server()
+            with self._lock:
+                if url:
+                    fetched = self.add(api_key, url)
+                    if fetched.retired:
+                        # La API insiste en un servidor retirado: mejor uno sano si lo hay
+                        return self._best(api_key) or fetched
+                    best = self._best(api_key)
+                    if refresh and fetched.consecutive_failures == 0:
+                        return fetched
+                    if refresh:
+                        # La API devolvió un servidor que acaba de fallar: otro sin fallos
+                        # recientes aunque puntúe menos (sin medidas de velocidad puntúa alto)
+                        return self._best(api_key, skip_failing=True) or best or fetched
+                    return best or fetched
+                # Sin respuesta de la API: seguir con lo que haya
+                return self._best(api_key)
+
+    def report_success(self, endpoint, nbytes, seconds):
+        with self._lock:
+            smoothing = DownloadConfig.UPLOAD_HEALTH_SMOOTHING
+            endpoint.uploads += 1
+            endpoint.consecutive_failures = 0
+            endpoint.error_rate = (1 - smoothing) * endpoint.error_rate
+            if nbytes:
+                per_mb = seconds / (nbytes / (1024 * 1024))
+                if endpoint.seconds_per_mb is None:
+                    endpoint.seconds_per_mb = per_mb
+                else:
+                    endpoint.seconds_per_mb = smoothing * per_mb + (1 - smoothing) * endpoint.seconds_per_mb
+
+    def report_failure(self, endpoint, error):
+        with self._lock:
+            smoothing = DownloadConfig.UPLOAD_HEALTH_SMOOTHING
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            endpoint.error_rate = smoothing + (1 - smoothing) * endpoint.error_rate
+            endpoint.last_error = str(error)[:200]
+            if endpoint.consecutive_failures >= DownloadConfig.UPLOAD_SERVER_MAX_FAILURES and not endpoint.retired:
+                endpoint.retired_at = time.time()
+                logger.warning(f"🚫 Servidor de upload retirado tras {endpoint.consecutive_failures} fallos: "
+                               f"{endpoint.url}")
+
+    def snapshot(self, api_key):
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self._endpoints.get(api_key, [])]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_upload_endpoints():
+    """
+    Devuelve el registro de servidores de upload compartido
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = UploadEndpointRegistry()
+    return _registry
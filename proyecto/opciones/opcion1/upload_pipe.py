@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import uuid
+
+from .config import DownloadConfig
+
+logger = logging.getLogger('UploadPipe')
+
+
+class PipeAborted(Exception):
+    """La descarga que alimentaba el upload falló o empezó de nuevo"""
+
+
+def _chunk_buffer(chunk_size):
+    """
+    Buffer único para leer con readinto
+
+    Cada trozo entregado es una vista de este buffer y solo vale hasta pedir
+    el siguiente. Sirve para cuerpos de requests: http.client termina de
+    enviar un trozo por el socket antes de pedir el siguiente al iterable.
+    """
+    return memoryview(bytearray(chunk_size))
+
+
+class FileChunks:
+    """
+    Un archivo completo en trozos grandes, leídos sin copias
+
+    La memoria usada es un trozo (UPLOAD_CHUNK_SIZE) sea cual sea el tamaño
+    del archivo.
+    """
+
+    def __init__(self, path, chunk_size=None):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.chunk_size = chunk_size or DownloadConfig.UPLOAD_CHUNK_SIZE
+
+    def __iter__(self):
+        view = _chunk_buffer(self.chunk_size)
+        with open(self.path, 'rb', buffering=0) as source:
+            while True:
+                count = source.readinto(view)
+                if not count:
+                    return
+                yield view[:count]
+
+
+class GrowingFile:
+    """
+    Lectura en orden de un archivo que se está descargando
+
+    El descargador avisa con written(inicio, fin) de cada trozo ya escrito
+    (pueden llegar desordenados si hay varias conexiones). Al iterar se
+    entregan los bytes del prefijo contiguo, esperando a que crezca. Lo
+    pendiente de subir está en disco, no en memoria: la memoria usada es un
+    trozo aunque el upload vaya muy por detrás de la descarga.
+    """
+
+    def __init__(self, path, size, chunk_size=None):
+        self.path = path
+        self.size = size
+        self.chunk_size = chunk_size or DownloadConfig.UPLOAD_CHUNK_SIZE
+        self.available = 0  # Bytes contiguos desde el principio
+        self._pending = []  # Rangos escritos más allá de available
+        self._error = None
+        self._cond = threading.Condition()
+
+    def written(self, start, end):
+        """Marca los bytes start..end (inclusive) como escritos en disco"""
+        with self._cond:
+            if self._error is not None:
+                return
+            self._pending.append((start, end))
+            self._pending.sort()
+            advanced = False
+            while self._pending and self._pending[0][0] <= self.available:
+                range_start, range_end = self._pending.pop(0)
+                if range_end + 1 > self.available:
+                    self.available = range_end + 1
+                    advanced = True
+            if advanced:
+                self._cond.notify_all()
+
+    def fail(self, error):
+        """Interrumpe la lectura (el upload terminará con PipeAborted)"""
+        with self._cond:
+            if self._error is None:
+                self._error = error
+            self._cond.notify_all()
+
+    def __iter__(self):
+        position = 0
+        source = None
+        view = _chunk_buffer(self.chunk_size)
+        try:
+            while position < self.size:
+                with self._cond:
+                    while self.available <= position and self._error is None:
+                        self._cond.wait()
+                    if self._error is not None:
+                        raise PipeAborted(str(self._error))
+                    ready = self.available - position
+
+                if source is None:
+                    source = open(self.path, 'rb', buffering=0)
+                count = source.readinto(view[:min(ready, self.chunk_size)])
+                if not count:
+                    raise PipeAborted(f"Archivo más corto de lo anunciado en el byte {position}")
+                position += count
+                yield view[:count]
+        finally:
+            if source is not None:
+                source.close()
+
+
+class StreamingMultipartBody:
+    """
+    Cuerpo multipart/form-data con un único archivo que se genera al enviarlo
+
+    requests envía como stream cualquier iterable; como además tiene
+    __len__, manda Content-Length en lugar de chunked (el servidor de upload
+    necesita conocer el tamaño). Nada se acumula en memoria: los trozos de
+    chunks (FileChunks o GrowingFile) se envían según se leen.
+
+    progress es un ProgressAggregator opcional. Se actualiza cuando se pide
+    el trozo siguiente, es decir, cuando el anterior ya se escribió en el
+    socket: mide el envío real y no la lectura del archivo.
+    """
+
+    def __init__(self, fields, file_field, filename, content_type, chunks, size, progress=None):
+        self.boundary = uuid.uuid4().hex
+        self.chunks = chunks
+        self.size = size
+        self.progress = progress
+
+        parts = []
+        for name, value in fields.items():
+            if value is None:
+                continue
+            parts.append(f'--{self.boundary}\r\n'
+                         f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                         f'{value}\r\n')
+        safe_filename = filename.replace('"', '%22').replace('\r', ' ').replace('\n', ' ')
+        parts.append(f'--{self.boundary}\r\n'
+                     f'Content-Disposition: form-data; name="{file_field}"; filename="{safe_filename}"\r\n'
+                     f'Content-Type: {content_type}\r\n\r\n')
+        self._head = ''.join(parts).encode('utf-8')
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self):
+        return len(self._head) + self.size + len(self._tail)
+
+    def __iter__(self):
+        yield self._head
+        sent = 0
+        for chunk in self.chunks:
+            if sent + len(chunk) > self.size:
+                raise PipeAborted("El archivo supera el tamaño anunciado")
+            yield chunk
+            # Al volver aquí el trozo ya salió por el socket
+            sent += len(chunk)
+            if self.progress is not None:
+                self.progress.update(sent, self.size)
+        if sent != self.size:
+            raise PipeAborted(f"Faltan datos: {sent} de {self.size} bytes")
+        yield self._tail
@@ -0,0 +1,291 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from PyQt5.QtCore import Qt
+
+from .config import DownloadConfig
+from .config_streamwish import StreamWishConfig
+from .streamwish_uploader import StreamWishUploader
+
+logger = logging.getLogger('UploadPool')
+
+
+class UploadResult:
+    """Resultado de un upload del pool (el Future nunca lanza: mirar success)"""
+    __slots__ = ('success', 'filecode', 'response', 'attempts', 'error', 'retryable')
+
+    def __init__(self, success, filecode=None, response=None, attempts=0, error=None, retryable=False):
+        self.success = success
+        self.filecode = filecode
+        self.response = response    # dict de la API de StreamWish (o None)
+        self.attempts = attempts
+        self.error = error
+        self.retryable = retryable  # Fallo de red o 5xx (los demás no mejoran reintentando)
+
+
+class UploadTask:
+    """Un archivo esperando (o reintentando) su upload"""
+    __slots__ = ('task_id', 'video_path', 'video_data', 'api_key', 'custom_config',
+                 'progress_reporter', 'cancel_event', 'future', 'attempts', 'not_before', 'cancel_requested')
+
+    def __init__(self, task_id, video_path, video_data, api_key, custom_config,
+                 progress_reporter, cancel_event):
+        self.task_id = task_id
+        self.video_path = str(video_path)
+        self.video_data = video_data
+        self.api_key = api_key
+        self.custom_config = custom_config
+        self.progress_reporter = progress_reporter
+        self.cancel_event = cancel_event
+        self.future = Future()
+        self.attempts = 0
+        self.not_before = 0.0   # Reintento: no empezar antes de este instante (monotonic)
+        self.cancel_requested = False
+
+    @property
+    def cancelled(self):
+        return (self.cancel_requested or self.future.cancelled() or
+                (self.cancel_event is not None and self.cancel_event.is_set()))
+
+
+class UploadPool:
+    """
+    Pool de uploads a StreamWish
+
+    Acepta archivos terminados de cualquier origen (auto-upload tras la
+    descarga, upload_existing_video, lotes) y sube hasta UPLOAD_WORKERS a la
+    vez, con un máximo de UPLOAD_MAX_PER_KEY por API key. submit() devuelve
+    un Future con un UploadResult. Un upload fallido por la red o por un 5xx
+    vuelve a la cola con espera creciente (UPLOAD_RETRY_DELAY, el doble cada
+    vez) sin ocupar hilo mientras espera; los demás fallos (4xx, API key,
+    archivo rechazado) se devuelven enseguida, sin volver a enviar el archivo.
+    """
+
+    def __init__(self, workers=None, max_per_key=None):
+        self.workers = workers or DownloadConfig.UPLOAD_WORKERS
+        self.max_per_key = max_per_key or DownloadConfig.UPLOAD_MAX_PER_KEY
+        self._queue = []   # UploadTask en orden de llegada
+        self._active = []  # UploadTask subiéndose ahora
+        self._running_per_key = {}
+        self._threads = []
+        self._sequence = itertools.count(1)
+        self._cond = threading.Condition()
+        self._shutdown = False
+
+    def submit(self, video_path, video_data=None, api_key=None, custom_config=None,
+               progress_reporter=None, cancel_event=None):
+        """
+        Encola el upload de un archivo
+
+        Args:
+            api_key: clave de StreamWish (por defecto la configurada)
+            custom_config: ajustes de upload (carpeta, público...)
+            progress_reporter: objeto con señales upload_progress, upload_stats
+                y status_changed donde se reenvía el progreso
+            cancel_event: si se activa, el upload no empieza ni se reintenta
+
+        Returns:
+            concurrent.futures.Future con un UploadResult
+        """
+        if api_key is None:
+            api_key = StreamWishConfig().get_api_key()
+
+        task = UploadTask(next(self._sequence), video_path, video_data, api_key, custom_config,
+                          progress_reporter, cancel_event)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("El pool de uploads está detenido")
+            self._queue.append(task)
+            self._ensure_workers()
+            self._cond.notify_all()
+        logger.info(f"📤 Upload en cola #{task.task_id}: {os.path.basename(task.video_path)}")
+        return task.future
+
+    def pending(self):
+        """Uploads en cola o esperando reintento"""
+        with self._cond:
+            return len(self._queue)
+
+    def cancel(self, future):
+        """
+        Cancela el upload de un Future de submit()
+
+        Si está en cola o esperando reintento sale ya de la cola y el Future
+        termina con "Cancelado"; si está subiendo, no se reintentará. Hay que
+        usarlo (y no solo activar cancel_event) para despertar a los hilos.
+        Devuelve False si ya había terminado.
+        """
+        with self._cond:
+            if future.done():
+                return False
+            queued = next((task for task in self._queue if task.future is future), None)
+            if queued is not None:
+                self._queue.remove(queued)
+            for task in self._active:
+                if task.future is future:
+                    task.cancel_requested = True
+            self._cond.notify_all()
+        if queued is not None:
+            self._resolve(queued, UploadResult(False, attempts=queued.attempts, error="Cancelado"))
+        logger.info("🛑 Upload cancelado")
+        return True
+
+    # Hilos de trabajo
+
+    def _ensure_workers(self):
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f'upload-{len(self._threads) + 1}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_task(self):
+        """Primer upload listo cuya API key no está al máximo (bloquea)"""
+        while True:
+            task, cancelled = self._take_task()
+            # Fuera del lock: los callbacks del Future (registro, señales) hacen I/O
+            for cancelled_task in cancelled:
+                self._resolve(cancelled_task, UploadResult(False, attempts=cancelled_task.attempts,
+                                                           error="Cancelado"))
+            if task is not None or not cancelled:
+                return task
+
+    def _take_task(self):
+        """
+        Saca de la cola el siguiente upload listo, esperando si no hay ninguno
+
+        Returns:
+            tuple: (UploadTask o None si el pool se detuvo, tareas canceladas
+            que se quitaron de la cola y hay que resolver)
+        """
+        cancelled = []
+        with self._cond:
+            while not self._shutdown:
+                now = time.monotonic()
+                wake_at = None
+                for task in list(self._queue):
+                    if task.cancelled:
+                        self._queue.remove(task)
+                        cancelled.append(task)
+                        continue
+                    if task.not_before > now:
+                        wake_at = task.not_before if wake_at is None else min(wake_at, task.not_before)
+                        continue
+                    if self._running_per_key.get(task.api_key, 0) < self.max_per_key:
+                        self._queue.remove(task)
+                        self._active.append(task)
+                        self._running_per_key[task.api_key] = self._running_per_key.get(task.api_key, 0) + 1
+                        return task, cancelled
+                if cancelled:
+                    return None, cancelled
+                self._cond.wait(None if wake_at is None else max(wake_at - now, 0.05))
+            return None, cancelled
+
+    def _worker(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            if task.attempts == 0 and not task.future.set_running_or_notify_cancel():
+                self._release(task)
+                continue
+            try:
+                result = self._upload(task)
+            except Exception as e:
+                logger.error(f"❌ Upload #{task.task_id} falló: {str(e)}")
+                result = UploadResult(False, attempts=task.attempts, error=str(e))
+            self._release(task)
+
+            if result.success or not self._retry(task, result):
+                self._resolve(task, result)
+
+    def _upload(self, task):
+        task.attempts += 1
+        if not os.path.exists(task.video_path):
+            return UploadResult(False, attempts=task.attempts, error=f"Archivo no encontrado: {task.video_path}")
+
+        uploader = StreamWishUploader(task.api_key)
+        target = task.progress_reporter
+        if target is not None:
+            # Directas: se emiten desde hilos sin bucle de eventos
+            reporter = uploader.progress_reporter
+            reporter.upload_progress.connect(target.upload_progress.emit, Qt.DirectConnection)
+            reporter.upload_stats.connect(target.upload_stats.emit, Qt.DirectConnection)
+            reporter.status_changed.connect(target.status_changed.emit, Qt.DirectConnection)
+
+        response = uploader.upload_video(task.video_path, task.video_data, task.custom_config)
+        if response and response.get('status') == 200:
+            files = response.get('files') or []
+            filecode = files[0].get('filecode') if files else None
+            return UploadResult(True, filecode=filecode, response=response, attempts=task.attempts)
+        # Con respuesta de la API el servidor rechazó el archivo: no se reintenta
+        return UploadResult(False, response=response, attempts=task.attempts,
+                            error=(response or {}).get('msg') or "Upload fallido",
+                            retryable=response is None and uploader.last_error_retryable)
+
+    def _retry(self, task, result):
+        """Vuelve a encolar un upload fallido por la red o un 5xx si le quedan intentos"""
+        if not result.retryable:
+            return False
+        if task.cancelled or task.attempts > DownloadConfig.UPLOAD_RETRIES or not os.path.exists(task.video_path):
+            return False
+        delay = DownloadConfig.UPLOAD_RETRY_DELAY * 2 ** (task.attempts - 1)
+        logger.warning(f"⚠️ Upload #{task.task_id} falló ({result.error}); "
+                       f"reintento {task.attempts}/{DownloadConfig.UPLOAD_RETRIES} en {delay:.0f}s")
+        if task.progress_reporter is not None:
+            task.progress_reporter.status_changed.emit(f"⏳ Upload fallido, reintento en {delay:.0f}s...")
+        with self._cond:
+            if self._shutdown:
+                return False
+            task.not_before = time.monotonic() + delay
+            self._queue.append(task)
+            self._cond.notify_all()
+        return True
+
+    def _release(self, task):
+        with self._cond:
+            self._active.remove(task)
+            self._running_per_key[task.api_key] -= 1
+            self._cond.notify_all()
+
+    @staticmethod
+    def _resolve(task, result):
+        if task.future.done():
+            return
+        if task.attempts == 0 and not task.future.set_running_or_notify_cancel():
+            return
+        task.future.set_result(result)
+
+    def shutdown(self, wait=True):
+        """Detiene los hilos (los uploads en cola terminan como fallidos)"""
+        with self._cond:
+            self._shutdown = True
+            pending = self._queue
+            self._queue = []
+            self._cond.notify_all()
+        for task in pending:
+            self._resolve(task, UploadResult(False, attempts=task.attempts, error="Pool detenido"))
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_upload_pool():
+    """
+    Devuelve el pool de uploads compartido
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = UploadPool()
+                logger.info(f"📤 Pool de uploads: {_pool.workers} hilos, {_pool.max_per_key} por API key")
+    return _pool
@@ -0,0 +1,376 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .config import DownloadConfig
+
+logger = logging.getLogger('VideoStore')
+
+_SAFE_ID_RE = re.compile(r'[A-Za-z0-9_-]{1,40}')
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+_COLUMNS = ('video_id', 'title', 'source_url', 'path', 'size', 'sha256', 'image_path',
+            'image_url', 'upload_status', 'filecode', 'created_at', 'updated_at', 'last_used_at')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT,
+    source_url TEXT,
+    path TEXT,
+    size INTEGER,
+    sha256 TEXT,
+    image_path TEXT,
+    image_url TEXT,
+    upload_status TEXT NOT NULL DEFAULT 'pending',
+    filecode TEXT,
+    created_at REAL,
+    updated_at REAL,
+    last_used_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_sha256 ON videos (sha256);
+"""
+
+# Columnas añadidas después de la primera versión del índice
+_MIGRATIONS = {
+    'last_used_at': "ALTER TABLE videos ADD COLUMN last_used_at REAL",
+}
+
+
+class StoredVideo:
+    """Un video del almacén local (una fila del índice)"""
+    __slots__ = _COLUMNS
+
+    PENDING = 'pending'
+    UPLOADED = 'uploaded'
+    FAILED = 'failed'
+
+    def __init__(self, video_id, title=None, source_url=None, path=None, size=None, sha256=None,
+                 image_path=None, image_url=None, upload_status=PENDING, filecode=None,
+                 created_at=None, updated_at=None, last_used_at=None):
+        self.video_id = video_id
+        self.title = title
+        self.source_url = source_url
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.image_path = image_path
+        self.image_url = image_url
+        self.upload_status = upload_status
+        self.filecode = filecode
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.last_used_at = last_used_at
+
+    @property
+    def is_local(self):
+        """El archivo está en disco (según el índice)"""
+        return self.path is not None
+
+    @property
+    def is_uploaded(self):
+        return self.upload_status == self.UPLOADED and bool(self.filecode)
+
+    @property
+    def reusable(self):
+        """No hace falta volver a descargarlo: está en disco o ya subido"""
+        return self.is_local or self.is_uploaded
+
+    def as_row(self):
+        return tuple(getattr(self, column) for column in _COLUMNS)
+
+
+def file_sha256(path):
+    """SHA-256 de un archivo leyendo por bloques"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class VideoStore:
+    """
+    Índice de los videos descargados por ID de origen (viewkey)
+
+    Se guarda en SQLite y se carga entero en memoria al arrancar: las
+    consultas (¿ya lo tengo?, ¿ya está subido?) son búsquedas en un dict,
+    sin tocar el disco ni la red. Al cargar se comprueba una vez que los
+    archivos siguen existiendo; los que faltan quedan como no locales pero
+    conservan su estado de upload.
+
+    Los archivos se nombran titulo-limpio-ID, así que dos videos con el mismo
+    título no chocan y el mismo video con otro título se reconoce por su ID.
+    Además se guarda el SHA-256: si llega con otro ID un contenido que ya
+    está en disco, se reutiliza el archivo existente. Varios registros pueden
+    entonces compartir ruta: el archivo solo se puede borrar cuando todos
+    están subidos, y al borrarlo se actualizan todos.
+    """
+
+    def __init__(self, db_file=None):
+        self.db_file = Path(db_file or DownloadConfig.VIDEO_STORE_FILE)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._videos = {}    # video_id -> StoredVideo
+        self._by_hash = {}   # sha256 -> video_id
+        self._by_path = {}   # ruta -> {video_id} (varios si comparten archivo)
+
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._load()
+
+    def _migrate(self):
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(videos)")}
+        with self._conn:
+            for column, statement in _MIGRATIONS.items():
+                if column not in existing:
+                    self._conn.execute(statement)
+
+    def _load(self):
+        try:
+            rows = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM videos").fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"❌ Error leyendo el índice de videos: {str(e)}")
+            return
+
+        missing = []
+        for row in rows:
+            video = StoredVideo(*row)
+            if video.path and not os.path.exists(video.path):
+                video.path = None
+                missing.append(video)
+            self._index(video)
+
+        for video in missing:
+            self._write(video)
+        logger.info(f"🗃️ Almacén de videos: {len(self._videos)} registrados "
+                    f"({sum(1 for v in self._videos.values() if v.is_local)} en disco)")
+
+    def _index(self, video):
+        self._videos[video.video_id] = video
+        if video.sha256 and video.is_local:
+            self._by_hash[video.sha256] = video.video_id
+        if video.path:
+            self._by_path.setdefault(os.path.abspath(video.path), set()).add(video.video_id)
+
+    def _unindex_path(self, video):
+        if video.path:
+            key = os.path.abspath(video.path)
+            ids = self._by_path.get(key)
+            if ids is not None:
+                ids.discard(video.video_id)
+                if not ids:
+                    del self._by_path[key]
+        if video.sha256 and self._by_hash.get(video.sha256) == video.video_id:
+            self._by_hash.pop(video.sha256, None)
+
+    def _write(self, video):
+        video.updated_at = time.time()
+        placeholders = ', '.join('?' for _ in _COLUMNS)
+        try:
+            with self._conn:
+                self._conn.execute(f"INSERT OR REPLACE INTO videos ({', '.join(_COLUMNS)}) "
+                                   f"VALUES ({placeholders})", video.as_row())
+        except sqlite3.Error as e:
+            logger.error(f"❌ Error guardando {video.video_id} en el índice: {str(e)}")
+
+    # Consultas (solo memoria)
+
+    def get(self, video_id):
+        if not video_id:
+            return None
+        with self._lock:
+            return self._videos.get(video_id)
+
+    def contains(self, video_id):
+        """El video ya se descargó o se subió (no hay que volver a bajarlo)"""
+        video = self.get(video_id)
+        return video is not None and video.reusable
+
+    def _sharing(self, path):
+        """Registros que apuntan al mismo archivo"""
+        ids = self._by_path.get(os.path.abspath(str(path)), ())
+        return [self._videos[video_id] for video_id in sorted(ids)]
+
+    def find_by_path(self, path):
+        """Registro de un archivo (el subido, si varios lo comparten)"""
+        with self._lock:
+            videos = self._sharing(path)
+            return next((video for video in videos if video.is_uploaded), videos[0] if videos else None)
+
+    def videos(self):
+        with self._lock:
+            return list(self._videos.values())
+
+    def path_for(self, folder, clean_title, video_id, extension='.mp4'):
+        """
+        Ruta local de un video: titulo-limpio-ID (solo título si no hay ID)
+
+        Si el ID no es un token corto (p. ej. es la URL entera) se usa un
+        resumen suyo.
+        """
+        if not video_id:
+            return Path(folder) / f"{clean_title}{extension}"
+        suffix = video_id if _SAFE_ID_RE.fullmatch(video_id) else hashlib.sha1(video_id.encode('utf-8')).hexdigest()[:12]
+        return Path(folder) / f"{clean_title}-{suffix}{extension}"
+
+    # Cambios
+
+    def add(self, video_id, path, title=None, source_url=None, image_path=None, image_url=None):
+        """
+        Registra un archivo recién descargado (calcula tamaño y SHA-256)
+
+        Si el mismo contenido ya está en disco con otro ID, se borra la copia
+        nueva y el registro apunta al archivo existente. Si el archivo ya no
+        está (borrado tras subirlo) se registra sin copia local.
+
+        Returns:
+            StoredVideo
+        """
+        path = str(path)
+        if not video_id:
+            return StoredVideo(None, title=title, source_url=source_url, path=path,
+                               image_path=image_path, image_url=image_url)
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+            sha256 = file_sha256(path)
+        else:
+            path, size, sha256 = None, None, None
+
+        with self._lock:
+            duplicate_id = self._by_hash.get(sha256) if sha256 else None
+            duplicate = self._videos.get(duplicate_id) if duplicate_id not in (None, video_id) else None
+            if duplicate is not None and duplicate.is_local and duplicate.path != path:
+                logger.info(f"♻️ Mismo contenido que {duplicate_id}: se reutiliza {os.path.basename(duplicate.path)}")
+                try:
+                    os.unlink(path)
+                    path = duplicate.path
+                except OSError as e:
+                    logger.warning(f"⚠️ No se pudo borrar la copia duplicada: {str(e)}")
+
+            video = self._videos.get(video_id)
+            if video is None:
+                video = StoredVideo(video_id, created_at=time.time())
+            else:
+                self._unindex_path(video)
+            video.path = path
+            video.size = size if size is not None else video.size
+            video.sha256 = sha256 or video.sha256
+            video.title = title or video.title
+            video.source_url = source_url or video.source_url
+            video.image_path = image_path or video.image_path
+            video.image_url = image_url or video.image_url
+            video.last_used_at = time.time()
+            self._index(video)
+            self._write(video)
+
+        if path:
+            logger.info(f"🗃️ Registrado {video_id}: {os.path.basename(path)} ({size / (1024*1024):.1f} MB)")
+        else:
+            logger.info(f"🗃️ Registrado {video_id} sin copia local")
+        return video
+
+    def mark_uploaded(self, video_id, filecode):
+        """Guarda el código de StreamWish (y si el archivo se borró tras subirlo)"""
+        with self._lock:
+            video = self._videos.get(video_id)
+            if video is None:
+                return None
+            video.upload_status = StoredVideo.UPLOADED
+            video.filecode = filecode
+            if video.path and not os.path.exists(video.path):
+                self._clear_path(video.path)
+            else:
+                self._write(video)
+            return video
+
+    def mark_upload_failed(self, video_id):
+        with self._lock:
+            video = self._videos.get(video_id)
+            if video is None or video.is_uploaded:
+                return None
+            video.upload_status = StoredVideo.FAILED
+            self._write(video)
+            return video
+
+    def touch(self, video_id):
+        """Marca el video como usado ahora (orden LRU de la limpieza)"""
+        with self._lock:
+            video = self._videos.get(video_id)
+            if video is None:
+                return
+            video.last_used_at = time.time()
+            self._write(video)
+
+    def _clear_path(self, path):
+        """Quita la copia local de todos los registros que comparten path. Llamar con el lock"""
+        for video in self._sharing(path):
+            self._unindex_path(video)
+            video.path = None
+            self._write(video)
+
+    def mark_evicted(self, video_id):
+        """
+        El archivo local se borró (los registros y su upload se conservan)
+
+        También quedan sin copia local los demás registros de ese archivo.
+        """
+        with self._lock:
+            video = self._videos.get(video_id)
+            if video is None or not video.is_local:
+                return None
+            self._clear_path(video.path)
+            return video
+
+    def is_evictable(self, video_id):
+        """El archivo está en disco y todos los registros que lo usan ya se subieron"""
+        with self._lock:
+            video = self._videos.get(video_id)
+            return (video is not None and video.is_local and
+                    all(shared.is_uploaded for shared in self._sharing(video.path)))
+
+    def evictable(self):
+        """Archivos que se pueden borrar (un registro por archivo), del menos al más recientemente usado"""
+        with self._lock:
+            videos = []
+            for path, ids in self._by_path.items():
+                shared = [self._videos[video_id] for video_id in ids]
+                if all(video.is_uploaded for video in shared):
+                    videos.append(max(shared, key=lambda video: video.last_used_at or video.updated_at or 0))
+        return sorted(videos, key=lambda video: video.last_used_at or video.updated_at or 0)
+
+    def forget(self, video_id):
+        """Quita un video del índice (no borra el archivo)"""
+        with self._lock:
+            video = self._videos.pop(video_id, None)
+            if video is None:
+                return False
+            self._unindex_path(video)
+            try:
+                with self._conn:
+                    self._conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+            except sqlite3.Error as e:
+                logger.error(f"❌ Error borrando {video_id} del índice: {str(e)}")
+            return True
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_video_store():
+    """
+    Devuelve el almacén de videos compartido (se carga la primera vez)
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = VideoStore()
+    return _store
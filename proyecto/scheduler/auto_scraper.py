@@ -1,34 +1,47 @@
 # proyecto/scheduler/auto_scraper.py
 import logging
-import time
-import random
 from typing import Dict, List, Optional
 from datetime import datetime
 
 # Importar módulos existentes
 from opciones.opcion1.scraper import Opcion1Scraper
-from opciones.opcion1.downloader import VideoDownloader
+from opciones.opcion1.async_scraper import AsyncScraperAdapter
+from opciones.opcion1.config import ScraperConfig
+from opciones.opcion1.models import parse_video_id
+from opciones.opcion1.transfer_manager import get_transfer_manager, PRIORITY_LOW
+from opciones.opcion1.video_store import get_video_store
 from database.wordpress_publisher import WordPressPublisher
 from database.category_manager import CategoryManager
+from .crawl_watermarks import CrawlWatermarkStore
 
 logger = logging.getLogger(__name__)
 
 class AutoScraper:
     """Ejecuta scraping automático programado"""
     
-    def __init__(self):
-        self.scraper = Opcion1Scraper()
-        self.downloader = VideoDownloader()
+    def __init__(self, scraper=None):
+        # Cualquier objeto con la interfaz de Opcion1Scraper. Por defecto el
+        # asíncrono: las tareas que el scheduler lanza a la vez comparten su bucle
+        if scraper is None:
+            scraper = AsyncScraperAdapter() if ScraperConfig.ASYNC_SCHEDULED_CRAWL else Opcion1Scraper()
+        self.scraper = scraper
+        # Cola de transferencias compartida con la interfaz
+        self.transfers = get_transfer_manager()
+        self.video_store = get_video_store()
         self.publisher = WordPressPublisher()
         self.category_manager = CategoryManager()
         
+        # Videos ya procesados por categoría (recorridos incrementales)
+        self.watermarks = CrawlWatermarkStore()
+        
         # Configuración por defecto
         self.default_config = {
             'max_videos_per_run': 50,
-            'delay_between_videos': (1, 3),  # segundos (min, max)
             'auto_publish': True,
             'skip_existing': True,
-            'max_retries': 3
+            'max_retries': 3,
+            'max_pages': 10,  # Páginas de listado a recorrer como máximo
+            'incremental': True  # Solo videos nuevos desde la última ejecución
         }
         
         logger.info("🤖 AutoScraper inicializado")
@@ -80,46 +93,65 @@ class AutoScraper:
                     logger.error("❌ No hay categorías de WordPress disponibles")
                     return result
             
-            # Obtener videos de la categoría
+            # Obtener videos de la categoría (recorriendo páginas hasta cubrir max_videos).
+            # Sin caché: la ejecución programada busca contenido nuevo. Con la marca
+            # de agua el recorrido se detiene al llegar a lo ya procesado
+            watermark = self.watermarks.get(category_url) if config.get('incremental', True) else None
             logger.info("🔍 Obteniendo videos de la categoría...")
-            videos = list(self.scraper.get_videos(category_url))
+            videos = [
+                video for video in self.scraper.get_videos(
+                    category_url,
+                    max_pages=config.get('max_pages'),
+                    max_videos=max_videos,
+                    use_cache=False,
+                    watermark=watermark
+                )
+                if video
+            ]
             
             if not videos:
-                result['message'] = "No se encontraron videos en la categoría"
-                logger.warning(f"⚠️ {result['message']}")
+                if watermark is not None and watermark.seen:
+                    result['success'] = True
+                    result['message'] = "No hay videos nuevos desde la última ejecución"
+                    logger.info(f"🔖 {result['message']}")
+                else:
+                    result['message'] = "No se encontraron videos en la categoría"
+                    logger.warning(f"⚠️ {result['message']}")
                 return result
             
             # Limitar número de videos
             videos_to_process = videos[:max_videos]
             logger.info(f"📋 Procesando {len(videos_to_process)} de {len(videos)} videos encontrados")
             
-            # Procesar cada video
+            # Encolar todas las descargas: el gestor las reparte entre sus
+            # hilos (con prioridad baja, las importaciones manuales van antes)
+            jobs = {}
+            for i, video in enumerate(videos_to_process, 1):
+                # Verificar si ya existe (opcional)
+                if config.get('skip_existing', True) and self._video_already_exists(video):
+                    logger.info(f"⏭️ Video ya existe, saltando: {video.get('title', '')[:30]}...")
+                    self.watermarks.mark_seen(category_url, self._get_video_id(video), newest=(i == 1))
+                    continue
+                jobs[i] = self.transfers.submit_download(video.get('url'), video, priority=PRIORITY_LOW)
+            
+            # Publicar en el orden del listado a medida que terminan
             for i, video in enumerate(videos_to_process, 1):
+                if i not in jobs:
+                    continue
                 try:
                     logger.info(f"🎬 Procesando video {i}/{len(videos_to_process)}: {video.get('title', 'Sin título')[:50]}...")
                     
-                    # Verificar si ya existe (opcional)
-                    if config.get('skip_existing', True):
-                        if self._video_already_exists(video):
-                            logger.info(f"⏭️ Video ya existe, saltando: {video.get('title', '')[:30]}...")
-                            continue
-                    
                     # Procesar video
-                    process_result = self._process_single_video(video, wp_categories, config)
+                    process_result = self._process_single_video(video, wp_categories, config, jobs[i])
                     
                     if process_result['success']:
+                        # El primero del listado es el más reciente
+                        self.watermarks.mark_seen(category_url, self._get_video_id(video), newest=(i == 1))
                         result['videos_processed'] += 1
                         if process_result.get('published', False):
                             result['videos_published'] += 1
                     else:
                         result['errors'].append(f"Video {i}: {process_result.get('error', 'Error desconocido')}")
-                    
-                    # Delay entre videos para evitar ser bloqueado
-                    if i < len(videos_to_process):  # No delay después del último
-                        delay_range = config.get('delay_between_videos', (1, 3))
-                        delay = random.uniform(delay_range[0], delay_range[1])
-                        logger.debug(f"⏳ Esperando {delay:.1f} segundos...")
-                        time.sleep(delay)
                 
                 except Exception as e:
                     error_msg = f"Error procesando video {i}: {str(e)}"
@@ -161,22 +193,33 @@ class AutoScraper:
             return []
     
     def _video_already_exists(self, video: Dict) -> bool:
-        """Verifica si un video ya existe en WordPress"""
+        """Verifica si un video ya se procesó (en esta o en otra categoría, o ya subido)"""
         try:
-            # Aquí podrías implementar lógica para verificar si el video ya está publicado
-            # Por ejemplo, buscar por título o URL en wp_posts
-            
-            # Por ahora, retorna False (no verificar duplicados)
-            return False
+            video_id = self._get_video_id(video)
+            if self.watermarks.is_known(video_id):
+                return True
+            stored = self.video_store.get(video_id)
+            return stored is not None and stored.is_uploaded
             
         except Exception as e:
             logger.error(f"❌ Error verificando video existente: {str(e)}")
             return False
     
-    def _process_single_video(self, video: Dict, wp_categories: List[Dict], config: Dict) -> Dict:
+    def _get_video_id(self, video: Dict) -> Optional[str]:
+        """ID estable del video (viewkey), también para dicts sin video_id"""
+        video_id = getattr(video, 'video_id', None)
+        if video_id is None:
+            video_id = parse_video_id(video.get('url'))
+        return video_id
+    
+    def _process_single_video(self, video: Dict, wp_categories: List[Dict], config: Dict,
+                              job=None) -> Dict:
         """
         Procesa un solo video (descarga y publica)
         
+        Args:
+            job: TransferJob ya encolado para el video (si no, se encola aquí)
+        
         Returns:
             Dict con resultado del procesamiento
         """
@@ -191,10 +234,12 @@ class AutoScraper:
             # 1. Descargar video
             logger.info(f"⬇️ Descargando: {video.get('title', 'Sin título')[:30]}...")
             
-            download_success = self.downloader.download_video(video.get('url'), video)
+            if job is None:
+                job = self.transfers.submit_download(video.get('url'), video, priority=PRIORITY_LOW)
+            job.wait()
             
-            if not download_success:
-                result['error'] = "Error en descarga"
+            if not job.success:
+                result['error'] = f"Error en descarga: {job.error}" if job.error else "Error en descarga"
                 return result
             
             logger.info("✅ Descarga completada")
@@ -208,7 +253,7 @@ class AutoScraper:
                 
                 if selected_category:
                     # Obtener código de StreamWish si está disponible
-                    streamwish_code = self._get_streamwish_code_from_downloader()
+                    streamwish_code = job.streamwish_filecode
                     
                     # Publicar
                     publish_result = self.publisher.publish_video(
@@ -270,17 +315,6 @@ class AutoScraper:
             logger.error(f"❌ Error seleccionando categoría: {str(e)}")
             return None
     
-    def _get_streamwish_code_from_downloader(self) -> Optional[str]:
-        """Obtiene el código de StreamWish del último upload"""
-        try:
-            if (hasattr(self.downloader, 'streamwish_uploader') and 
-                self.downloader.streamwish_uploader):
-                return self.downloader.streamwish_uploader.get_last_filecode()
-            return None
-        except Exception as e:
-            logger.error(f"❌ Error obteniendo código StreamWish: {str(e)}")
-            return None
-    
     def test_category_scraping(self, category_url: str, max_videos: int = 5) -> Dict:
         """
         Prueba el scraping de una categoría sin publicar
@@ -290,7 +324,9 @@ class AutoScraper:
         try:
             logger.info(f"🧪 Probando scraping de categoría: {category_url}")
             
-            videos = list(self.scraper.get_videos(category_url))
+            # Solo la primera página: basta para comprobar que la categoría funciona
+            # (la caché de resultados evita repetir el scraping si ya se hizo hace poco)
+            videos = [video for video in self.scraper.get_videos(category_url, max_pages=1) if video]
             videos_sample = videos[:max_videos]
             
             result = {
@@ -328,9 +364,7 @@ class AutoScraper:
         """Obtiene información básica de una categoría"""
         try:
             # Hacer una solicitud rápida para verificar que la categoría existe
-            import requests
-            
-            response = requests.get(category_url, headers=self.scraper.headers, timeout=10)
+            response = self.scraper.session.get(category_url, headers=self.scraper.headers, timeout=10)
             if response.status_code == 200:
                 return {
                     'accessible': True,
@@ -0,0 +1,131 @@
+# proyecto/scheduler/crawl_watermarks.py
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryWatermark:
+    """
+    Marca de agua de una categoría: videos ya vistos y el más reciente
+
+    Se pasa a Opcion1Scraper.get_videos(watermark=...) para que el recorrido
+    salte lo ya visto y no siga paginando al llegar a contenido conocido.
+    """
+
+    def __init__(self, seen=None, newest_id: Optional[str] = None, updated_at: Optional[str] = None):
+        self.seen = OrderedDict.fromkeys(seen or [])  # Orden de inserción = antigüedad
+        self.newest_id = newest_id
+        self.updated_at = updated_at
+
+    def is_seen(self, video_id: Optional[str]) -> bool:
+        return video_id is not None and video_id in self.seen
+
+    def to_dict(self) -> Dict:
+        return {
+            'newest_id': self.newest_id,
+            'updated_at': self.updated_at,
+            'seen': list(self.seen),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        return cls(data.get('seen'), data.get('newest_id'), data.get('updated_at'))
+
+
+class CrawlWatermarkStore:
+    """Persistencia de las marcas de agua por categoría"""
+
+    MAX_SEEN_PER_CATEGORY = 2000  # IDs recordados por categoría (los más antiguos se olvidan)
+
+    def __init__(self, watermark_file: str = None, max_seen: int = None):
+        self.watermark_file = Path(watermark_file or Path.home() / ".pornhub_downloader" / "crawl_watermarks.json")
+        self.watermark_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_seen = max_seen or self.MAX_SEEN_PER_CATEGORY
+
+        self._lock = threading.RLock()
+        self._watermarks: Dict[str, CategoryWatermark] = {}
+        self._load()
+
+    @staticmethod
+    def _category_key(category_url: str) -> str:
+        return category_url.strip().rstrip('/')
+
+    def _load(self):
+        try:
+            if self.watermark_file.exists():
+                with open(self.watermark_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._watermarks = {key: CategoryWatermark.from_dict(value) for key, value in data.items()}
+                logger.info(f"🔖 Marcas de agua cargadas para {len(self._watermarks)} categorías")
+        except Exception as e:
+            logger.error(f"❌ Error cargando marcas de agua: {str(e)}")
+            self._watermarks = {}
+
+    def save(self):
+        """Guarda las marcas de agua en disco (escritura atómica)"""
+        with self._lock:
+            data = {key: watermark.to_dict() for key, watermark in self._watermarks.items()}
+        try:
+            tmp_file = self.watermark_file.with_name(self.watermark_file.name + '.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_file, self.watermark_file)
+        except Exception as e:
+            logger.error(f"❌ Error guardando marcas de agua: {str(e)}")
+
+    def get(self, category_url: str) -> CategoryWatermark:
+        """Devuelve la marca de agua de una categoría (vacía si no se ha recorrido)"""
+        key = self._category_key(category_url)
+        with self._lock:
+            watermark = self._watermarks.get(key)
+            if watermark is None:
+                watermark = self._watermarks[key] = CategoryWatermark()
+            return watermark
+
+    def mark_seen(self, category_url: str, video_id: Optional[str], newest: bool = False, save: bool = True):
+        """
+        Registra un video como procesado en una categoría
+
+        Args:
+            newest: Si es el video más reciente del listado en esta ejecución
+            save: Guardar en disco inmediatamente
+        """
+        if not video_id:
+            return
+
+        with self._lock:
+            watermark = self.get(category_url)
+            watermark.seen.pop(video_id, None)
+            watermark.seen[video_id] = None
+            while len(watermark.seen) > self.max_seen:
+                watermark.seen.popitem(last=False)
+
+            if newest or watermark.newest_id is None:
+                watermark.newest_id = video_id
+            watermark.updated_at = datetime.now().isoformat()
+
+        if save:
+            self.save()
+
+    def is_known(self, video_id: Optional[str]) -> bool:
+        """Indica si el video ya se procesó en cualquier categoría"""
+        if not video_id:
+            return False
+        with self._lock:
+            return any(video_id in watermark.seen for watermark in self._watermarks.values())
+
+    def reset(self, category_url: str = None):
+        """Olvida lo visto en una categoría (o en todas)"""
+        with self._lock:
+            if category_url is None:
+                self._watermarks.clear()
+            else:
+                self._watermarks.pop(self._category_key(category_url), None)
+        self.save()
@@ -0,0 +1,12 @@
+# proyecto/tests/conftest.py
+"""
+Pruebas de la lógica pura (sin red ni interfaz)
+
+Uso (desde proyecto/):
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+# Los módulos se importan como en la aplicación: desde proyecto/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,124 @@
+import pytest
+
+bs4 = pytest.importorskip('bs4')
+
+from opciones.opcion1.ad_classifier import AdClassifier
+from opciones.opcion1.parsers import PARSER_BACKENDS
+
+BACKENDS = [parser_class for name, available, parser_class in PARSER_BACKENDS if available]
+
+
+def baseline_is_advertisement(item):
+    """Reglas originales de Opcion1Scraper._is_advertisement (BeautifulSoup)"""
+    ad_indicators = [
+        '.tj-inban-container', '.tj-inban-icon', '[data-url*="trafficjunky"]',
+        '.mcacdmgrhc', '.mbbdfhgfle', 'cbcac', 'bdhdd',
+    ]
+    for selector in ad_indicators:
+        if item.select(selector):
+            return True
+
+    item_text = item.get_text().lower()
+    for ad_text in ['ad by traff', 'traffic junky', 'advertising', 'publicidad']:
+        if ad_text in item_text:
+            return True
+
+    if not item.select('.title a') and not item.select('a.linkVideoThumb'):
+        return True
+
+    for class_name in item.get('class', []):
+        if len(class_name) > 10 and any(char.isdigit() for char in class_name):
+            if class_name != 'pcVideoListItem':
+                return True
+    return False
+
+
+def video_item(index):
+    vkey = f"ph{index:04d}"
+    title = f"Video {index} título ñ"
+    return f'''<li class="pcVideoListItem js-pop videoblock videoBox" data-video-vkey="{vkey}">
+<div class="phimage"><a href="/view_video.php?viewkey={vkey}" class="linkVideoThumb js-linkVideoThumb img" title="{title}">
+<img src="https://ei.phncdn.com/videos/{vkey}/thumb.jpg" class="thumb js-videoThumb" alt="{title}"/></a>
+<var class="duration">{index % 60}:{index % 50:02d}</var></div>
+<span class="title"><a href="/view_video.php?viewkey={vkey}" title="{title}">{title}</a></span>
+<div class="usernameWrap"><a href="/model/user{index}">Uploader {index}</a></div>
+<span class="views"><var>{index}.{index % 10}K</var> vistas</span>
+<div class="rating-container neutral"><div class="value">{60 + index % 40}%</div></div></li>'''
+
+
+# Variantes de anuncios que el clasificador debe descartar
+AD_ITEMS = (
+    '<li class="pcVideoListItem"><div class="tj-inban-container"><a href="https://ads.example">ad</a></div></li>',
+    '<li class="pcVideoListItem"><cbcac><span>x</span></cbcac><span class="title"><a href="/v">t</a></span></li>',
+    '<li class="pcVideoListItem"><span class="title"><a href="/v">Publicidad</a></span></li>',
+    '<li class="emptyBlock"><div>sin contenido</div></li>',
+    '<li class="pcVideoListItem abc123def4567"><span class="title"><a href="/v">t</a></span></li>',
+    '<li class="pcVideoListItem"><div data-url="https://ads.trafficjunky.net/x"></div><span class="title"><a href="/v">t</a></span></li>',
+)
+
+EXTRA_ITEMS = (
+    # Casos límite de las reglas de texto, clases y estructura
+    '<li class="pcVideoListItem"><a class="linkVideoThumb" href="/v">Traffic Junky</a></li>',
+    '<li class="pcVideoListItem"><span class="title"><a href="/v">ADVERTISING</a></span></li>',
+    '<li class="pcVideoListItem"><div class="mbbdfhgfle"></div><a class="linkVideoThumb" href="/v">t</a></li>',
+    '<li class="pcVideoListItem"><bdhdd></bdhdd><a class="linkVideoThumb" href="/v">t</a></li>',
+    '<li class="pcVideoListItem"><span class="tj-inban-icon"></span><span class="title"><a href="/v">t</a></span></li>',
+    '<li class="pcVideoListItem"><a class="linkVideoThumb" href="/v">solo miniatura</a></li>',
+    '<li class="pcVideoListItem"><span class="title">sin enlace</span></li>',
+    '<li class="pcVideoListItem abcdefghijk"><span class="title"><a href="/v">sin dígitos</a></span></li>',
+    '<li class="pcVideoListItem abc1"><span class="title"><a href="/v">clase corta</a></span></li>',
+    '<li class="pcVideoListItem"><div data-url="https://cdn.example.com"></div><span class="title"><a href="/v">t</a></span></li>',
+)
+
+
+def _page(items):
+    return f'<html><body><ul id="videoCategory">{"".join(items)}</ul></body></html>'
+
+
+def _pages():
+    # Listado con anuncios intercalados, y uno solo con los casos límite
+    items = []
+    for index in range(44):
+        items.append(video_item(index))
+        if index % 8 == 3:
+            items.append(AD_ITEMS[(index // 8) % len(AD_ITEMS)])
+    yield _page(items)
+    yield _page(AD_ITEMS + EXTRA_ITEMS + tuple(video_item(i) for i in range(3)))
+
+
+@pytest.mark.parametrize('parser_class', BACKENDS, ids=lambda parser_class: parser_class.name)
+def test_parity_with_baseline_rules(parser_class):
+    classifier = AdClassifier()
+    parser = parser_class()
+
+    for html in _pages():
+        soup = bs4.BeautifulSoup(html, 'html.parser')
+        elements = soup.select('li.pcVideoListItem') or soup.select('ul#videoCategory li')
+        items, _ = parser.parse_listing(html)
+
+        assert len(items) == len(elements)
+        for item, element in zip(items, elements):
+            assert classifier.classify(item).is_ad == baseline_is_advertisement(element), str(element)[:120]
+
+
+def test_rules_and_stats():
+    parser = BACKENDS[0]()
+    classifier = AdClassifier()
+    # El emptyBlock de AD_ITEMS no es pcVideoListItem: el selector ya lo descarta
+    items, _ = parser.parse_listing(_page(AD_ITEMS + (EXTRA_ITEMS[6], video_item(1))))
+
+    rules = [classifier.classify(item).rule for item in items]
+    assert rules == [
+        AdClassifier.RULE_AD_CLASS,
+        AdClassifier.RULE_AD_TAG,
+        AdClassifier.RULE_AD_TEXT,
+        AdClassifier.RULE_DYNAMIC_CLASS,
+        AdClassifier.RULE_AD_DATA_URL,
+        AdClassifier.RULE_NO_VIDEO_STRUCTURE,
+        AdClassifier.RULE_VIDEO,
+    ]
+
+    assert classifier.get_stats()[AdClassifier.RULE_VIDEO] == 1
+    assert sum(classifier.get_stats().values()) == len(items)
+    classifier.reset_stats()
+    assert classifier.get_stats() == {}
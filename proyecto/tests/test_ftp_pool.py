@@ -0,0 +1,182 @@
+import ftplib
+import threading
+
+import pytest
+
+from utils import ftp_pool
+from utils.ftp_pool import FtpPool, FtpPoolConfig, is_stale
+
+
+class FakeFTP:
+    """ftplib.FTP en memoria: anota los comandos y permite simular caídas"""
+
+    instances = []
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.commands = []
+        self.dirs = {'/'}
+        self.dead = False
+        self.closed = False
+        FakeFTP.instances.append(self)
+
+    def _check(self):
+        if self.dead:
+            raise EOFError("conexión cerrada")
+
+    def connect(self, host, port):
+        self.commands.append(('connect', host, port))
+
+    def login(self, user, password):
+        self.commands.append(('login', user))
+
+    def voidcmd(self, command):
+        self._check()
+        self.commands.append((command,))
+
+    def cwd(self, path):
+        self._check()
+        self.commands.append(('cwd', path))
+        if path not in self.dirs:
+            raise ftplib.error_perm(f"550 {path}: No such directory")
+
+    def mkd(self, path):
+        self._check()
+        self.commands.append(('mkd', path))
+        self.dirs.add(path)
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+class FastConfig(FtpPoolConfig):
+    POOL_SIZE = 2
+    ACQUIRE_TIMEOUT = 0.2
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    FakeFTP.instances = []
+    monkeypatch.setattr(ftp_pool.ftplib, 'FTP', FakeFTP)
+    pool = FtpPool('ftp.example.com', 21, 'user', 'secret', config=FastConfig)
+    yield pool
+    pool.close()
+
+
+def test_sessions_are_reused(pool):
+    first = pool.run(lambda session: session)
+    second = pool.run(lambda session: session)
+
+    assert first is second
+    assert first.uses == 2
+    assert len(FakeFTP.instances) == 1
+    assert FakeFTP.instances[0].commands[:2] == [('connect', 'ftp.example.com', 21), ('login', 'user')]
+
+
+def test_size_limit_and_acquire_timeout(pool):
+    with pool.session() as first, pool.session() as second:
+        assert first is not second
+        with pytest.raises(TimeoutError):
+            pool._acquire()
+    assert len(pool._idle) == 2
+    assert pool._open == 2
+
+
+def test_waiting_thread_gets_released_session(pool, monkeypatch):
+    monkeypatch.setattr(FastConfig, 'ACQUIRE_TIMEOUT', 5)
+    got = []
+
+    with pool.session() as first, pool.session() as second:
+        waiter = threading.Thread(target=lambda: got.append(pool.run(lambda session: session)))
+        waiter.start()
+        waiter.join(0.1)
+        assert waiter.is_alive()
+    waiter.join(5)
+
+    assert got and got[0] in (first, second)
+    assert len(FakeFTP.instances) == 2
+
+
+def test_dead_reused_session_is_replaced_once(pool):
+    session = pool.run(lambda session: session)
+    session.ftp.dead = True
+
+    def upload(session):
+        session.ftp.voidcmd('STOR')
+        return session
+
+    replacement = pool.run(upload)
+    assert replacement is not session
+    assert session.ftp.closed
+    assert pool._open == 1
+    assert len(FakeFTP.instances) == 2
+
+
+def test_dead_new_session_is_not_retried(pool):
+    def upload(session):
+        session.ftp.dead = True
+        session.ftp.voidcmd('STOR')
+
+    with pytest.raises(EOFError):
+        pool.run(upload)
+    assert pool._open == 0
+    assert len(FakeFTP.instances) == 1
+
+
+def test_other_errors_keep_the_session(pool):
+    def upload(session):
+        raise ftplib.error_perm("553 nombre no permitido")
+
+    with pytest.raises(ftplib.error_perm):
+        pool.run(upload)
+    with pytest.raises(OSError):
+        with pool.session():
+            raise FileNotFoundError("archivo local")
+
+    assert len(pool._idle) == 1
+    assert len(FakeFTP.instances) == 1
+
+
+def test_is_stale():
+    assert is_stale(EOFError())
+    assert is_stale(ConnectionResetError())
+    assert is_stale(ftplib.error_temp("421 Timeout"))
+    assert not is_stale(ftplib.error_temp("450 Archivo ocupado"))
+    assert not is_stale(ftplib.error_perm("550 No existe"))
+    assert not is_stale(FileNotFoundError())
+
+
+def test_ensure_dir_creates_and_remembers(pool):
+    with pool.session() as session:
+        pool.ensure_dir(session, 'uploads/2024/thumbs')
+        ftp = session.ftp
+        assert [c for c in ftp.commands if c[0] == 'mkd'] == [
+            ('mkd', '/uploads'), ('mkd', '/uploads/2024'), ('mkd', '/uploads/2024/thumbs')]
+        assert session.cwd == '/uploads/2024/thumbs'
+
+        # Ya conocida y ya dentro: ningún comando
+        ftp.commands.clear()
+        pool.ensure_dir(session, '/uploads/2024/thumbs/')
+        assert ftp.commands == []
+
+        # Conocida pero en otra carpeta: un solo CWD
+        session.change_dir('/')
+        ftp.commands.clear()
+        pool.ensure_dir(session, 'uploads/2024/thumbs')
+        assert ftp.commands == [('cwd', '/uploads/2024/thumbs')]
+
+
+def test_close_empties_idle_and_rejects_new_work(pool):
+    with pool.session() as borrowed:
+        pool.run(lambda session: None)
+        pool.close()
+        assert pool._idle == []
+
+    assert borrowed.ftp.closed
+    assert pool._open == 0
+    assert all(ftp.closed for ftp in FakeFTP.instances)
+    with pytest.raises(RuntimeError):
+        pool.run(lambda session: None)
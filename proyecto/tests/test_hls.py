@@ -0,0 +1,95 @@
+import pytest
+
+from opciones.opcion1.hls import HlsError, HlsVariant, parse_playlist, select_variant
+
+MASTER = """#EXTM3U
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=854x480
+480p/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720,CODECS="avc1.64001f,mp4a.40.2"
+/hls/720p/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=5000000,RESOLUTION=1920x1080
+https://cdn2.example.com/1080p/index.m3u8
+"""
+
+MEDIA = """#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-TARGETDURATION:10
+#EXTINF:10.0,
+seg-1.ts
+#EXTINF:9.5,
+/abs/seg-2.ts
+#EXTINF:4.25,
+https://other.example.com/seg-3.ts
+#EXT-X-ENDLIST
+"""
+
+
+def test_master_playlist_variants():
+    playlist = parse_playlist(MASTER, 'https://cdn.example.com/video/master.m3u8?t=1')
+
+    assert playlist.is_master
+    assert [v.url for v in playlist.variants] == [
+        'https://cdn.example.com/video/480p/index.m3u8',
+        'https://cdn.example.com/hls/720p/index.m3u8',
+        'https://cdn2.example.com/1080p/index.m3u8',
+    ]
+    assert [v.height for v in playlist.variants] == [480, 720, 1080]
+    assert [v.bandwidth for v in playlist.variants] == [800000, 2500000, 5000000]
+    assert playlist.segments == []
+
+
+def test_media_playlist_segments_and_duration():
+    playlist = parse_playlist(MEDIA, 'https://cdn.example.com/video/720p/index.m3u8')
+
+    assert not playlist.is_master
+    assert playlist.segments == [
+        'https://cdn.example.com/video/720p/seg-1.ts',
+        'https://cdn.example.com/abs/seg-2.ts',
+        'https://other.example.com/seg-3.ts',
+    ]
+    assert playlist.duration == pytest.approx(23.75)
+
+
+def test_init_segment_goes_first():
+    text = '#EXTM3U\n#EXTINF:4,\nseg-1.m4s\n#EXT-X-MAP:URI="init.mp4"\n#EXTINF:4,\nseg-2.m4s\n'
+    playlist = parse_playlist(text, 'https://cdn.example.com/v/index.m3u8')
+
+    assert playlist.segments[0] == 'https://cdn.example.com/v/init.mp4'
+    assert len(playlist.segments) == 3
+
+
+def test_unencrypted_key_is_accepted():
+    text = '#EXTM3U\n#EXT-X-KEY:METHOD=NONE\n#EXTINF:4,\nseg.ts\n'
+    assert len(parse_playlist(text, 'https://cdn.example.com/index.m3u8').segments) == 1
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '<html>403</html>',
+    '#EXTM3U\n#EXT-X-KEY:METHOD=AES-128,URI="key.bin"\n#EXTINF:4,\nseg.ts\n',
+    '#EXTM3U\n#EXTINF:4,\n#EXT-X-BYTERANGE:1000@0\nvideo.ts\n',
+])
+def test_unsupported_playlists(text):
+    with pytest.raises(HlsError):
+        parse_playlist(text, 'https://cdn.example.com/index.m3u8')
+
+
+def test_select_variant_respects_max_height():
+    variants = parse_playlist(MASTER, 'https://cdn.example.com/master.m3u8').variants
+
+    assert select_variant(variants, 1080).height == 1080
+    assert select_variant(variants, 720).height == 720
+    assert select_variant(variants, 600).height == 480
+
+
+def test_select_variant_fallbacks():
+    assert select_variant([]) is None
+
+    # Ninguna cumple el límite: la mejor disponible
+    variants = [HlsVariant('a', 1000, 720), HlsVariant('b', 3000, 1080)]
+    assert select_variant(variants, 240).url == 'b'
+
+    # Sin resolución declarada decide el ancho de banda
+    variants = [HlsVariant('a', 1000), HlsVariant('b', 3000), HlsVariant('c', 2000)]
+    assert select_variant(variants, 720).url == 'b'
+    assert select_variant(variants).url == 'b'
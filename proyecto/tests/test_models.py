@@ -0,0 +1,50 @@
+import pytest
+
+from opciones.opcion1.models import parse_duration_seconds, parse_video_id, parse_views_count
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1.2M', 1_200_000),
+    ('1,2M', 1_200_000),
+    ('850K', 850_000),
+    ('850k', 850_000),
+    ('2B', 2_000_000_000),
+    ('12,345', 12345),
+    ('12.345', 12345),
+    ('1 234', 1234),
+    ('  42 ', 42),
+    ('', None),
+    (None, None),
+    ('muchas', None),
+    ('1.2X', None),
+])
+def test_parse_views_count(text, expected):
+    assert parse_views_count(text) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('10:05', 605),
+    ('1:02:03', 3723),
+    ('0:07', 7),
+    (' 3:00 ', 180),
+    (754, 754),
+    (12.9, 12),
+    ('', None),
+    (None, None),
+    ('LIVE', None),
+    ('1:xx', None),
+])
+def test_parse_duration_seconds(value, expected):
+    assert parse_duration_seconds(value) == expected
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://es.pornhub.com/view_video.php?viewkey=ph5f1a2b', 'ph5f1a2b'),
+    ('/view_video.php?pkey=1&viewkey=abc123', 'abc123'),
+    ('https://example.com/video/7', 'https://example.com/video/7'),
+    ('https://es.pornhub.com/view_video.php?viewkey=', 'https://es.pornhub.com/view_video.php?viewkey='),
+    ('', None),
+    (None, None),
+])
+def test_parse_video_id(url, expected):
+    assert parse_video_id(url) == expected
@@ -0,0 +1,90 @@
+import pytest
+
+from opciones.opcion1.partial_download import PartialDownload
+
+INFO = {'size': 100, 'etag': '"abc"', 'last_modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+
+
+@pytest.fixture
+def partial(tmp_path):
+    partial = PartialDownload(tmp_path / 'video.mp4')
+    partial.start('https://cdn.example.com/video.mp4?token=1', INFO)
+    return partial
+
+
+def test_ranges_merge_and_missing(partial):
+    assert partial.missing_ranges() == [(0, 99)]
+
+    partial.add_range(10, 19)
+    partial.add_range(40, 49)
+    partial.add_range(20, 29)   # Contiguo: se une a 10-19
+    partial.add_range(45, 59)   # Solapado con 40-49
+    partial.add_range(5, 4)     # Vacío: se ignora
+
+    assert partial.meta['completed'] == [[10, 29], [40, 59]]
+    assert partial.completed_bytes() == 40
+    assert partial.missing_ranges() == [(0, 9), (30, 39), (60, 99)]
+
+    partial.add_range(0, 99)
+    assert partial.meta['completed'] == [[0, 99]]
+    assert partial.missing_ranges() == []
+
+
+def test_sidecar_round_trip(partial, tmp_path):
+    partial.part_path.write_bytes(b'x' * 30)
+    partial.add_range(0, 29)
+
+    resumed = PartialDownload(tmp_path / 'video.mp4')
+    assert resumed.load()
+    assert resumed.missing_ranges() == [(30, 99)]
+    # Otra URL (token caducado) pero el mismo archivo remoto
+    assert resumed.matches(dict(INFO))
+    assert not resumed.matches({**INFO, 'size': 101})
+    assert not resumed.matches({**INFO, 'etag': '"otro"'})
+    assert resumed.matches({'size': 100})
+    assert not resumed.matches({})
+
+
+def test_load_without_part_file(partial, tmp_path):
+    assert not PartialDownload(tmp_path / 'video.mp4').load()
+
+
+def test_finish_requires_every_range(partial):
+    partial.part_path.write_bytes(b'x' * 100)
+    partial.add_range(0, 49)
+
+    with pytest.raises(IOError):
+        partial.finish(expected_size=100)
+    assert partial.part_path.exists()
+
+    partial.add_range(50, 99)
+    with pytest.raises(IOError):
+        partial.finish(expected_size=200)
+
+    partial.finish(expected_size=100)
+    assert partial.final_path.read_bytes() == b'x' * 100
+    assert not partial.part_path.exists()
+    assert not partial.meta_path.exists()
+
+
+def test_hls_progress(tmp_path):
+    partial = PartialDownload(tmp_path / 'stream.mp4')
+    partial.start_hls('https://cdn.example.com/index.m3u8', 12)
+    partial.mark_segment(5, 5000)
+    partial.part_path.write_bytes(b'x' * 5000)
+
+    resumed = PartialDownload(tmp_path / 'stream.mp4')
+    assert resumed.load()
+    assert resumed.matches_hls(12)
+    assert not resumed.matches_hls(13)
+    assert not resumed.matches(INFO)
+    assert (resumed.meta['segments_done'], resumed.meta['bytes']) == (5, 5000)
+
+
+def test_discard(partial):
+    partial.part_path.write_bytes(b'x')
+    partial.discard()
+
+    assert not partial.part_path.exists()
+    assert not partial.meta_path.exists()
+    assert partial.meta == {}
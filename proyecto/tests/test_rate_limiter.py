@@ -0,0 +1,68 @@
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """Sustituye al módulo time: el tiempo solo avanza con sleep/advance"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    return clock
+
+
+def test_burst_is_free_then_waits_queue_up(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Cada reserva siguiente espera su turno sin volver a competir
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=1, burst=2)
+    bucket.reserve(2)
+
+    clock.advance(1)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock.advance(60)
+    assert bucket.tokens <= bucket.capacity
+    assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_acquire_sleeps_the_reserved_wait(clock):
+    bucket = TokenBucket(rate=4, burst=1)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.25)
+    assert clock.slept == [pytest.approx(0.25)]
+
+
+def test_burst_below_one_means_one(clock):
+    bucket = TokenBucket(rate=1, burst=0)
+
+    assert bucket.capacity == 1
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(1.0)
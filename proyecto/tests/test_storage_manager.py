@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+
+import pytest
+
+from opciones.opcion1.storage_manager import StorageFullError, StorageManager
+from opciones.opcion1.video_store import VideoStore
+
+MB = 1024 * 1024
+
+
+class FakeDisk:
+    """Disco de capacidad fija: lo libre es la capacidad menos lo que hay en la carpeta"""
+
+    def __init__(self, folder, capacity):
+        self.folder = folder
+        self.capacity = capacity
+
+    def free(self):
+        used = sum(entry.stat().st_size for entry in os.scandir(self.folder) if entry.is_file())
+        return self.capacity - used
+
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / 'descargas'
+    folder.mkdir()
+    return folder
+
+
+@pytest.fixture
+def store(tmp_path):
+    return VideoStore(tmp_path / 'store.db')
+
+
+@pytest.fixture
+def make_manager(folder, store):
+    managers = []
+
+    def make(capacity=100 * MB, min_free=10 * MB, budget=0, evict=True):
+        manager = StorageManager(folder, budget_bytes=budget, min_free_bytes=min_free, store=store,
+                                 evict_uploaded=evict)
+        manager._free_bytes = FakeDisk(folder, capacity).free
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.stop()
+
+
+def _uploaded(store, folder, video_id, size, last_used):
+    path = folder / f'{video_id}.mp4'
+    path.write_bytes(os.urandom(size))
+    store.add(video_id, path)
+    store.mark_uploaded(video_id, f'code-{video_id}')
+    store.get(video_id).last_used_at = last_used
+    return path
+
+
+def test_shortfall_uses_min_free_and_pending(make_manager, folder):
+    manager = make_manager(capacity=100 * MB, min_free=10 * MB)
+
+    assert manager._shortfall([], 50 * MB) == 0
+    assert manager._shortfall([], 95 * MB) == 5 * MB
+
+    # Una descarga en curso cuenta por lo que le falta por escribir
+    with manager.reserve(40 * MB, folder / 'a.mp4'):
+        (folder / 'a.mp4.part').write_bytes(b'x' * (10 * MB))
+        reservations = manager._snapshot()[0]
+        # Libres 90, mínimo 10, pendientes 30: caben 50
+        assert manager._shortfall(reservations, 50 * MB) == 0
+        assert manager._shortfall(reservations, 60 * MB) == 10 * MB
+
+
+def test_shortfall_discounts_resumed_part(make_manager, folder):
+    manager = make_manager(capacity=100 * MB, min_free=10 * MB)
+    (folder / 'b.mp4.part').write_bytes(b'x' * (30 * MB))
+
+    # Libres 70: 80 MB no caben, pero 30 ya están escritos
+    assert manager._shortfall([], 80 * MB) == 20 * MB
+    assert manager._shortfall([], 80 * MB, folder / 'b.mp4') == 0
+
+
+def test_shortfall_budget(make_manager, folder):
+    manager = make_manager(capacity=10 ** 12, min_free=0, budget=50 * MB)
+    (folder / 'old.mp4').write_bytes(b'x' * (30 * MB))
+
+    assert manager._shortfall([], 20 * MB) == 0
+    assert manager._shortfall([], 25 * MB) == 5 * MB
+    with pytest.raises(StorageFullError):
+        manager.reserve(60 * MB)
+
+
+def test_evict_lru_uploaded_only(make_manager, store, folder):
+    manager = make_manager()
+    oldest = _uploaded(store, folder, 'ph1', 2 * MB, last_used=1)
+    newer = _uploaded(store, folder, 'ph2', 2 * MB, last_used=2)
+    newest = _uploaded(store, folder, 'ph3', 2 * MB, last_used=3)
+    pending = folder / 'ph4.mp4'
+    pending.write_bytes(os.urandom(MB))
+    store.add('ph4', pending)
+
+    freed = manager._evict(3 * MB, [])
+
+    assert freed == 4 * MB
+    assert not oldest.exists() and not newer.exists()
+    assert newest.exists() and pending.exists()
+    assert not store.get('ph1').is_local and store.get('ph1').is_uploaded
+    assert store.get('ph3').is_local
+
+
+def test_evict_skips_files_in_use_and_respects_opt_out(make_manager, store, folder):
+    path = _uploaded(store, folder, 'ph1', MB, last_used=1)
+
+    assert make_manager(evict=False)._evict(MB, []) == 0
+    assert path.exists()
+
+    manager = make_manager()
+    with manager.reserve(0, path):
+        assert manager._evict(MB, manager._snapshot()[0]) == 0
+    assert path.exists()
+
+
+def test_reserve_evicts_to_make_room(make_manager, store, folder):
+    manager = make_manager(capacity=100 * MB, min_free=10 * MB)
+    old = _uploaded(store, folder, 'ph1', 40 * MB, last_used=1)
+
+    # Libres 60, mínimo 10: 70 MB solo caben borrando el video ya subido
+    reservation = manager.reserve(70 * MB, folder / 'nuevo.mp4', timeout=1)
+    assert reservation is not None
+    assert not old.exists()
+    reservation.release()
+
+
+def test_reserve_times_out_without_evictable(make_manager, folder):
+    manager = make_manager(capacity=100 * MB, min_free=10 * MB)
+    waits = []
+
+    started = time.monotonic()
+    with pytest.raises(StorageFullError):
+        manager.reserve(95 * MB, folder / 'grande.mp4', on_wait=waits.append, timeout=0.2)
+    assert time.monotonic() - started < 5
+    assert waits == [5 * MB]
+
+
+def test_reserve_waits_for_release(make_manager, folder):
+    manager = make_manager(capacity=100 * MB, min_free=10 * MB)
+    first = manager.reserve(60 * MB, folder / 'a.mp4')
+    got = []
+
+    waiter = threading.Thread(target=lambda: got.append(manager.reserve(60 * MB, folder / 'b.mp4', timeout=5)))
+    waiter.start()
+    time.sleep(0.1)
+    assert not got
+    first.release()
+    waiter.join(5)
+
+    assert got and got[0] is not None
+    got[0].release()
+
+
+def test_reserve_cancelled(make_manager, folder):
+    manager = make_manager(capacity=100 * MB, min_free=10 * MB)
+    cancel = threading.Event()
+    cancel.set()
+
+    assert manager.reserve(95 * MB, folder / 'a.mp4', cancel_event=cancel) is None
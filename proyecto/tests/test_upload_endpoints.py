@@ -0,0 +1,212 @@
+import threading
+import time as real_time
+
+import pytest
+
+from opciones.opcion1 import upload_endpoints
+from opciones.opcion1.config import DownloadConfig
+from opciones.opcion1.upload_endpoints import UploadEndpointRegistry
+
+KEY = 'api-key'
+MB = 1024 * 1024
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeApi:
+    """fetch_server de prueba: devuelve las URLs indicadas en orden y cuenta las consultas"""
+
+    def __init__(self, *urls):
+        self.urls = list(urls)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.urls.pop(0) if self.urls else None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(upload_endpoints, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def registry(clock, monkeypatch):
+    monkeypatch.setattr(DownloadConfig, 'UPLOAD_SERVER_TTL', 60)
+    monkeypatch.setattr(DownloadConfig, 'UPLOAD_SERVER_MAX_FAILURES', 2)
+    monkeypatch.setattr(DownloadConfig, 'UPLOAD_SERVER_RETRY_AFTER', 600)
+    monkeypatch.setattr(DownloadConfig, 'UPLOAD_SERVER_MAX_KNOWN', 3)
+    return UploadEndpointRegistry()
+
+
+def _fail(registry, endpoint, times):
+    for _ in range(times):
+        registry.report_failure(endpoint, "502 Bad Gateway")
+
+
+def test_server_is_reused_until_ttl(registry, clock):
+    api = FakeApi('https://s1', 'https://s2')
+
+    first = registry.acquire(KEY, api)
+    assert first.url == 'https://s1'
+    assert registry.acquire(KEY, api) is first
+    assert api.calls == 1
+
+    clock.advance(61)
+    assert registry.acquire(KEY, api).url == 'https://s2'
+    assert api.calls == 2
+
+
+def test_stale_server_kept_when_api_fails(registry, clock):
+    api = FakeApi('https://s1')
+    first = registry.acquire(KEY, api)
+
+    clock.advance(61)
+    assert registry.acquire(KEY, api) is first
+    assert api.calls == 2
+
+
+def test_no_server_at_all(registry):
+    assert registry.acquire(KEY, FakeApi()) is None
+
+
+def test_keys_are_independent(registry):
+    registry.acquire(KEY, FakeApi('https://s1'))
+    assert registry.acquire('otra', FakeApi('https://s2')).url == 'https://s2'
+
+
+def test_health_scoring_prefers_fast_and_reliable(registry):
+    slow = registry.add(KEY, 'https://slow')
+    fast = registry.add(KEY, 'https://fast')
+    flaky = registry.add(KEY, 'https://flaky')
+
+    registry.report_success(slow, 100 * MB, 200)
+    registry.report_success(fast, 100 * MB, 20)
+    registry.report_success(flaky, 100 * MB, 10)
+    registry.report_failure(flaky, "timeout")
+
+    assert fast.score > slow.score
+    assert flaky.error_rate == pytest.approx(DownloadConfig.UPLOAD_HEALTH_SMOOTHING)
+    assert registry.acquire(KEY, FakeApi()) is fast
+
+    # Un éxito reinicia los fallos seguidos y baja la media de errores
+    registry.report_success(flaky, 100 * MB, 10)
+    assert flaky.consecutive_failures == 0
+    assert flaky.error_rate < DownloadConfig.UPLOAD_HEALTH_SMOOTHING
+
+
+def test_retirement_after_consecutive_failures(registry):
+    endpoint = registry.acquire(KEY, FakeApi('https://s1'))
+
+    _fail(registry, endpoint, 1)
+    assert not endpoint.retired
+    _fail(registry, endpoint, 1)
+    assert endpoint.retired
+    assert registry.snapshot(KEY)[0]['retired']
+
+    # Sin servidores sanos se pide uno nuevo
+    api = FakeApi('https://s2')
+    assert registry.acquire(KEY, api).url == 'https://s2'
+    assert api.calls == 1
+
+
+def test_refresh_switches_to_new_server(registry):
+    failed = registry.acquire(KEY, FakeApi('https://s1'))
+    _fail(registry, failed, 1)
+
+    api = FakeApi('https://s2')
+    assert registry.acquire(KEY, api, refresh=True).url == 'https://s2'
+    assert api.calls == 1
+
+
+def test_refresh_when_api_returns_the_failed_server(registry):
+    failed = registry.acquire(KEY, FakeApi('https://s1'))
+    healthy = registry.add(KEY, 'https://s2')
+    registry.report_success(healthy, MB, 1)
+    _fail(registry, failed, 1)
+
+    # La API insiste en el que acaba de fallar: mejor el sano que ya se conoce,
+    # aunque el fallido puntúe más por no tener medidas de velocidad
+    assert failed.score > healthy.score
+    assert registry.acquire(KEY, FakeApi('https://s1'), refresh=True) is healthy
+
+
+def test_refresh_with_only_the_failed_server(registry):
+    failed = registry.acquire(KEY, FakeApi('https://s1'))
+    _fail(registry, failed, 1)
+
+    assert registry.acquire(KEY, FakeApi('https://s1'), refresh=True) is failed
+
+
+def test_api_returns_retired_server(registry):
+    retired = registry.acquire(KEY, FakeApi('https://s1'))
+    healthy = registry.add(KEY, 'https://s2')
+    _fail(registry, retired, 2)
+
+    assert registry.acquire(KEY, FakeApi('https://s1'), refresh=True) is healthy
+    assert retired.retired
+
+
+def test_api_returns_retired_server_and_no_other(registry):
+    retired = registry.acquire(KEY, FakeApi('https://s1'))
+    _fail(registry, retired, 2)
+
+    # Mejor un servidor retirado que ninguno
+    assert registry.acquire(KEY, FakeApi('https://s1')) is retired
+    assert retired.retired
+
+
+def test_retired_server_rehabilitated_after_retry_after(registry, clock):
+    retired = registry.acquire(KEY, FakeApi('https://s1'))
+    _fail(registry, retired, 2)
+
+    clock.advance(DownloadConfig.UPLOAD_SERVER_RETRY_AFTER + 1)
+    assert registry.acquire(KEY, FakeApi('https://s1')) is retired
+    assert not retired.retired
+    assert retired.consecutive_failures == 0
+
+
+def test_known_servers_are_bounded_retired_first(registry):
+    retired = registry.add(KEY, 'https://s1')
+    _fail(registry, retired, 2)
+    for index in range(2, 5):
+        registry.add(KEY, f'https://s{index}')
+
+    urls = [endpoint['url'] for endpoint in registry.snapshot(KEY)]
+    assert len(urls) == DownloadConfig.UPLOAD_SERVER_MAX_KNOWN
+    assert 'https://s1' not in urls
+
+
+def test_one_api_query_for_concurrent_acquires(monkeypatch):
+    registry = UploadEndpointRegistry()
+    calls = []
+    entered = threading.Event()
+
+    def slow_fetch():
+        calls.append(1)
+        entered.set()
+        real_time.sleep(0.1)
+        return 'https://s1'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.acquire(KEY, slow_fetch)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert len({id(endpoint) for endpoint in results}) == 1
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+pytest.importorskip('PyQt5')
+
+from opciones.opcion1 import bulk_upload
+from opciones.opcion1.bulk_upload import UploadLedger
+from opciones.opcion1.video_store import file_sha256
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = UploadLedger(tmp_path / 'ledger.db')
+    yield ledger
+    ledger.close()
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Cuenta las lecturas completas de archivos"""
+    calls = []
+
+    def counting_sha256(path):
+        calls.append(path)
+        return file_sha256(path)
+
+    monkeypatch.setattr(bulk_upload, 'file_sha256', counting_sha256)
+    return calls
+
+
+def test_file_hash_is_cached_by_size_and_mtime(ledger, hashed, tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'contenido')
+    st = path.stat()
+
+    first = ledger.file_hash(path, st.st_size, st.st_mtime)
+    assert first == file_sha256(path)
+    assert ledger.file_hash(path, st.st_size, st.st_mtime) == first
+    assert len(hashed) == 1
+
+    path.write_bytes(b'otro contenido')
+    st = path.stat()
+    assert ledger.file_hash(path, st.st_size, st.st_mtime) == file_sha256(path)
+    assert len(hashed) == 2
+
+
+def test_record_and_lookup(ledger, tmp_path):
+    assert ledger.filecode('abc') is None
+
+    ledger.record('abc', 'code1', tmp_path / 'video.mp4', 10)
+    assert ledger.filecode('abc') == 'code1'
+
+    # El mismo contenido subido otra vez: gana el último filecode
+    ledger.record('abc', 'code2', tmp_path / 'copia.mp4', 10)
+    assert ledger.filecode('abc') == 'code2'
+
+
+def test_survives_reopen(tmp_path, hashed):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'contenido')
+    st = path.stat()
+
+    ledger = UploadLedger(tmp_path / 'ledger.db')
+    sha256 = ledger.file_hash(path, st.st_size, st.st_mtime)
+    ledger.record(sha256, 'code1', path, st.st_size)
+    ledger.close()
+
+    reopened = UploadLedger(tmp_path / 'ledger.db')
+    try:
+        assert reopened.filecode(sha256) == 'code1'
+        assert reopened.file_hash(os.path.relpath(path), st.st_size, st.st_mtime) == sha256
+        assert len(hashed) == 1
+    finally:
+        reopened.close()
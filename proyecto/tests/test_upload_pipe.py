@@ -0,0 +1,141 @@
+import os
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+
+import pytest
+
+from opciones.opcion1.upload_pipe import FileChunks, GrowingFile, PipeAborted, StreamingMultipartBody
+
+FIELDS = {'key': 'api-key', 'file_public': 1, 'fld_id': None}
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(os.urandom(10_000))
+    return path
+
+
+def _collect(iterable):
+    # Los trozos son vistas de un buffer reutilizado: copiar antes de pedir el siguiente
+    return b''.join(bytes(chunk) for chunk in iterable)
+
+
+def _body(path, size=None, chunk_size=4096, progress=None):
+    size = os.path.getsize(path) if size is None else size
+    return StreamingMultipartBody(FIELDS, 'file', 'título "raro"\r\n.mp4', 'video/mp4',
+                                  FileChunks(path, chunk_size), size, progress)
+
+
+def test_file_chunks_reads_whole_file_in_chunks(video):
+    chunks = FileChunks(video, chunk_size=4096)
+
+    sizes = [len(chunk) for chunk in chunks]
+    assert sizes == [4096, 4096, 10_000 - 8192]
+    assert _collect(chunks) == video.read_bytes()
+    assert chunks.size == 10_000
+
+
+def test_body_length_matches_bytes_sent(video):
+    body = _body(video)
+    data = _collect(body)
+
+    assert len(body) == len(data)
+
+
+def test_body_is_valid_multipart(video):
+    body = _body(video)
+    data = _collect(body)
+
+    message = BytesParser(policy=HTTP).parsebytes(
+        f'Content-Type: {body.content_type}\r\n\r\n'.encode('utf-8') + data)
+    parts = {part.get_param('name', header='content-disposition'): part for part in message.iter_parts()}
+
+    assert set(parts) == {'key', 'file_public', 'file'}
+    assert parts['key'].get_payload() == 'api-key'
+    assert parts['file'].get_payload(decode=True) == video.read_bytes()
+    # Comillas y saltos de línea del nombre no rompen la cabecera
+    assert '"' not in parts['file'].get_filename() and '\n' not in parts['file'].get_filename()
+
+
+def test_body_can_be_sent_again_for_failover(video):
+    body = _body(video)
+
+    assert _collect(body) == _collect(body)
+
+
+def test_body_reports_progress_after_each_chunk(video):
+    class Progress:
+        def __init__(self):
+            self.updates = []
+
+        def update(self, current, total):
+            self.updates.append((current, total))
+
+    progress = Progress()
+    _collect(_body(video, progress=progress))
+
+    assert progress.updates == [(4096, 10_000), (8192, 10_000), (10_000, 10_000)]
+
+
+def test_oversized_source_aborts(video):
+    with pytest.raises(PipeAborted):
+        _collect(_body(video, size=9_000))
+
+
+def test_short_source_aborts(video):
+    with pytest.raises(PipeAborted):
+        _collect(_body(video, size=12_000))
+
+
+def test_growing_file_follows_writes_out_of_order(tmp_path):
+    data = os.urandom(10_000)
+    path = tmp_path / 'video.mp4.part'
+    path.write_bytes(data)
+    growing = GrowingFile(path, len(data), chunk_size=4096)
+
+    received = []
+    reader = threading.Thread(target=lambda: received.append(_collect(growing)))
+    reader.start()
+
+    # Dos conexiones: el segundo tramo llega antes que el primero
+    growing.written(5000, 9999)
+    reader.join(0.1)
+    assert reader.is_alive()
+    growing.written(0, 4999)
+    reader.join(5)
+
+    assert received == [data]
+
+
+def test_growing_file_failure_aborts_reader(tmp_path):
+    path = tmp_path / 'video.mp4.part'
+    path.write_bytes(b'x' * 100)
+    growing = GrowingFile(path, 1000)
+    growing.written(0, 99)
+
+    errors = []
+
+    def read():
+        try:
+            _collect(growing)
+        except PipeAborted as e:
+            errors.append(e)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    growing.fail(IOError("descarga reiniciada"))
+    reader.join(5)
+
+    assert len(errors) == 1
+
+
+def test_growing_file_shorter_than_announced(tmp_path):
+    path = tmp_path / 'video.mp4.part'
+    path.write_bytes(b'x' * 100)
+    growing = GrowingFile(path, 200)
+    growing.written(0, 199)
+
+    with pytest.raises(PipeAborted):
+        _collect(growing)
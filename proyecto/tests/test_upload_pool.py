@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('PyQt5')
+
+from opciones.opcion1.config import DownloadConfig
+from opciones.opcion1.upload_pool import UploadPool, UploadResult
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'x')
+    return path
+
+
+@pytest.fixture
+def make_pool(monkeypatch):
+    monkeypatch.setattr(DownloadConfig, 'UPLOAD_RETRY_DELAY', 0.05)
+    monkeypatch.setattr(DownloadConfig, 'UPLOAD_RETRIES', 3)
+    pools = []
+
+    def make(upload, workers=4, max_per_key=2):
+        pool = UploadPool(workers=workers, max_per_key=max_per_key)
+        pool._upload = upload
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown(wait=False)
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "tiempo de espera agotado"
+        time.sleep(0.01)
+
+
+def test_per_key_cap(make_pool, video):
+    running = {}
+    peak = {}
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def upload(task):
+        task.attempts += 1
+        with lock:
+            running[task.api_key] = running.get(task.api_key, 0) + 1
+            peak[task.api_key] = max(peak.get(task.api_key, 0), running[task.api_key])
+        release.wait(5)
+        with lock:
+            running[task.api_key] -= 1
+        return UploadResult(True, filecode='abc', attempts=task.attempts)
+
+    pool = make_pool(upload, workers=4, max_per_key=2)
+    futures = [pool.submit(video, api_key='A') for _ in range(4)] + [pool.submit(video, api_key='B')]
+
+    # Dos de A y uno de B a la vez; los otros dos de A esperan en cola
+    _wait_until(lambda: sum(running.values()) == 3)
+    assert running == {'A': 2, 'B': 1}
+    assert pool.pending() == 2
+
+    release.set()
+    results = [future.result(5) for future in futures]
+    assert all(result.success for result in results)
+    assert peak == {'A': 2, 'B': 1}
+
+
+def test_retryable_failures_are_requeued(make_pool, video):
+    def upload(task):
+        task.attempts += 1
+        if task.attempts < 3:
+            return UploadResult(False, attempts=task.attempts, error="timeout", retryable=True)
+        return UploadResult(True, filecode='abc', attempts=task.attempts)
+
+    result = make_pool(upload).submit(video, api_key='A').result(5)
+
+    assert result.success
+    assert result.attempts == 3
+
+
+def test_retries_are_bounded(make_pool, video):
+    def upload(task):
+        task.attempts += 1
+        return UploadResult(False, attempts=task.attempts, error="502", retryable=True)
+
+    result = make_pool(upload).submit(video, api_key='A').result(5)
+
+    assert not result.success
+    assert result.attempts == DownloadConfig.UPLOAD_RETRIES + 1
+
+
+def test_permanent_failure_is_not_retried(make_pool, video):
+    def upload(task):
+        task.attempts += 1
+        return UploadResult(False, attempts=task.attempts, error="Invalid key")
+
+    result = make_pool(upload).submit(video, api_key='A').result(5)
+
+    assert not result.success
+    assert result.attempts == 1
+
+
+def test_cancel_while_waiting_for_retry(make_pool, video, monkeypatch):
+    monkeypatch.setattr(DownloadConfig, 'UPLOAD_RETRY_DELAY', 30)
+
+    def upload(task):
+        task.attempts += 1
+        return UploadResult(False, attempts=task.attempts, error="timeout", retryable=True)
+
+    pool = make_pool(upload)
+    future = pool.submit(video, api_key='A')
+    _wait_until(lambda: pool.pending() == 1 and pool._queue[0].attempts == 1)
+
+    started = time.monotonic()
+    assert pool.cancel(future)
+    result = future.result(5)
+
+    assert time.monotonic() - started < 1
+    assert not result.success and result.error == "Cancelado"
+    assert pool.pending() == 0
+    assert not pool.cancel(future)
+
+
+def test_cancelled_tasks_resolve_outside_the_lock(make_pool, video):
+    release = threading.Event()
+
+    def upload(task):
+        task.attempts += 1
+        release.wait(5)
+        return UploadResult(True, filecode='abc', attempts=task.attempts)
+
+    pool = make_pool(upload, workers=1)
+    first = pool.submit(video, api_key='A')
+    cancel_event = threading.Event()
+    second = pool.submit(video, api_key='A', cancel_event=cancel_event)
+
+    lock_held = []
+    second.add_done_callback(lambda future: lock_held.append(pool._cond._is_owned()))
+    cancel_event.set()
+    release.set()
+
+    assert first.result(5).success
+    assert second.result(5).error == "Cancelado"
+    assert lock_held == [False]
@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+from opciones.opcion1.video_store import StoredVideo, VideoStore, file_sha256
+
+
+@pytest.fixture
+def store(tmp_path):
+    return VideoStore(tmp_path / 'store.db')
+
+
+def _write(path, content):
+    path.write_bytes(content)
+    return path
+
+
+def test_add_registers_size_and_hash(store, tmp_path):
+    path = _write(tmp_path / 'video-ph1.mp4', b'a' * 1024)
+    video = store.add('ph1', path, title='Video', source_url='https://example.com/v?viewkey=ph1')
+
+    assert video.size == 1024
+    assert video.sha256 == file_sha256(path)
+    assert video.is_local and not video.is_uploaded
+    assert store.contains('ph1')
+    assert store.find_by_path(path) is video
+    assert not store.contains('ph2')
+
+
+def test_add_missing_file_keeps_record_without_copy(store, tmp_path):
+    video = store.add('ph1', tmp_path / 'borrado.mp4')
+
+    assert not video.is_local
+    assert not store.contains('ph1')
+
+
+def test_path_for(store, tmp_path):
+    assert store.path_for(tmp_path, 'titulo', 'ph5f1a') == tmp_path / 'titulo-ph5f1a.mp4'
+    assert store.path_for(tmp_path, 'titulo', 'ph5f1a', '.jpg') == tmp_path / 'titulo-ph5f1a.jpg'
+    assert store.path_for(tmp_path, 'titulo', None) == tmp_path / 'titulo.mp4'
+    # Un ID que no es un token corto (la URL) se resume
+    name = store.path_for(tmp_path, 'titulo', 'https://example.com/video/7').name
+    assert name.startswith('titulo-') and len(name) == len('titulo-') + 12 + len('.mp4')
+
+
+def test_duplicate_content_reuses_existing_file(store, tmp_path):
+    first = _write(tmp_path / 'a-ph1.mp4', b'mismo contenido')
+    second = _write(tmp_path / 'b-ph2.mp4', b'mismo contenido')
+
+    store.add('ph1', first)
+    video = store.add('ph2', second)
+
+    assert not second.exists()
+    assert video.path == str(first)
+    assert {v.video_id for v in store._sharing(first)} == {'ph1', 'ph2'}
+
+
+def test_shared_file_evictable_only_when_all_uploaded(store, tmp_path):
+    path = _write(tmp_path / 'a-ph1.mp4', b'x' * 10)
+    store.add('ph1', path)
+    store.add('ph2', _write(tmp_path / 'b-ph2.mp4', b'x' * 10))
+
+    store.mark_uploaded('ph1', 'code1')
+    assert store.find_by_path(path).video_id == 'ph1'
+    assert not store.is_evictable('ph1')
+    assert store.evictable() == []
+
+    store.mark_uploaded('ph2', 'code2')
+    assert store.is_evictable('ph1') and store.is_evictable('ph2')
+    assert len(store.evictable()) == 1
+
+    os.unlink(path)
+    store.mark_evicted('ph1')
+    for video_id in ('ph1', 'ph2'):
+        video = store.get(video_id)
+        assert not video.is_local and video.is_uploaded
+        assert store.contains(video_id)
+    assert store.find_by_path(path) is None
+    assert store.evictable() == []
+
+
+def test_evictable_oldest_first(store, tmp_path):
+    for index, video_id in enumerate(('ph1', 'ph2', 'ph3')):
+        store.add(video_id, _write(tmp_path / f'{video_id}.mp4', bytes([index]) * 10))
+        store.mark_uploaded(video_id, f'code-{video_id}')
+    store.mark_upload_failed('ph3')   # Ya subido: no cambia
+    store.touch('ph1')
+
+    assert [video.video_id for video in store.evictable()] == ['ph2', 'ph3', 'ph1']
+
+
+def test_mark_uploaded_after_file_removed(store, tmp_path):
+    path = _write(tmp_path / 'ph1.mp4', b'x')
+    store.add('ph1', path)
+    os.unlink(path)
+
+    video = store.mark_uploaded('ph1', 'code1')
+    assert not video.is_local
+    assert store.find_by_path(path) is None
+
+
+def test_reload_checks_files(tmp_path):
+    store = VideoStore(tmp_path / 'store.db')
+    kept = _write(tmp_path / 'ph1.mp4', b'1')
+    gone = _write(tmp_path / 'ph2.mp4', b'2')
+    store.add('ph1', kept)
+    store.add('ph2', gone)
+    store.mark_uploaded('ph2', 'code2')
+    store.mark_upload_failed('ph1')
+    os.unlink(gone)
+
+    reloaded = VideoStore(tmp_path / 'store.db')
+    assert reloaded.get('ph1').is_local
+    assert reloaded.get('ph1').upload_status == StoredVideo.FAILED
+    assert not reloaded.get('ph2').is_local
+    assert reloaded.get('ph2').filecode == 'code2'
+    assert reloaded.contains('ph2')
+
+
+def test_forget(store, tmp_path):
+    path = _write(tmp_path / 'ph1.mp4', b'1')
+    store.add('ph1', path)
+
+    assert store.forget('ph1')
+    assert not store.forget('ph1')
+    assert store.get('ph1') is None
+    assert path.exists()
@@ -8,6 +8,7 @@ from PyQt5.QtGui import QIcon, QFont
 
 from opciones.opcion1.ui import Opcion1Widget
 from ui.styles import dark_style_sheet
+from utils.progress import format_bytes, format_eta
 
 # Importar manejo de base de datos
 try:
@@ -813,6 +814,16 @@ class MainWindow(QMainWindow):
         if value == 100:
             self.upload_progress.setFormat("☁️ Upload completado!")
     
+    def update_download_stats(self, speed, eta):
+        """Muestra velocidad y tiempo restante en la barra de descarga"""
+        if self.download_progress.value() < 100:
+            self.download_progress.setFormat(f"Descargando... %p% · {format_bytes(speed)}/s · {format_eta(eta)}")
+    
+    def update_upload_stats(self, speed, eta):
+        """Muestra velocidad y tiempo restante en la barra de upload"""
+        if self.upload_progress.value() < 100:
+            self.upload_progress.setFormat(f"Subiendo a StreamWish... %p% · {format_bytes(speed)}/s · {format_eta(eta)}")
+    
     def update_progress_status(self, status_text):
         """Actualiza solo el texto de estado"""
         self.progress_status.setText(status_text)
@@ -179,20 +179,6 @@ class TaskCreationDialog(QDialog):
         advanced_group = QGroupBox("🔧 Configuración Avanzada")
         advanced_layout = QVBoxLayout(advanced_group)
         
-        # Delay entre videos
-        delay_layout = QHBoxLayout()
-        delay_layout.addWidget(QLabel("Delay entre videos (segundos):"))
-        self.delay_min_input = QSpinBox()
-        self.delay_min_input.setRange(0, 60)
-        self.delay_min_input.setValue(1)
-        delay_layout.addWidget(self.delay_min_input)
-        delay_layout.addWidget(QLabel("a"))
-        self.delay_max_input = QSpinBox()
-        self.delay_max_input.setRange(0, 60)
-        self.delay_max_input.setValue(3)
-        delay_layout.addWidget(self.delay_max_input)
-        advanced_layout.addLayout(delay_layout)
-        
         # Saltar existentes
         self.skip_existing_checkbox = QCheckBox("⏭️ Saltar videos ya existentes")
         self.skip_existing_checkbox.setChecked(True)
@@ -350,7 +336,6 @@ class TaskCreationDialog(QDialog):
         # Crear configuración de la tarea
         config = {
             'max_videos_per_run': self.max_videos_input.value(),
-            'delay_between_videos': (self.delay_min_input.value(), self.delay_max_input.value()),
             'auto_publish': self.auto_publish_checkbox.isChecked(),
             'skip_existing': self.skip_existing_checkbox.isChecked(),
             'max_retries': 3,
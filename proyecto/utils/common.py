@@ -3,9 +3,10 @@ import logging
 import time
 import random
 from PyQt5.QtGui import QPixmap, QImage
-import requests
 from io import BytesIO
 
+from utils.http_client import get_http_client
+
 def setup_logger(name, log_file=None, level=logging.INFO):
     """
     Configura y devuelve un logger
@@ -43,7 +44,7 @@ def load_image_from_url(url, default_pixmap=None):
         if not url.startswith(('http://', 'https://')):
             return default_pixmap if default_pixmap else QPixmap()
             
-        response = requests.get(url, headers=headers, stream=True, timeout=10)
+        response = get_http_client().get(url, headers=headers, timeout=10)
         if response.status_code == 200:
             image = QImage()
             image.loadFromData(response.content)
@@ -0,0 +1,128 @@
+# proyecto/utils/ffmpeg.py
+import logging
+import re
+import shutil
+import subprocess
+import threading
+
+logger = logging.getLogger(__name__)
+
+_VERSION_RE = re.compile(r'ffmpeg version (\S+)')
+_MUXER_RE = re.compile(r'^[ \t]*[D ]E[ d]?[ \t]+(\S+)', re.MULTILINE)
+
+
+class FfmpegCapabilities:
+    """
+    Rutas, versión y muxers/filtros de bitstream disponibles de ffmpeg
+
+    muxers/bsfs son None si no se pudieron consultar: en ese caso se dan
+    por soportados (ffmpeg está instalado y lo normal es que los tenga).
+    """
+    __slots__ = ('ffmpeg_path', 'ffprobe_path', 'version', 'muxers', 'bsfs', 'probe_error')
+
+    def __init__(self, ffmpeg_path=None, ffprobe_path=None, version=None, muxers=None, bsfs=None,
+                 probe_error=None):
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.version = version
+        self.muxers = frozenset(muxers) if muxers is not None else None
+        self.bsfs = frozenset(bsfs) if bsfs is not None else None
+        self.probe_error = probe_error  # Consultas fallidas (ffmpeg sigue disponible)
+
+    @property
+    def available(self):
+        return self.ffmpeg_path is not None
+
+    def supports_muxer(self, name):
+        return self.muxers is None or name in self.muxers
+
+    def supports_bsf(self, name):
+        return self.bsfs is None or name in self.bsfs
+
+
+def _run(args):
+    result = subprocess.run(args, capture_output=True, text=True, timeout=15)
+    if result.returncode != 0:
+        raise subprocess.SubprocessError(f"{args[-1]}: código de salida {result.returncode}")
+    return result.stdout
+
+
+def probe_ffmpeg():
+    """
+    Localiza ffmpeg/ffprobe y consulta versión, muxers y filtros de bitstream
+
+    Si ffmpeg está en el PATH se considera disponible aunque alguna consulta
+    falle o tarde demasiado; lo que no se pudo consultar queda como
+    desconocido y el fallo se guarda en probe_error.
+
+    Returns:
+        FfmpegCapabilities (available es False si ffmpeg no está en el PATH)
+    """
+    ffmpeg_path = shutil.which('ffmpeg')
+    ffprobe_path = shutil.which('ffprobe')
+    if not ffmpeg_path:
+        logger.warning("⚠️ ffmpeg no encontrado en el PATH")
+        return FfmpegCapabilities(ffprobe_path=ffprobe_path)
+
+    errors = []
+
+    def query(option):
+        # Tras un timeout no se insiste: las demás consultas tardarían lo mismo
+        if any(isinstance(error, subprocess.TimeoutExpired) for error in errors):
+            return None
+        try:
+            return _run([ffmpeg_path, '-hide_banner', option])
+        except (OSError, subprocess.SubprocessError) as e:
+            errors.append(e)
+            logger.debug(f"ffmpeg {option}: {str(e)}")
+            return None
+
+    version_output = query('-version')
+    version_match = _VERSION_RE.search(version_output) if version_output else None
+
+    # -muxers lista "  E mp4  MP4 (MPEG-4 Part 14)"; -bsfs un nombre por línea.
+    # Una lista vacía es un formato que no se entiende: desconocido
+    muxers_output = query('-muxers')
+    muxers = _MUXER_RE.findall(muxers_output.split('--', 1)[-1]) if muxers_output else []
+    bsfs_output = query('-bsfs')
+    bsfs = [line.strip() for line in bsfs_output.splitlines()[1:] if line.strip()] if bsfs_output else []
+
+    capabilities = FfmpegCapabilities(
+        ffmpeg_path=ffmpeg_path,
+        ffprobe_path=ffprobe_path,
+        version=version_match.group(1) if version_match else None,
+        muxers=muxers or None,
+        bsfs=bsfs or None,
+        probe_error='; '.join(str(error) for error in errors) or None,
+    )
+    if capabilities.probe_error:
+        logger.warning(f"⚠️ No se pudo consultar ffmpeg ({capabilities.probe_error}); "
+                       f"se usará {ffmpeg_path} asumiendo muxers y filtros estándar")
+    else:
+        logger.info(f"🎬 ffmpeg {capabilities.version or '?'}: {len(capabilities.muxers or ())} muxers, "
+                    f"{len(capabilities.bsfs or ())} filtros de bitstream")
+    return capabilities
+
+
+_capabilities = None
+_capabilities_lock = threading.Lock()
+
+
+def get_ffmpeg_capabilities(refresh=False):
+    """
+    Devuelve las capacidades de ffmpeg (se consultan una vez por proceso)
+
+    Args:
+        refresh: volver a consultar (p. ej. después de instalar ffmpeg)
+    """
+    global _capabilities
+    if _capabilities is None or refresh:
+        with _capabilities_lock:
+            if _capabilities is None or refresh:
+                _capabilities = probe_ffmpeg()
+    return _capabilities
+
+
+def warm_ffmpeg_capabilities():
+    """Lanza la consulta en segundo plano para que la primera descarga no espere"""
+    threading.Thread(target=get_ffmpeg_capabilities, name='ffmpeg-probe', daemon=True).start()
@@ -0,0 +1,304 @@
+# proyecto/utils/ftp_pool.py
+"""
+Pool de sesiones FTP reutilizables
+
+Conectar, hacer login y entrar en la carpeta son varios viajes de ida y
+vuelta a un servidor lejano: cuesta más que subir la miniatura. El pool
+mantiene abiertas unas pocas sesiones ya autenticadas, las mantiene vivas
+con NOOP y reconecta sin que se note si el servidor cerró una por
+inactividad.
+"""
+import ftplib
+import logging
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class FtpPoolConfig:
+    """Configuración del pool de sesiones FTP"""
+
+    POOL_SIZE = 2              # Sesiones abiertas como máximo por servidor y usuario
+    TIMEOUT = 60               # Segundos para conectar y para cada operación
+    ACQUIRE_TIMEOUT = 120      # Espera máxima por una sesión libre
+    CHECK_IDLE_AFTER = 30      # Una sesión sin usar más tiempo se comprueba con NOOP antes de darla
+    KEEPALIVE_INTERVAL = 60    # NOOP en segundo plano a las sesiones libres
+    MAX_IDLE = 10 * 60         # Sesiones libres más tiempo se cierran
+
+
+# Errores que indican una sesión muerta (cerrada por el servidor o la red).
+# No incluye OSError en general (archivo local) ni error_temp (4xx con la
+# sesión sana): esos se propagan sin descartar la sesión.
+STALE_ERRORS = (EOFError, ConnectionError, socket.timeout, ftplib.error_reply, ftplib.error_proto)
+
+
+def is_stale(error):
+    """True si el error deja la sesión inservible (421: el servidor cierra el control)"""
+    if isinstance(error, STALE_ERRORS):
+        return True
+    return isinstance(error, ftplib.error_temp) and str(error).startswith('421')
+
+
+class FtpSession:
+    """Una conexión FTP autenticada y el directorio en el que está"""
+    __slots__ = ('ftp', 'cwd', 'created_at', 'last_used', 'checked_at', 'uses')
+
+    def __init__(self, ftp):
+        self.ftp = ftp
+        self.cwd = None  # Desconocido hasta el primer change_dir
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.checked_at = self.created_at  # Último uso o NOOP correcto
+        self.uses = 0
+
+    def change_dir(self, path):
+        """cwd absoluto desde la raíz FTP (no hace nada si ya está ahí)"""
+        path = '/' + path.strip('/')
+        if self.cwd != path:
+            self.cwd = None
+            self.ftp.cwd(path)
+            self.cwd = path
+
+    def close(self):
+        try:
+            self.ftp.quit()
+        except Exception:
+            try:
+                self.ftp.close()
+            except Exception:
+                pass
+
+
+class FtpPool:
+    """
+    Sesiones FTP compartidas entre hilos para un servidor y usuario
+
+    run(fn) presta una sesión a fn(session) y la devuelve al pool. Si una
+    sesión reutilizada resulta estar muerta se descarta y fn se repite una
+    vez con una conexión nueva. Las carpetas que ya se vieron o crearon se
+    recuerdan para no recorrerlas en cada upload.
+    """
+
+    def __init__(self, host, port, user, password, size=None, config=FtpPoolConfig):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.config = config
+        self.size = size or config.POOL_SIZE
+
+        self._idle = []          # FtpSession libres (la última usada al final)
+        self._open = 0           # Sesiones abiertas (libres + prestadas)
+        self._known_dirs = set()
+        self._cond = threading.Condition()
+        self._keepalive = None
+        self._closed = False
+
+    # Sesiones
+
+    def _connect(self):
+        logger.info(f"🔗 Conectando por FTP a {self.host}...")
+        ftp = ftplib.FTP(timeout=self.config.TIMEOUT)
+        try:
+            ftp.connect(self.host, self.port)
+            ftp.login(self.user, self.password)
+        except BaseException:
+            ftp.close()
+            raise
+        return FtpSession(ftp)
+
+    @staticmethod
+    def _alive(session):
+        try:
+            session.ftp.voidcmd('NOOP')
+        except Exception:
+            return False
+        session.checked_at = time.monotonic()
+        return True
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.config.ACQUIRE_TIMEOUT
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("El pool FTP está cerrado")
+                if self._idle:
+                    session = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    session = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Sin sesión FTP libre tras {self.config.ACQUIRE_TIMEOUT}s")
+                self._cond.wait(remaining)
+
+        if session is not None:
+            # Una sesión parada un rato puede haber caducado en el servidor
+            if time.monotonic() - session.checked_at < self.config.CHECK_IDLE_AFTER or self._alive(session):
+                return session
+            logger.info("🔁 Sesión FTP caducada, reconectando")
+            session.close()
+
+        try:
+            return self._connect()
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify_all()
+            raise
+
+    def _release(self, session):
+        session.last_used = session.checked_at = time.monotonic()
+        session.uses += 1
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                session.close()
+                return
+            self._idle.append(session)
+            self._cond.notify_all()
+            self._ensure_keepalive()
+
+    def _discard(self, session):
+        session.close()
+        with self._cond:
+            self._open -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def session(self):
+        """Presta una sesión (se descarta si la conexión falla dentro del with)"""
+        session = self._acquire()
+        try:
+            yield session
+        except BaseException as e:
+            if is_stale(e):
+                self._discard(session)
+            else:
+                self._release(session)
+            raise
+        self._release(session)
+
+    def run(self, fn):
+        """
+        Ejecuta fn(session) con una sesión del pool
+
+        Si falla la conexión de una sesión reutilizada, reintenta una vez con
+        una sesión nueva (fn debe poder repetirse: STOR sobrescribe).
+        """
+        for attempt in (1, 2):
+            session = self._acquire()
+            reused = session.uses > 0
+            try:
+                result = fn(session)
+            except BaseException as e:
+                if not is_stale(e):
+                    self._release(session)
+                    raise
+                self._discard(session)
+                if reused and attempt == 1:
+                    logger.info(f"🔁 Sesión FTP cerrada por el servidor ({str(e)}), reintentando")
+                    continue
+                raise
+            self._release(session)
+            return result
+
+    # Carpetas
+
+    def ensure_dir(self, session, path):
+        """
+        Entra en path (relativa a la raíz FTP) creando lo que falte
+
+        Las carpetas ya conocidas se entran con un solo CWD (o ninguno si la
+        sesión ya está ahí).
+        """
+        target = '/' + path.strip('/')
+        if target in self._known_dirs:
+            try:
+                session.change_dir(target)
+                return
+            except ftplib.error_perm:
+                # Borrada en el servidor: volver a crearla
+                self._known_dirs.discard(target)
+
+        current = ''
+        for part in path.strip('/').split('/'):
+            current = f"{current}/{part}"
+            if current in self._known_dirs:
+                continue
+            try:
+                session.change_dir(current)
+            except ftplib.error_perm:
+                session.ftp.mkd(current)
+                logger.info(f"📁 Directorio creado: {current}")
+                session.change_dir(current)
+            self._known_dirs.add(current)
+        session.change_dir(target)
+
+    # Mantenimiento
+
+    def _ensure_keepalive(self):
+        if self._keepalive is None or not self._keepalive.is_alive():
+            self._keepalive = threading.Thread(target=self._keepalive_loop, name='ftp-keepalive', daemon=True)
+            self._keepalive.start()
+
+    def _keepalive_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait(self.config.KEEPALIVE_INTERVAL)
+                if self._closed or not self._idle:
+                    self._keepalive = None
+                    return
+                # Solo se sacan del pool las que tocan (NOOP es un viaje de red);
+                # las demás siguen disponibles mientras tanto
+                now = time.monotonic()
+                due = [session for session in self._idle
+                       if now - session.checked_at >= self.config.KEEPALIVE_INTERVAL]
+                if not due:
+                    continue
+                self._idle = [session for session in self._idle if session not in due]
+
+            alive = []
+            for session in due:
+                if now - session.last_used > self.config.MAX_IDLE or not self._alive(session):
+                    self._discard(session)
+                else:
+                    alive.append(session)
+
+            with self._cond:
+                # Las devueltas mientras tanto son más recientes: van al final
+                self._idle = alive + self._idle
+                if alive:
+                    self._cond.notify_all()
+
+    def close(self):
+        """Cierra las sesiones libres (las prestadas se cierran al devolverlas)"""
+        with self._cond:
+            self._closed = True
+            sessions, self._idle = self._idle, []
+            self._open -= len(sessions)
+            self._cond.notify_all()
+        for session in sessions:
+            session.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_ftp_pool(host, port, user, password):
+    """
+    Devuelve el pool compartido para ese servidor y usuario
+    """
+    key = (host, port, user)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = FtpPool(host, port, user, password)
+            _pools[key] = pool
+        return pool
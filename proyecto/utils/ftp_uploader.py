@@ -1,14 +1,14 @@
 # proyecto/utils/ftp_uploader.py - ARCHIVO COMPLETO CORREGIDO (SIN post_id)
 import ftplib
-import os
-import tempfile
-import requests
+import io
 import logging
 import time
 from datetime import datetime
-from pathlib import Path
 import re
 
+from utils.http_client import get_http_client
+from utils.ftp_pool import get_ftp_pool
+
 logger = logging.getLogger(__name__)
 
 class FTPUploader:
@@ -33,6 +33,12 @@ class FTPUploader:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Referer': 'https://es.pornhub.com/'
         }
+        
+        # Cliente HTTP compartido (conexiones keep-alive reutilizadas)
+        self.session = get_http_client()
+        
+        # Sesiones FTP compartidas (sin conectar ni hacer login en cada imagen)
+        self.ftp_pool = get_ftp_pool(self.ftp_host, self.ftp_port, self.ftp_user, self.ftp_pass)
     
     def upload_image_from_url(self, image_url, post_title, post_id=None):
         """
@@ -51,7 +57,7 @@ class FTPUploader:
             logger.info(f"📥 Descargando imagen: {image_url}")
             print(f"📥 Descargando imagen desde: {image_url}")
             
-            response = requests.get(image_url, headers=self.headers, timeout=30)
+            response = self.session.get(image_url, headers=self.headers, timeout=30)
             if response.status_code != 200:
                 logger.error(f"❌ Error descargando imagen: {response.status_code}")
                 return None
@@ -96,47 +102,40 @@ class FTPUploader:
         Sube datos de imagen por FTP
         Usuario FTP ya inicia en: /home/xpleasure/public_html/wp-content/uploads
         """
-        ftp = None
-        temp_file = None
-        
-        try:
-            # Crear archivo temporal
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-            temp_file.write(image_data)
-            temp_file.close()
-            
-            # Conectar por FTP
-            logger.info(f"🔗 Conectando por FTP a {self.ftp_host}...")
-            print(f"🔗 Conectando FTP: {self.ftp_user}@{self.ftp_host}")
-            
-            ftp = ftplib.FTP()
-            ftp.connect(self.ftp_host, self.ftp_port)
-            ftp.login(self.ftp_user, self.ftp_pass)
-            
-            # Verificar directorio actual (debería ser "/" pero realmente wp-content/uploads)
-            current_dir = ftp.pwd()
-            logger.info(f"📁 FTP Home: {current_dir} (wp-content/uploads)")
-            print(f"📁 Conectado a wp-content/uploads")
-            
+        def upload(session):
             # Crear estructura de carpetas si es necesaria
             upload_path = ""
             if remote_folder:
-                success = self._create_ftp_directories(ftp, remote_folder)
-                if success:
+                try:
+                    self.ftp_pool.ensure_dir(session, remote_folder)
                     upload_path = remote_folder
-                    logger.info(f"✅ Estructura creada: {remote_folder}")
-                else:
-                    logger.warning(f"⚠️ No se pudo crear {remote_folder}, subiendo en root")
-                    ftp.cwd("/")  # Volver al root si falla
-                    upload_path = ""
+                except ftplib.error_perm as e:
+                    logger.warning(f"⚠️ No se pudo crear {remote_folder} ({str(e)}), subiendo en root")
+                    session.change_dir("/")  # Volver al root si falla
+            else:
+                session.change_dir("/")
             
             # Subir archivo
             logger.info(f"📤 Subiendo {filename}...")
             print(f"📤 Subiendo: {filename}")
+            result = session.ftp.storbinary(f'STOR {filename}', io.BytesIO(image_data))
+            logger.info(f"📤 Resultado FTP: {result}")
             
-            with open(temp_file.name, 'rb') as f:
-                result = ftp.storbinary(f'STOR {filename}', f)
-                logger.info(f"📤 Resultado FTP: {result}")
+            # Verificar que se subió (SIZE: sin listar toda la carpeta)
+            try:
+                remote_size = session.ftp.size(filename)
+                if remote_size == len(image_data):
+                    logger.info(f"✅ Verificado: {filename} existe en servidor")
+                    print(f"✅ Archivo confirmado en servidor")
+                else:
+                    logger.warning(f"⚠️ {filename} en servidor con {remote_size} bytes de {len(image_data)}")
+            except ftplib.error_perm:
+                logger.info("ℹ️ No se pudo verificar el tamaño")
+            return upload_path
+        
+        try:
+            print(f"🔗 FTP: {self.ftp_user}@{self.ftp_host}")
+            upload_path = self.ftp_pool.run(upload)
             
             # Construir URL web final
             if upload_path:
@@ -147,31 +146,9 @@ class FTPUploader:
             # Limpiar URL (quitar dobles barras)
             web_url = web_url.replace("//", "/").replace("http:/", "http://").replace("https:/", "https://")
             
-            # LÍNEAS DE DEBUG AGREGADAS:
-            logger.info(f"🔗 URL base: {self.web_base_url}")
-            logger.info(f"📂 Ruta upload: {upload_path}")
-            logger.info(f"📄 Nombre archivo: {filename}")
             logger.info(f"🌐 URL construida: {web_url}")
-            print(f"🔗 Construyendo URL:")
-            print(f"   Base: {self.web_base_url}")
-            print(f"   Carpeta: {upload_path}")
-            print(f"   Archivo: {filename}")
-            print(f"   Final: {web_url}")
-            
             logger.info(f"✅ Archivo subido correctamente")
             print(f"🌐 URL final: {web_url}")
-            
-            # Verificar que se subió
-            try:
-                files = ftp.nlst()
-                if filename in files:
-                    logger.info(f"✅ Verificado: {filename} existe en servidor")
-                    print(f"✅ Archivo confirmado en servidor")
-                else:
-                    logger.warning(f"⚠️ {filename} no encontrado en listado")
-            except:
-                logger.info("ℹ️ No se pudo verificar listado")
-            
             return web_url
             
         except ftplib.all_errors as e:
@@ -182,22 +159,6 @@ class FTPUploader:
             logger.error(f"❌ Error general: {str(e)}")
             print(f"❌ Error general: {str(e)}")
             return None
-        finally:
-            # Limpiar recursos
-            if ftp:
-                try:
-                    ftp.quit()
-                except:
-                    try:
-                        ftp.close()
-                    except:
-                        pass
-            
-            if temp_file and os.path.exists(temp_file.name):
-                try:
-                    os.unlink(temp_file.name)
-                except:
-                    pass
 
     def _create_ftp_directories(self, ftp, path):
         """
@@ -312,24 +273,21 @@ class FTPUploader:
             logger.info(f"🧪 Probando conexión FTP a {self.ftp_host}...")
             print(f"🧪 Test FTP: {self.ftp_user}@{self.ftp_host}")
             
-            ftp = ftplib.FTP()
-            ftp.connect(self.ftp_host, self.ftp_port)
-            ftp.login(self.ftp_user, self.ftp_pass)
-            
-            # Ver directorio actual
-            current_dir = ftp.pwd()
-            print(f"📁 Directorio base: {current_dir}")
-            
-            # Listar contenido
-            try:
-                files = ftp.nlst()
-                logger.info(f"✅ Conexión FTP exitosa. Archivos/carpetas: {len(files)}")
-                print(f"✅ FTP OK. Contenido: {files[:5]}")  # Mostrar primeros 5
-            except:
-                logger.info("✅ Conexión FTP exitosa (directorio vacío)")
-                print("✅ FTP OK (directorio vacío)")
-            
-            ftp.quit()
+            def check(session):
+                # Ver directorio base
+                session.change_dir("/")
+                print(f"📁 Directorio base: {session.ftp.pwd()}")
+                
+                # Listar contenido
+                try:
+                    files = session.ftp.nlst()
+                    logger.info(f"✅ Conexión FTP exitosa. Archivos/carpetas: {len(files)}")
+                    print(f"✅ FTP OK. Contenido: {files[:5]}")  # Mostrar primeros 5
+                except ftplib.error_perm:
+                    logger.info("✅ Conexión FTP exitosa (directorio vacío)")
+                    print("✅ FTP OK (directorio vacío)")
+            
+            self.ftp_pool.run(check)
             return True
             
         except Exception as e:
@@ -351,53 +309,53 @@ class FTPUploader:
             print(f"🔢 Puerto: {self.ftp_port}")
             print(f"🌐 URL base: {self.web_base_url}")
             
-            # Conectar
-            ftp = ftplib.FTP()
-            ftp.connect(self.ftp_host, self.ftp_port)
-            ftp.login(self.ftp_user, self.ftp_pass)
-            
-            # Información básica
-            print(f"✅ Conexión exitosa")
-            print(f"📁 Directorio actual: {ftp.pwd()}")
-            print(f"📁 Directorio real: /home/xpleasure/public_html/wp-content/uploads")
-            
-            # Listar contenido
-            try:
-                files = ftp.nlst()
-                print(f"📋 Archivos/carpetas encontradas: {len(files)}")
-                for i, file in enumerate(files[:10]):  # Mostrar primeros 10
-                    print(f"   {i+1}. {file}")
-                if len(files) > 10:
-                    print(f"   ... y {len(files) - 10} más")
-            except Exception as e:
-                print(f"⚠️ No se pudo listar contenido: {str(e)}")
-            
-            # Probar crear directorio de prueba
-            test_dir = "test_upload_" + str(int(time.time()))
-            try:
-                ftp.mkd(test_dir)
-                print(f"✅ Permisos de escritura: OK (creado {test_dir})")
-                ftp.rmd(test_dir)
-                print(f"✅ Permisos de eliminación: OK (eliminado {test_dir})")
-            except Exception as e:
-                print(f"❌ Error de permisos: {str(e)}")
-            
-            # Probar crear estructura año/mes
-            current_year = datetime.now().year
-            current_month = datetime.now().strftime('%m')
-            test_structure = f"{current_year}/{current_month}"
-            
-            print(f"\n🗂️ Probando estructura: {test_structure}")
-            success = self._create_ftp_directories(ftp, test_structure)
-            if success:
-                print(f"✅ Estructura {test_structure} creada/verificada correctamente")
-            else:
-                print(f"❌ Error creando estructura {test_structure}")
+            # Conectar (sesión del pool)
+            with self.ftp_pool.session() as session:
+                session.change_dir("/")
+                ftp = session.ftp
+                
+                # Información básica
+                print(f"✅ Conexión exitosa")
+                print(f"📁 Directorio actual: {ftp.pwd()}")
+                print(f"📁 Directorio real: /home/xpleasure/public_html/wp-content/uploads")
+                
+                # Listar contenido
+                try:
+                    files = ftp.nlst()
+                    print(f"📋 Archivos/carpetas encontradas: {len(files)}")
+                    for i, file in enumerate(files[:10]):  # Mostrar primeros 10
+                        print(f"   {i+1}. {file}")
+                    if len(files) > 10:
+                        print(f"   ... y {len(files) - 10} más")
+                except Exception as e:
+                    print(f"⚠️ No se pudo listar contenido: {str(e)}")
+                
+                # Probar crear directorio de prueba
+                test_dir = "test_upload_" + str(int(time.time()))
+                try:
+                    ftp.mkd(test_dir)
+                    print(f"✅ Permisos de escritura: OK (creado {test_dir})")
+                    ftp.rmd(test_dir)
+                    print(f"✅ Permisos de eliminación: OK (eliminado {test_dir})")
+                except Exception as e:
+                    print(f"❌ Error de permisos: {str(e)}")
+                
+                # Probar crear estructura año/mes
+                current_year = datetime.now().year
+                current_month = datetime.now().strftime('%m')
+                test_structure = f"{current_year}/{current_month}"
+                
+                print(f"\n🗂️ Probando estructura: {test_structure}")
+                success = self._create_ftp_directories(ftp, test_structure)
+                session.cwd = None  # _create_ftp_directories cambió de carpeta
+                if success:
+                    print(f"✅ Estructura {test_structure} creada/verificada correctamente")
+                else:
+                    print(f"❌ Error creando estructura {test_structure}")
             
-            ftp.quit()
             print("✅ Diagnóstico completado")
             return True
             
         except Exception as e:
             print(f"❌ Error en diagnóstico: {str(e)}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,287 @@
+# proyecto/utils/http_cache.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from utils.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+
+class HttpCacheConfig:
+    """Configuración de la caché HTTP en disco"""
+
+    CACHE_DIR = Path.home() / ".pornhub_downloader" / "http_cache"
+    TTL_SECONDS = 300                    # Se sirve sin revalidar durante este tiempo
+    MAX_AGE_SECONDS = 7 * 24 * 3600      # Entradas más antiguas se eliminan
+    MAX_BYTES = 64 * 1024 * 1024         # Tamaño máximo total (LRU)
+
+
+class CachedPage:
+    """Respuesta servida por la caché (o descargada y guardada en ella)"""
+
+    __slots__ = ('url', 'status_code', 'text', 'fingerprint', 'from_cache', 'not_modified')
+
+    def __init__(self, url, status_code, text, fingerprint=None, from_cache=False, not_modified=False):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.fingerprint = fingerprint    # sha1 del cuerpo: igual => contenido sin cambios
+        self.from_cache = from_cache      # True si el cuerpo viene del disco
+        self.not_modified = not_modified  # True si el servidor respondió 304
+
+
+class HttpCache:
+    """
+    Caché HTTP en disco indexada por URL
+
+    Guarda el cuerpo junto con ETag/Last-Modified, sirve directamente las
+    entradas frescas (TTL), revalida las demás con GET condicional y elimina
+    entradas por antigüedad y por tamaño total en orden LRU.
+    """
+
+    def __init__(self, cache_dir=None, ttl=None, max_bytes=None, max_age=None, session=None):
+        self.cache_dir = Path(cache_dir or HttpCacheConfig.CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = HttpCacheConfig.TTL_SECONDS if ttl is None else ttl
+        self.max_bytes = max_bytes or HttpCacheConfig.MAX_BYTES
+        self.max_age = max_age or HttpCacheConfig.MAX_AGE_SECONDS
+        self.session = session or get_http_client()
+
+        self._lock = threading.RLock()
+        self._index = {}      # clave -> metadatos
+        self._total_bytes = 0
+        self._load_index()
+
+    def _load_index(self):
+        """Carga los metadatos de todas las entradas existentes"""
+        for meta_path in self.cache_dir.glob('*.json'):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if not (self.cache_dir / f"{meta_path.stem}.body").exists():
+                    meta_path.unlink()
+                    continue
+                self._index[meta_path.stem] = meta
+                self._total_bytes += meta.get('size', 0)
+            except Exception as e:
+                logger.debug(f"Entrada de caché inválida {meta_path.name}: {str(e)}")
+
+        if self._index:
+            logger.info(f"💾 Caché HTTP: {len(self._index)} entradas ({self._total_bytes / (1024*1024):.1f} MB)")
+
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def get(self, url, headers=None, ttl=None):
+        """
+        Obtiene una página usando la caché
+
+        Returns:
+            CachedPage: status_code 200 si hay contenido (de red o de caché)
+        """
+        page, validators = self.lookup(url, ttl)
+        if page is not None:
+            return page
+
+        try:
+            response = self.session.get(url, headers={**(headers or {}), **validators})
+        except Exception as e:
+            # Sin red: servir la copia antigua si existe
+            stale = self.get_stale(url)
+            if stale is not None:
+                logger.warning(f"⚠️ Error de red, sirviendo copia en caché de {url}: {str(e)}")
+                return stale
+            raise
+
+        page = self.record(url, response.status_code, response.headers, response.text)
+        if page is None:
+            # 304 pero el cuerpo desapareció: pedir la página completa
+            response = self.session.get(url, headers=headers)
+            page = self.record(url, response.status_code, response.headers, response.text)
+        return page
+
+    def lookup(self, url, ttl=None):
+        """
+        Primera mitad de una petición con caché (útil para clientes no bloqueantes)
+
+        Returns:
+            tuple: (CachedPage si la entrada está fresca o None,
+                    cabeceras condicionales para revalidar)
+        """
+        key = self._key(url)
+        ttl = self.ttl if ttl is None else ttl
+
+        with self._lock:
+            meta = self._index.get(key)
+            if not meta:
+                return None, {}
+
+            if time.time() - meta['stored_at'] < ttl:
+                body = self._read_body(key)
+                if body is not None:
+                    self._touch(key, meta)
+                    logger.debug(f"💾 Caché fresca: {url}")
+                    return CachedPage(url, 200, body, meta['fingerprint'], from_cache=True), {}
+
+            validators = {}
+            if meta.get('etag'):
+                validators['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                validators['If-Modified-Since'] = meta['last_modified']
+            return None, validators
+
+    def record(self, url, status_code, headers, text):
+        """
+        Segunda mitad: registra la respuesta del servidor
+
+        Returns:
+            CachedPage, o None si fue un 304 cuyo cuerpo ya no está en disco
+        """
+        key = self._key(url)
+
+        if status_code == 304:
+            with self._lock:
+                meta = self._index.get(key)
+                body = self._read_body(key) if meta else None
+                if body is None:
+                    return None
+                meta['stored_at'] = time.time()
+                self._touch(key, meta)
+            logger.debug(f"💾 304 Not Modified: {url}")
+            return CachedPage(url, 200, body, meta['fingerprint'], from_cache=True, not_modified=True)
+
+        if status_code != 200:
+            return CachedPage(url, status_code, text)
+
+        fingerprint = self._store(key, url, headers, text)
+        return CachedPage(url, 200, text, fingerprint)
+
+    def get_stale(self, url):
+        """Devuelve la copia guardada de url aunque haya caducado, o None"""
+        key = self._key(url)
+        with self._lock:
+            meta = self._index.get(key)
+            body = self._read_body(key) if meta else None
+        if body is None:
+            return None
+        return CachedPage(url, 200, body, meta['fingerprint'], from_cache=True)
+
+    def _store(self, key, url, headers, text):
+        data = text.encode('utf-8')
+        fingerprint = hashlib.sha1(data).hexdigest()
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fingerprint': fingerprint,
+            'size': len(data),
+            'stored_at': time.time(),
+            'last_access': time.time(),
+        }
+
+        with self._lock:
+            try:
+                self._write_atomic(self.cache_dir / f"{key}.body", data)
+                self._write_meta(key, meta)
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo guardar en caché {url}: {str(e)}")
+                return fingerprint
+
+            previous = self._index.get(key)
+            if previous:
+                self._total_bytes -= previous.get('size', 0)
+            self._index[key] = meta
+            self._total_bytes += meta['size']
+            self._evict()
+
+        return fingerprint
+
+    def _read_body(self, key):
+        try:
+            with open(self.cache_dir / f"{key}.body", 'rb') as f:
+                return f.read().decode('utf-8')
+        except OSError:
+            return None
+
+    def _touch(self, key, meta):
+        meta['last_access'] = time.time()
+        try:
+            self._write_meta(key, meta)
+        except OSError:
+            pass
+
+    def _write_meta(self, key, meta):
+        self._write_atomic(self.cache_dir / f"{key}.json", json.dumps(meta).encode('utf-8'))
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _evict(self):
+        """Elimina entradas caducadas y, si se supera el tamaño máximo, las menos usadas"""
+        now = time.time()
+        expired = [key for key, meta in self._index.items() if now - meta['stored_at'] > self.max_age]
+        for key in expired:
+            self._remove(key)
+
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        for key, meta in sorted(self._index.items(), key=lambda item: item[1].get('last_access', 0)):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+
+    def _remove(self, key):
+        meta = self._index.pop(key, None)
+        if meta:
+            self._total_bytes -= meta.get('size', 0)
+        for suffix in ('.body', '.json'):
+            try:
+                (self.cache_dir / f"{key}{suffix}").unlink()
+            except OSError:
+                pass
+
+    def invalidate(self, url):
+        """Elimina una URL de la caché"""
+        with self._lock:
+            self._remove(self._key(url))
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def get_stats(self):
+        """Devuelve número de entradas y bytes ocupados"""
+        with self._lock:
+            return {'entries': len(self._index), 'bytes': self._total_bytes}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """
+    Devuelve la caché HTTP compartida por todo el proceso
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = HttpCache()
+    return _cache
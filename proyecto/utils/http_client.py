@@ -0,0 +1,104 @@
+# proyecto/utils/http_client.py
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientConfig:
+    """Configuración del cliente HTTP compartido"""
+
+    # Pools de conexiones keep-alive (uno por host)
+    POOL_CONNECTIONS = 20      # Número de hosts distintos con pool propio
+    POOL_MAXSIZE = 16          # Conexiones reutilizables por host
+    POOL_BLOCK = False         # No bloquear si el pool está lleno (abre una extra)
+
+    # Timeouts por defecto (conexión, lectura) en segundos
+    DEFAULT_TIMEOUT = (10, 30)
+
+    # Política de reintentos (solo métodos idempotentes)
+    RETRY_TOTAL = 3
+    RETRY_BACKOFF_FACTOR = 0.5
+    RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+    RETRY_ALLOWED_METHODS = frozenset(['HEAD', 'GET', 'OPTIONS'])
+
+
+class HttpClient(requests.Session):
+    """
+    Sesión HTTP con pools keep-alive por host, timeouts por defecto y reintentos.
+
+    Es compatible con requests.Session: get/post/head aceptan los mismos
+    argumentos. Si no se indica timeout se usa HttpClientConfig.DEFAULT_TIMEOUT.
+    Cada petición pasa por el limitador por host antes de enviarse.
+    """
+
+    def __init__(self, config=HttpClientConfig, rate_limiter=None):
+        super().__init__()
+        self.config = config
+        self.default_timeout = config.DEFAULT_TIMEOUT
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+        retry = Retry(
+            total=config.RETRY_TOTAL,
+            connect=config.RETRY_TOTAL,
+            read=config.RETRY_TOTAL,
+            status=config.RETRY_TOTAL,
+            backoff_factor=config.RETRY_BACKOFF_FACTOR,
+            status_forcelist=config.RETRY_STATUS_FORCELIST,
+            allowed_methods=config.RETRY_ALLOWED_METHODS,
+            raise_on_status=False,  # Devolver la última respuesta en vez de lanzar
+        )
+
+        adapter = HTTPAdapter(
+            pool_connections=config.POOL_CONNECTIONS,
+            pool_maxsize=config.POOL_MAXSIZE,
+            pool_block=config.POOL_BLOCK,
+            max_retries=retry,
+        )
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.default_timeout
+
+        # Ritmo según peticiones realmente emitidas, no según iteraciones de bucles
+        waited = self.rate_limiter.acquire(url)
+        if waited > 0:
+            logger.debug(f"⏳ Limitador: {waited:.2f}s de espera para {url}")
+
+        return super().request(method, url, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """
+    Devuelve el cliente HTTP compartido por todo el proceso (se crea una sola vez)
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+                logger.info("🌐 Cliente HTTP compartido inicializado")
+    return _client
+
+
+def close_http_client():
+    """
+    Cierra las conexiones del cliente compartido (por ejemplo al salir de la app)
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
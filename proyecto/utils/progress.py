@@ -0,0 +1,166 @@
+# proyecto/utils/progress.py
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressConfig:
+    """Frecuencia de las notificaciones de progreso"""
+
+    MAX_UPDATES_PER_SECOND = 10   # Emisiones máximas por segundo (100% siempre se emite)
+    LOG_EVERY_PERCENT = 10        # Una línea de log cada este porcentaje
+    SPEED_SMOOTHING = 0.3         # Peso de la última medida en la media de velocidad
+
+
+def format_bytes(count):
+    """Tamaño legible (KB, MB, GB)"""
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.1f} {unit}" if unit != 'B' else f"{int(count)} B"
+        count /= 1024.0
+    return f"{count:.2f} GB"
+
+
+def format_eta(seconds):
+    """Tiempo restante como M:SS o H:MM:SS"""
+    if seconds is None or seconds < 0:
+        return '--:--'
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class ProgressAggregator:
+    """
+    Agrupa las actualizaciones de progreso de una transferencia
+
+    Los bucles de transferencia llaman a update() en cada trozo; aquí solo se
+    emite cuando cambia el porcentaje y como mucho MAX_UPDATES_PER_SECOND
+    veces por segundo. También calcula velocidad (media móvil) y tiempo
+    restante, y escribe una línea de log cada LOG_EVERY_PERCENT.
+
+    Args:
+        emit_percent: función (porcentaje 0-100)
+        emit_stats: función opcional (unidades por segundo, ETA en segundos o -1)
+        label: prefijo de las líneas de log (None para no registrar)
+        unit: 'B' para bytes; cualquier otro texto se muestra tal cual ('s'...)
+    """
+
+    def __init__(self, emit_percent, emit_stats=None, label=None, unit='B', config=ProgressConfig):
+        self._emit_percent = emit_percent
+        self._emit_stats = emit_stats
+        self.label = label
+        self.unit = unit
+        self.min_interval = 1.0 / config.MAX_UPDATES_PER_SECOND
+        self.log_every = config.LOG_EVERY_PERCENT
+        self.smoothing = config.SPEED_SMOOTHING
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, total=0):
+        """Empieza una transferencia nueva"""
+        with self._lock:
+            self.total = total or 0
+            self.done = 0
+            self.percent = -1
+            self.speed = 0.0
+            self._started = time.monotonic()
+            self._last_emit = 0.0
+            self._last_sample = (self._started, 0)
+            self._last_logged = 0
+
+    @property
+    def eta(self):
+        """Segundos restantes estimados (None si no se conoce)"""
+        if not self.total or self.speed <= 0:
+            return None
+        return max(self.total - self.done, 0) / self.speed
+
+    def advance(self, count):
+        """Suma count unidades a lo ya hecho"""
+        self.update(self.done + count)
+
+    def update(self, done, total=None):
+        """
+        Registra el avance absoluto. Devuelve True si se emitió algo
+        """
+        with self._lock:
+            if total:
+                self.total = total
+            self.done = done
+            now = time.monotonic()
+
+            percent = min(int(done * 100 / self.total), 100) if self.total else None
+            complete = percent == 100
+            if not complete and now - self._last_emit < self.min_interval:
+                return False
+            if percent is not None and percent == self.percent:
+                return False
+
+            self._sample_speed(now)
+            self._last_emit = now
+            if percent is not None:
+                self.percent = percent
+            stats = (self.speed, self.eta)
+
+        if percent is not None:
+            self._emit_percent(percent)
+        if self._emit_stats:
+            self._emit_stats(stats[0], stats[1] if stats[1] is not None else -1.0)
+        self._log(percent)
+        return True
+
+    def report_percent(self, percent):
+        """
+        Emite un porcentaje ya calculado (p. ej. estimado) con el mismo límite
+        """
+        with self._lock:
+            percent = max(0, min(int(percent), 100))
+            now = time.monotonic()
+            if percent == self.percent:
+                return False
+            if percent < 100 and now - self._last_emit < self.min_interval:
+                return False
+            self.percent = percent
+            self._last_emit = now
+        self._emit_percent(percent)
+        return True
+
+    def finish(self):
+        """Emite el 100% si no se emitió ya"""
+        self.report_percent(100)
+
+    def _sample_speed(self, now):
+        last_time, last_done = self._last_sample
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return
+        rate = (self.done - last_done) / elapsed
+        self.speed = rate if self.speed == 0 else self.smoothing * rate + (1 - self.smoothing) * self.speed
+        self._last_sample = (now, self.done)
+
+    def _log(self, percent):
+        if not self.label:
+            return
+
+        if percent is None:
+            # Total desconocido: una línea por cada MB (o unidad) completa
+            step = 1024 * 1024 if self.unit == 'B' else 1
+            mark = int(self.done // step)
+        else:
+            mark = percent - percent % self.log_every
+        if mark <= self._last_logged:
+            return
+        self._last_logged = mark
+
+        if self.unit == 'B':
+            amount = format_bytes(self.done) + (f"/{format_bytes(self.total)}" if self.total else '')
+            speed = f"{format_bytes(self.speed)}/s"
+        else:
+            amount = f"{self.done:.1f}{self.unit}" + (f"/{self.total:.1f}{self.unit}" if self.total else '')
+            speed = f"{self.speed:.1f}x"
+        prefix = f"{self.label}: {percent}%" if percent is not None else f"{self.label}:"
+        logger.info(f"{prefix} ({amount}, {speed}, ETA {format_eta(self.eta)})")
@@ -0,0 +1,128 @@
+# proyecto/utils/rate_limiter.py
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitConfig:
+    """Límites de peticiones por host"""
+
+    # dominio -> (peticiones por segundo, ráfaga máxima)
+    # Se aplica también a los subdominios (es.pornhub.com usa 'pornhub.com').
+    # Los hosts sin entrada (CDN de videos/imágenes, FTP web...) no se limitan.
+    HOST_LIMITS = {
+        'pornhub.com': (2.0, 4),
+        'streamhgapi.com': (1.0, 2),
+    }
+
+
+class TokenBucket:
+    """
+    Cubeta de tokens thread-safe
+
+    Las reservas pueden dejar el saldo en negativo: cada llamante recibe el
+    tiempo que debe esperar, de modo que los hilos se reparten el ritmo en
+    orden de llegada sin volver a competir por el lock.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        Reserva tokens y devuelve los segundos que hay que esperar antes de usarlos
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """
+        Bloquea hasta disponer de los tokens. Devuelve los segundos esperados
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """Limitador de peticiones por host basado en cubetas de tokens"""
+
+    def __init__(self, host_limits=None):
+        self._limits = dict(RateLimitConfig.HOST_LIMITS if host_limits is None else host_limits)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def configure_host(self, domain, rate, burst=1):
+        """
+        Establece (o cambia) el límite de un dominio y sus subdominios
+        """
+        with self._lock:
+            self._limits[domain] = (rate, burst)
+            self._buckets.pop(domain, None)
+        logger.info(f"⏱️ Límite para {domain}: {rate} req/s (ráfaga {burst})")
+
+    def remove_host(self, domain):
+        """
+        Elimina el límite de un dominio
+        """
+        with self._lock:
+            self._limits.pop(domain, None)
+            self._buckets.pop(domain, None)
+
+    def _bucket_for(self, url):
+        host = (urlparse(url).hostname or '').lower()
+        if not host:
+            return None
+
+        with self._lock:
+            for domain, (rate, burst) in self._limits.items():
+                if host == domain or host.endswith('.' + domain):
+                    bucket = self._buckets.get(domain)
+                    if bucket is None:
+                        bucket = self._buckets[domain] = TokenBucket(rate, burst)
+                    return bucket
+        return None
+
+    def reserve(self, url):
+        """
+        Reserva un turno para una petición a url y devuelve los segundos de espera
+        """
+        bucket = self._bucket_for(url)
+        return bucket.reserve() if bucket else 0.0
+
+    def acquire(self, url):
+        """
+        Bloquea hasta que se pueda enviar una petición a url. Devuelve los segundos esperados
+        """
+        bucket = self._bucket_for(url)
+        return bucket.acquire() if bucket else 0.0
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Devuelve el limitador de peticiones compartido por todo el proceso
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = HostRateLimiter()
+    return _limiter